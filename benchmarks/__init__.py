@@ -0,0 +1 @@
+"""Performance benchmarks for ir_cues (not part of the test suite)."""
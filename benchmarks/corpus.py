@@ -0,0 +1,120 @@
+"""
+Synthetic recipe corpus generator.
+
+    python -m benchmarks.corpus OUT_DIR --size 1000 [--seed 0]
+
+Writes `size` recipes whose ids mirror their paths, with a realistic mix of
+`render`, `include` and `include_step` steps. Recipes come in runs of
+`chain_every`: the first of a run is a leaf (render / include_step only) and
+every other one includes its predecessor, producing include chains up to
+`chain_every` deep. Other includes point at earlier leaves, so the include
+graph is a DAG and playbook expansion stays linear in the chain depth.
+"""
+
+import argparse
+import os
+import random
+
+OSES = ("windows", "linux", "macos")
+AREAS = ("process", "network", "persistence", "users",
+         "files", "system", "auth", "packages")
+VARIANTS = {"windows": ("pwsh", "cmd", "kql"),
+            "linux": ("bash",),
+            "macos": ("bash", "zsh")}
+VERBS = ("list", "dump", "query", "collect", "hash", "inspect", "trace", "enumerate")
+NOUNS = ("process", "socket", "service", "driver", "user",
+         "session", "task", "module", "key", "file")
+COMMANDS = {
+    "pwsh": "Get-CimInstance Win32_{noun}"
+            " | Where-Object {{ $_.ProcessId -eq {{{{ pid }}}} }} | Format-List *",
+    "cmd": "wmic {noun} where \"ProcessId={{{{ pid }}}}\" get /all /format:list",
+    "kql": "DeviceProcessEvents | where DeviceName == '{{{{ host }}}}'"
+           " | where FileName has '{noun}'",
+    "bash": "ps -o pid,ppid,cmd -p {{{{ pid }}}}"
+            " && ls -la /proc/{{{{ pid }}}}/{noun} 2>/dev/null",
+    "zsh": "lsof -nP -p {{{{ pid }}}} | grep -i {noun}"
+           " | head -n {{{{ limit | default(20) }}}}",
+}
+
+
+def recipe_id(n: int) -> str:
+    os_name = OSES[n % len(OSES)]
+    area = AREAS[(n // len(OSES)) % len(AREAS)]
+    return f"{os_name}/{area}/r{n:05d}"
+
+
+def _render_step(rng, os_name: str, n: int, i: int) -> str:
+    noun = rng.choice(NOUNS)
+    lines = [f"  - name: {rng.choice(VERBS).capitalize()} {noun}s ({n}.{i})",
+             "    render:"]
+    for variant in VARIANTS[os_name]:
+        cmd = COMMANDS[variant].format(noun=noun) + f"  # r{n}s{i}"
+        lines.append(f"      {variant}: |\n        {cmd}")
+    if rng.random() < 0.5:
+        verb = rng.choice(VERBS)
+        lines.append(f'    hint: "Check {noun} {verb} output for anomalies."')
+    return "\n".join(lines)
+
+
+def recipe_text(n: int, rng, include_ratio=0.25, include_step_ratio=0.1,
+                chain_every=10) -> str:
+    rid = recipe_id(n)
+    os_name = rid.split("/")[0]
+    steps = []
+    leaf = n % chain_every == 0
+    if not leaf:
+        steps.append(f"  - include:\n      id: {recipe_id(n - 1)}\n      vars:\n"
+                     f"        pid: \"{{{{ pid | default(1) }}}}\"")
+    for i in range(1, rng.randint(2, 5) + 1):
+        roll = rng.random()
+        if not leaf and roll < include_ratio:
+            target = rng.randrange(0, n, chain_every)
+            steps.append(f"  - include:\n      id: {recipe_id(target)}"
+                         f"\n    title: Included {i}")
+        elif n and i > 1 and roll < include_ratio + include_step_ratio:
+            # include_step targets step 1 of a leaf, which is always a render step
+            target = rng.randrange(0, n, chain_every)
+            steps.append(f"  - include_step:\n      id: {recipe_id(target)}"
+                         "\n      step: 1")
+        else:
+            steps.append(_render_step(rng, os_name, n, i))
+    noun = rng.choice(NOUNS)
+    return "\n".join([
+        f"id: {rid}",
+        f"title: {rng.choice(VERBS).capitalize()} {noun} evidence #{n}",
+        f"tags: [{os_name}, {rid.split('/')[1]}, {noun}]",
+        "vars:",
+        "  pid: {type: int, default: 4}",
+        "  host: {type: str, default: localhost}",
+        "steps:",
+        *steps,
+        "",
+    ])
+
+
+def generate(root: str, size: int, seed: int = 0, **kw) -> list:
+    """Write `size` recipes under `root`; return their ids."""
+    rng = random.Random(seed)
+    ids = []
+    for n in range(size):
+        rid = recipe_id(n)
+        path = os.path.join(root, *rid.split("/")) + ".yaml"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(recipe_text(n, rng, **kw))
+        ids.append(rid)
+    return ids
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a synthetic ir_cues corpus")
+    ap.add_argument("out_dir")
+    ap.add_argument("--size", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    ids = generate(args.out_dir, args.size, seed=args.seed)
+    print(f"wrote {len(ids)} recipes to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
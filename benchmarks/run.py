@@ -0,0 +1,194 @@
+"""
+Scalability benchmarks over synthetic corpora.
+
+    python -m benchmarks.run [--sizes 100,1000,10000,50000] [--out results.json]
+                             [--baseline old.json] [--tolerance 0.25]
+
+For each corpus size a synthetic tree is generated (see benchmarks.corpus, and
+reused from --work-dir on later runs) and the following are timed, in seconds:
+
+  load_index_{cold,warm,hot}   no cache / on-disk cache only / in-process too
+  load_recipe_{cold,hot}       per lookup, over a sample of ids
+  search_{cold,warm}           a few boolean queries
+  collect_commands_{cold,hot}  per playbook, over the deepest include chains
+  render_recipe_hot            per playbook, plans already compiled
+  cli_{list,search,dry_run}    end-to-end CLI process wall time
+
+Results are written as JSON. With --baseline, each metric is compared against
+an earlier results file and the run fails if any is slower by more than the
+tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import corpus
+
+DEFAULT_SIZES = (100, 1000, 10000, 50000)
+QUERIES = (["+process", "kill"], ["Get-CimInstance", "-linux"], ['"lsof -nP"'])
+
+_CLI = (
+    "import sys; from ir_cues import loader; loader.RECIPES_DIR = sys.argv[1]\n"
+    "from ir_cues.cli import app; app(sys.argv[2:], prog_name='ir_cues')"
+)
+
+
+def _timed(fn, repeat: int = 1) -> float:
+    """Best wall time of `repeat` runs of fn()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _cli(root: str, *args) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", _CLI, root, *args], check=True,
+                   capture_output=True)
+    return time.perf_counter() - start
+
+
+def bench_size(size: int, work_dir: str, repeat: int = 3, seed: int = 0) -> dict:
+    from ir_cues import loader, plan, search, templating
+    from ir_cues.renderer import collect_commands, render_recipe
+
+    root = os.path.join(work_dir, f"corpus-{size}")
+    if not os.path.isdir(root):
+        corpus.generate(root, size, seed=seed)
+    cache_root = os.path.join(work_dir, f"cache-{size}")
+    os.environ["IR_CUES_CACHE_DIR"] = cache_root
+    loader.RECIPES_DIR = root
+
+    def cold():
+        shutil.rmtree(cache_root, ignore_errors=True)
+        loader.clear_caches()
+        plan.clear_cache()
+        templating.clear_caches()
+
+    rng = random.Random(seed)
+    ids = [corpus.recipe_id(n) for n in range(size)]
+    sample = rng.sample(ids, min(200, size))
+    # the last recipe of each include chain is the deepest playbook
+    deep = [corpus.recipe_id(n) for n in range(9, size, 10)][-20:] or ids[-1:]
+    vars = {"pid": 4242, "host": "ws-042"}
+    r = {}
+
+    r["load_index_cold"] = _timed(lambda: (cold(), loader.load_index()))
+    r["load_index_warm"] = _timed(lambda: (loader.clear_caches(), loader.load_index()),
+                                  repeat)
+    r["load_index_hot"] = _timed(loader.load_index, repeat)
+
+    def load_sample():
+        return [loader.load_recipe(i) for i in sample]
+
+    loader.clear_caches()
+    r["load_recipe_cold"] = _timed(load_sample) / len(sample)
+    r["load_recipe_hot"] = _timed(load_sample, repeat) / len(sample)
+
+    shutil.rmtree(os.path.join(cache_root, ""), ignore_errors=True)
+    loader.clear_caches()
+    loader.load_index()
+    r["search_cold"] = _timed(lambda: [search.search(q) for q in QUERIES])
+    r["search_warm"] = _timed(lambda: [search.search(q) for q in QUERIES], repeat)
+
+    plan.clear_cache()
+    templating.clear_caches()
+    docs = [loader.load_recipe(i) for i in deep]
+
+    def collect():
+        return [collect_commands(d, vars) for d in docs]
+
+    def render():
+        return [render_recipe(d, vars, "md") for d in docs]
+
+    r["collect_commands_cold"] = _timed(collect) / len(docs)
+    r["collect_commands_hot"] = _timed(collect, repeat) / len(docs)
+    r["render_recipe_hot"] = _timed(render, repeat) / len(docs)
+
+    r["cli_list"] = min(_cli(root, "list") for _ in range(repeat))
+    r["cli_search"] = min(_cli(root, "search", "process") for _ in range(repeat))
+    r["cli_dry_run"] = min(_cli(root, "dry-run", deep[-1], "--format", "md")
+                           for _ in range(repeat))
+    return r
+
+
+def compare(current: dict, baseline: dict, tolerance: float):
+    """Yield (size, metric, baseline_s, current_s, ratio, regressed) per metric."""
+    for size, metrics in current["results"].items():
+        for name, value in metrics.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if not old:
+                continue
+            ratio = value / old
+            yield size, name, old, value, ratio, ratio > 1 + tolerance
+
+
+def _meta() -> dict:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        rev = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "git": rev,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ir_cues scalability benchmarks")
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--work-dir", default=None,
+                    help="keep generated corpora here between runs")
+    ap.add_argument("--out", default=None,
+                    help="write results JSON here (default: stdout)")
+    ap.add_argument("--baseline", default=None, help="results JSON to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="allowed slowdown ratio (0.25 = 25%%)")
+    args = ap.parse_args(argv)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="ir_cues-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    results = {"meta": _meta(), "results": {}}
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        print(f"[bench] {size} recipes ...", file=sys.stderr)
+        results["results"][str(size)] = bench_size(size, work_dir, repeat=args.repeat)
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    failed = False
+    rows = compare(results, baseline, args.tolerance)
+    for size, name, old, new, ratio, regressed in rows:
+        flag = "REGRESSED" if regressed else ""
+        print(f"{size:>6} {name:<24} {old * 1000:10.2f} ms -> {new * 1000:10.2f} ms  "
+              f"x{ratio:5.2f} {flag}",
+              file=sys.stderr)
+        failed = failed or regressed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Startup benchmark: how long does `import ir_cues.cli` take, and which heavy
+modules does it drag in?
+
+    python -m benchmarks.startup [--runs 5] [--budget-ms 50]
+
+Parses ``python -X importtime`` output, reports the median cumulative import
+time of ``ir_cues.cli`` plus the wall time of ``ir_cues list``, and exits 1 when
+the import time net of a bare ``import typer`` exceeds the budget or a
+lazily-loaded dependency was imported eagerly. Typer's own import cost varies
+a lot between machines, so it is measured alongside and left out of the gate.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# modules that must not be imported just to build the CLI
+LAZY_MODULES = ("jinja2", "rich", "yaml", "pyperclip")
+
+# milliseconds ir_cues itself may add on top of `import typer`
+DEFAULT_BUDGET_MS = float(os.environ.get("IR_CUES_STARTUP_BUDGET_MS", "50"))
+
+
+def import_profile(module: str = "ir_cues.cli") -> dict:
+    """Run one `python -X importtime` and return {module: cumulative_us}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [f.strip() for f in line[len("import time:"):].split("|")]
+        if len(fields) == 3 and fields[1].isdigit():
+            out[fields[2]] = int(fields[1])
+    return out
+
+
+def wall_time(*args) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "ir_cues.cli", *args], capture_output=True,
+                   check=True)
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    ap.add_argument("--json", action="store_true", help="emit a JSON report")
+    args = ap.parse_args(argv)
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    import_ms = statistics.median(p.get("ir_cues.cli", 0) for p in profiles) / 1000
+    typer_ms = statistics.median(import_profile("typer").get("typer", 0)
+                                 for _ in range(args.runs)) / 1000
+    net_ms = max(0.0, import_ms - typer_ms)
+    eager = sorted(m for m in LAZY_MODULES if any(m in p for p in profiles))
+    wall_time("list")  # warm the index cache
+    list_ms = statistics.median(wall_time("list") for _ in range(args.runs)) * 1000
+
+    report = {
+        "import_ms": round(import_ms, 1),
+        "typer_ms": round(typer_ms, 1),
+        "net_ms": round(net_ms, 1),
+        "list_wall_ms": round(list_ms, 1),
+        "budget_ms": args.budget_ms,
+        "eager_imports": eager,
+        "ok": net_ms <= args.budget_ms and not eager,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import ir_cues.cli: {report['import_ms']} ms, "
+              f"{report['net_ms']} ms net of typer "
+              f"({report['typer_ms']} ms) (budget {args.budget_ms} ms)")
+        print(f"ir_cues list (wall): {report['list_wall_ms']} ms")
+        if eager:
+            print("eagerly imported: " + ", ".join(eager))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
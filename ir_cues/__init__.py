@@ -7,7 +7,12 @@ Quick command recipes for DFIR tasks (Windows, Linux, Cloud, Browser).
 
 __version__ = "0.1.0"
 
-# Optionally, make the main CLI app importable
-from .cli import app
+__all__ = ["app", "__version__"]
 
-__all__ = ["app", "__version__"]
\ No newline at end of file
+
+def __getattr__(name):
+    # the CLI pulls in typer; only import it when someone actually asks for `app`
+    if name == "app":
+        from .cli import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,100 @@
+#ir_cues/batch.py
+
+"""
+Render one recipe for many variable sets (hosts, PIDs, ...).
+
+The recipe is loaded and its plan compiled once per worker process; rows are
+rendered across a process pool and results come back in input order.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+
+from ir_cues import loader
+
+_worker = {}  # per-process state: recipe document and variant filter
+
+
+def read_rows(path: str, input_format: str = "auto") -> list:
+    """Read variable sets from a JSONL or CSV file ('-' reads stdin)."""
+    if input_format == "auto":
+        input_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as fh:
+            text = fh.read()
+
+    if input_format == "csv":
+        return [dict(r) for r in csv.DictReader(io.StringIO(text))]
+    if input_format != "jsonl":
+        raise ValueError(f"unknown input format '{input_format}' (jsonl|csv)")
+    rows = []
+    for n, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        if not isinstance(row, dict):
+            raise ValueError(f"line {n}: expected a JSON object of variables")
+        rows.append(row)
+    return rows
+
+
+def _init_worker(recipe_id: str, recipes_dir: str, variant):
+    from ir_cues.plan import compile_plan
+
+    loader.RECIPES_DIR = recipes_dir
+    rec = loader.load_recipe(recipe_id)
+    compile_plan(rec)  # warm the plan (and template) caches once per worker
+    _worker.update(recipe=rec, variant=variant)
+
+
+def _init_pool_worker(*initargs):
+    from ir_cues import templating
+
+    templating.hold_saves()  # the parent compiled the plan and saved its variables
+    _init_worker(*initargs)
+
+
+def _render_row(job):
+    from ir_cues.renderer import iter_commands
+
+    row_no, row = job
+    return [
+        {"row": row_no, **item, "input": row}
+        for item in iter_commands(_worker["recipe"], row, variant=_worker["variant"])
+    ]
+
+
+def iter_batch(recipe_id: str, rows, variant=None, workers: int = 0,
+               chunksize: int = 0):
+    """
+    Yield one result dict per rendered command, in input order:
+    ``{"row": n, "id", "step", "variant", "command", "input": row}``.
+    `workers` = 0 uses one process per CPU; 1 renders in this process.
+    """
+    rows = list(rows)
+    jobs = list(enumerate(rows, start=1))
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(jobs)) or 1
+    initargs = (recipe_id, loader.RECIPES_DIR, variant)
+
+    # compile here first so a bad recipe (e.g. an include cycle) fails before any
+    # pool starts
+    _init_worker(*initargs)
+    if workers == 1:
+        for job in jobs:
+            yield from _render_row(job)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = chunksize or max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_pool_worker, initargs=initargs
+    ) as pool:
+        for results in pool.map(_render_row, jobs, chunksize=chunksize):
+            yield from results
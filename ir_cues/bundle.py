@@ -0,0 +1,170 @@
+#ir_cues/bundle.py
+
+"""
+Packed single-file corpus bundles (`ir_cues bundle build`).
+
+A bundle holds a whole recipe tree in one file, so slow USB or network
+filesystems see one open and one mmap instead of thousands of small reads.
+YAML stays the authoring format. Recipes are stored pre-parsed (as JSON) and
+each one is decoded only when it is first used.
+
+Layout (little-endian):
+
+    header   magic b"IRCB", u16 format version, u16 flags (0), u32 recipe count,
+             u64 metadata offset, u64 metadata length, u32 reserved      (32 bytes)
+    table    per recipe: u64 offset, u32 length of its JSON document  (12 bytes each)
+    data     the JSON documents, back to back
+    metadata JSON: {"source", "recipes": [{"rel", "sha1", "id", "title", "tags",
+             "variants", "steps"} or {"rel", "sha1", "id", "error"}, ...]} in table
+             order; "variants" are the sorted render variants and "steps" the
+             step count, so listing and search never decode a document
+
+Point ``IR_CUES_RECIPES`` (or ``loader.RECIPES_DIR``) at the bundle file to use it.
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from ir_cues import loader
+
+MAGIC = b"IRCB"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sHHIQQI")
+_SLOT = struct.Struct("<QI")
+
+
+class BundleError(ValueError):
+    """The file is not a bundle this version can read."""
+
+
+def build(root: str, out: str) -> dict:
+    """Pack the recipe tree under `root` into the bundle `out`; return a summary."""
+    entries, _ = loader.scan(root)
+    meta, blobs = [], []
+    for rel in entries:  # keep the tree's listing order
+        entry = entries[rel]
+        item = {"rel": rel, "sha1": entry.get("sha1", "")}
+        doc = entry.get("doc")
+        if "error" in entry:
+            item.update(id=rel.rsplit("/", 1)[-1], error=entry["error"])
+        elif isinstance(doc, dict) and doc:
+            _, title, tags, variants, steps = entry.meta
+            rid = doc.get("id", rel.rsplit("/", 1)[-1])
+            item.update(id=rid, title=title, tags=tags, variants=variants, steps=steps)
+        elif doc:
+            item.update(id=rel.rsplit("/", 1)[-1], error="recipe is not a mapping")
+        else:
+            continue  # empty file: not a recipe, same as the index
+        meta.append(item)
+        if "error" in item:
+            blobs.append(b"")
+        else:
+            blobs.append(json.dumps(doc, separators=(",", ":")).encode("utf-8"))
+
+    offset = _HEADER.size + _SLOT.size * len(blobs)
+    table = bytearray()
+    for blob in blobs:
+        table += _SLOT.pack(offset, len(blob))
+        offset += len(blob)
+    meta_bytes = json.dumps({"source": os.path.abspath(root), "recipes": meta},
+                            separators=(",", ":")).encode("utf-8")
+
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(blobs), offset,
+                              len(meta_bytes), 0))
+        fh.write(table)
+        for blob in blobs:
+            fh.write(blob)
+        fh.write(meta_bytes)
+    os.replace(tmp, out)
+    return {"bundle": out, "recipes": len(meta),
+            "errors": sum(1 for m in meta if "error" in m),
+            "bytes": os.path.getsize(out)}
+
+
+class _Entry(loader.LazyMapping):
+    """Scan entry for the bundled file in slot `no`; `doc` is decoded on access."""
+
+    __slots__ = ("_bundle", "_no")
+
+    def __init__(self, bundle, no):
+        self._bundle, self._no = bundle, no
+
+    def _keys(self):
+        broken = "error" in self._bundle.meta[self._no]
+        return ("sha1", "error") if broken else ("sha1", "doc")
+
+    def _value(self, key):
+        if key == "doc":
+            return self._bundle.doc_at(self._no)
+        return self._bundle.meta[self._no][key]
+
+    @property
+    def meta(self):
+        m = self._bundle.meta[self._no]
+        if "error" in m:
+            return None
+        return [m["id"], m["title"], m["tags"], m["variants"], m["steps"]]
+
+
+class Bundle:
+    """A read-only, memory-mapped bundle. Documents are decoded once and shared."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            try:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise BundleError(f"{path} is not an ir_cues bundle")
+        if len(self._mm) < _HEADER.size:
+            raise BundleError(f"{path} is not an ir_cues bundle")
+        header = _HEADER.unpack_from(self._mm, 0)
+        magic, version, _, count, meta_off, meta_len, _ = header
+        if magic != MAGIC:
+            raise BundleError(f"{path} is not an ir_cues bundle")
+        if version != FORMAT_VERSION:
+            raise BundleError(f"{path}: bundle format {version} is not supported "
+                              f"(expected {FORMAT_VERSION})")
+        info = json.loads(self._mm[meta_off:meta_off + meta_len])
+        self.source = info.get("source")
+        self.meta = info["recipes"]
+        if len(self.meta) != count:
+            raise BundleError(f"{path}: metadata does not match the offset table")
+        self._by_id = {}
+        for no, m in enumerate(self.meta):
+            if "error" not in m:
+                self._by_id.setdefault(m["id"], no)
+        self._docs = {}
+
+    def __len__(self):
+        return len(self.meta)
+
+    def doc_at(self, no: int):
+        doc = self._docs.get(no)
+        if doc is None:
+            offset, length = _SLOT.unpack_from(self._mm, _HEADER.size + _SLOT.size * no)
+            doc = self._docs[no] = json.loads(self._mm[offset:offset + length])
+        return doc
+
+    def doc(self, recipe_id: str):
+        """Document of the first bundled file with `recipe_id`, or None."""
+        no = self._by_id.get(recipe_id)
+        return None if no is None else self.doc_at(no)
+
+    def entries(self) -> dict:
+        """One entry per bundled file, keyed by its path in the source tree."""
+        return {m["rel"]: _Entry(self, no) for no, m in enumerate(self.meta)}
+
+    def summaries(self) -> list:
+        """List records (id, title, tags, or error) straight from the metadata block."""
+        keys = ("id", "title", "tags", "error")
+        return [{k: m[k] for k in keys if k in m} for m in self.meta]
+
+
+def open_bundle(path: str) -> Bundle:
+    """The bundle at `path`, mapped once per process and again after a rebuild."""
+    return loader.open_packed(Bundle, path)
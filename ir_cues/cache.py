@@ -0,0 +1,89 @@
+#ir_cues/cache.py
+
+"""
+Helpers for the persistent on-disk caches (recipe index, etc.).
+
+The cache directory defaults to ``$XDG_CACHE_HOME/ir_cues`` (``~/.cache/ir_cues``)
+and can be moved with ``IR_CUES_CACHE_DIR``. Set ``IR_CUES_NO_CACHE=1`` to
+disable all persistent caching.
+"""
+
+import hashlib
+import json
+import os
+
+CACHE_VERSION = 1
+
+
+def cache_dir() -> str:
+    """Return the directory that holds ir_cues cache files."""
+    env = os.environ.get("IR_CUES_CACHE_DIR")
+    if env:
+        return env
+    base = (os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "ir_cues")
+
+
+def cache_enabled() -> bool:
+    value = os.environ.get("IR_CUES_NO_CACHE", "").strip().lower()
+    return value in ("", "0", "false", "no")
+
+
+def cache_path(kind: str, root: str, ext: str = "json") -> str:
+    """Cache file for `kind` data about `root` (one file per recipe root)."""
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir(), f"{kind}-{digest}.{ext}")
+
+
+def pack(values, typecode: str) -> str:
+    """`values` as a base64 `array` of `typecode`, for posting lists in JSON caches."""
+    import array
+    import base64
+
+    return base64.b64encode(array.array(typecode, values).tobytes()).decode("ascii")
+
+
+def unpack(text: str, typecode: str):
+    """The `array` that `pack` encoded as `text`."""
+    import array
+    import base64
+
+    values = array.array(typecode)
+    values.frombytes(base64.b64decode(text))
+    return values
+
+
+def read_json(path: str):
+    """Return the decoded cache file, or None if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return None
+    return data
+
+
+def write_json(path: str, data: dict) -> bool:
+    """Atomically write `data` to `path`.
+
+    Failures are ignored (the cache is best effort).
+    """
+    import tempfile
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-",
+                                   suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({**data, "version": CACHE_VERSION}, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+        return True
+    except (OSError, TypeError, ValueError):
+        try:
+            os.unlink(tmp)
+        except (OSError, UnboundLocalError):
+            pass
+        return False
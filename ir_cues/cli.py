@@ -1,19 +1,190 @@
 #ir_cues/cli.py
 from __future__ import annotations
-import json, sys
+import contextlib, itertools, json, os, sys
 import typer
 from typing import List, Optional
-from rich.console import Console
-from ir_cues.loader import load_index, load_recipe
-from ir_cues.renderer import render_recipe
+from ir_cues import timing
+from ir_cues.loader import index_stats, load_recipe, rebuild_index, recipe_summaries
+
+# rich, jinja2 (via ir_cues.renderer) and pyperclip are imported inside the
+# commands that need them so startup and `list`/`search` stay cheap.
+
+
+class _LazyConsole:
+    """Stands in for rich's Console until the first call."""
+
+    _console = None
+
+    def __getattr__(self, name):
+        if _LazyConsole._console is None:
+            with timing.span("rich_init"):
+                from rich.console import Console
+                _LazyConsole._console = Console()
+        attr = getattr(_LazyConsole._console, name)
+        if timing.enabled() and name in ("print", "print_json"):
+            return _timed_output(attr)
+        return attr
+
+
+def _timed_output(fn):
+    def timed(*args, **kwargs):
+        with timing.span("output"):
+            return fn(*args, **kwargs)
+    return timed
+
+
+@contextlib.contextmanager
+def _streaming():
+    """Report include cycles; stop quietly if stdout closes early (e.g. `| head`)."""
+    from ir_cues.plan import IncludeCycleError
+
+    try:
+        yield
+    except IncludeCycleError as e:
+        con.print(f"[red]{e}[/]")
+        raise typer.Exit(code=1)
+    except BrokenPipeError:
+        # keep the interpreter from complaining while flushing on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise typer.Exit(code=0)
+
+
+@contextlib.contextmanager
+def _lookup(*recipe_ids: str):
+    """Report an unknown recipe id, and the closest known ids, without a traceback."""
+    try:
+        yield
+    except FileNotFoundError as e:
+        from ir_cues.complete import did_you_mean
+
+        con.print(f"[red]{e}[/]")
+        missing = next((rid for rid in recipe_ids if f"'{rid}'" in str(e)),
+                       recipe_ids[0])
+        close = did_you_mean(missing)
+        if close:
+            con.print("Did you mean: " + ", ".join(close) + "?", markup=False)
+        raise typer.Exit(code=1)
+
+
+@contextlib.contextmanager
+def _output(path: Optional[str]):
+    """Buffered text stream for `--output FILE`, or stdout."""
+    if not path:
+        yield sys.stdout
+        return
+    with open(path, "w", encoding="utf-8", buffering=1 << 16) as fh:
+        yield fh
+
+
+def _interactive(out) -> bool:
+    """Rich is only worth its cost when a person is reading the terminal."""
+    return out is sys.stdout and sys.stdout.isatty()
+
+
+def _recipe_ids(recipe_ids, plan_file) -> list:
+    """
+    Ids from the command line, then from a plan file (one per line, `#`
+    comments), each once.
+    """
+    ids = list(recipe_ids or [])
+    if plan_file:
+        try:
+            if plan_file == "-":
+                text = sys.stdin.read()
+            else:
+                with open(plan_file, "r", encoding="utf-8") as fh:
+                    text = fh.read()
+        except OSError as e:
+            con.print(f"[red]Cannot read {plan_file}: {e}[/]")
+            raise typer.Exit(code=2)
+        ids += [line.split("#", 1)[0].strip() for line in text.splitlines()]
+    ids = list(dict.fromkeys(i for i in ids if i))
+    if not ids:
+        con.print("[red]Give at least one recipe id, or --plan FILE.[/]")
+        raise typer.Exit(code=2)
+    return ids
+
+
+def _complete_ids(incomplete: str):
+    from ir_cues.complete import complete_ids
+
+    return complete_ids(incomplete)
+
+
+def _daemon(op: str, **args):
+    """Result of `op` from a running daemon, or None when it should be done here."""
+    if _local_only:
+        return None
+    from ir_cues import daemon
+
+    try:
+        return daemon.request(op, **args)
+    except daemon.DaemonUnavailable:
+        return None
+
+
+_local_only = False  # set by `shell`, which is already warm
 
 app = typer.Typer()
-con = Console()
+index_app = typer.Typer(help="Manage the persistent recipe index cache.")
+app.add_typer(index_app, name="index")
+daemon_app = typer.Typer(help="Keep a warm daemon that list/search/show/run/dry-run "
+                                "use when it is up.")
+app.add_typer(daemon_app, name="daemon")
+bundle_app = typer.Typer(help="Pack a recipe tree into a single memory-mapped "
+                                "bundle file.")
+app.add_typer(bundle_app, name="bundle")
+db_app = typer.Typer(help="Import the corpus into a SQLite (FTS5) database.")
+app.add_typer(db_app, name="db")
+con = _LazyConsole()
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile",
+                                 help="Print phase timings and counters to stderr."),
+    cprofile: Optional[str] = typer.Option(
+        None, "--cprofile", metavar="FILE",
+        help="Write cProfile stats for the command to FILE."
+    ),
+):
+    """
+    Offline incident response playbooks.
+
+    Set IR_CUES_TRACE=FILE to write a Chrome trace-event JSON of the command's phases.
+    """
+    trace = os.environ.get("IR_CUES_TRACE")
+    if profile or trace:
+        import time
+
+        timing.enable()
+        start = time.perf_counter()
+
+        def report():
+            if trace:
+                timing.write_trace(trace)
+            if profile:
+                wall_ms = (time.perf_counter() - start) * 1000
+                sys.stderr.write(timing.format_summary(wall_ms) + "\n")
+        ctx.call_on_close(report)
+    if cprofile:
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+
+        def dump():
+            prof.disable()
+            prof.dump_stats(cprofile)
+        ctx.call_on_close(dump)
 
 # ---- list command (don't shadow built-in list) ----
 @app.command("list")  # CLI: ir-cues list
 def list_cmd():
-    idx = load_index()
+    idx = _daemon("list")
+    if idx is None:
+        idx = recipe_summaries()
     for r in idx:
         con.print(f"[bold]{r['id']}[/] - {r.get('title','')}")
 
@@ -23,53 +194,14 @@ def list_cmd():
 def search(
     terms: list[str] = typer.Argument(
         ..., help="Search terms (+require, -exclude, plain=optional). Quotes form phrases."
-    )
+    ),
+    limit: int = typer.Option(0, "--limit", "-n",
+                              help="Show at most N results (0 = all)"),
 ) -> None:
-    idx = load_index()
-
-    required: list[str] = []
-    excluded: list[str] = []
-    optional: list[str] = []
-
-    def _clean(term: str) -> str:
-        t = term.strip()
-        # drop one leading + or -
-        prefix = t[0] if t[:1] in "+-" else ""
-        body = t[1:] if prefix else t
-        # strip surrounding single/double quotes if present
-        if len(body) >= 2 and body[0] == body[-1] and body[0] in ("'", '"'):
-            body = body[1:-1]
-        return prefix, body.casefold()
-
-    for raw in terms:
-        prefix, body = _clean(raw)
-        if not body:
-            continue
-        if prefix == "+":
-            required.append(body)
-        elif prefix == "-":
-            excluded.append(body)
-        else:
-            optional.append(body)
-
-    def haystack(rec: dict) -> str:
-        return " ".join([
-            rec.get("id", ""),
-            rec.get("title", ""),
-            " ".join(rec.get("tags", [])),
-        ]).casefold()
-
-    def matches(rec: dict) -> bool:
-        h = haystack(rec)
-        if any(req not in h for req in required):
-            return False
-        if any(exc in h for exc in excluded):
-            return False
-        if optional and not any(opt in h for opt in optional):
-            return False
-        return True
-
-    hits = [r for r in idx if matches(r)]
+    hits = _daemon("search", terms=terms, limit=limit or None)
+    if hits is None:
+        from ir_cues.search import search as run_search
+        hits = run_search(terms, limit=limit or None)
     if not hits:
         con.print("[dim]No matches.[/]")
         raise typer.Exit(code=0)
@@ -77,34 +209,162 @@ def search(
     for r in hits:
         title = r.get("title", "")
         tags = ", ".join(r.get("tags", []))
-        con.print(f"[bold]{r['id']}[/] - {title} [dim]({tags})[/]") 
+        con.print(f"[bold]{r['id']}[/] - {title} [dim]({tags})[/]")
+
+
+@index_app.command("rebuild")
+def index_rebuild():
+    """Reparse every recipe and rewrite the index cache."""
+    stats = rebuild_index()
+    con.print(f"Indexed {stats['files']} files ({stats['parsed']} parsed).")
+
+
+@index_app.command("stats")
+def index_stats_cmd():
+    """Show index cache location, size and hit counts."""
+    con.print_json(data=index_stats())
+
+
+@bundle_app.command("build")
+def bundle_build(
+    out: str = typer.Argument(..., help="Bundle file to write"),
+    root: Optional[str] = typer.Option(
+        None, help="Recipe tree to pack (default: the current recipes)"
+    ),
+):
+    """Compile a recipe tree into one bundle; use it with IR_CUES_RECIPES=<file>."""
+    from ir_cues import bundle, loader
+
+    info = bundle.build(root or loader.RECIPES_DIR, out)
+    con.print(f"Packed {info['recipes']} recipes ({info['errors']} with errors) "
+              f"into {out} ({info['bytes']} bytes).")
+
+
+@bundle_app.command("info")
+def bundle_info(path: str = typer.Argument(..., help="Bundle file")):
+    """Show a bundle's format version, source tree and recipe count."""
+    from ir_cues import bundle
+
+    try:
+        b = bundle.Bundle(path)
+    except (OSError, bundle.BundleError) as e:
+        con.print(f"[red]{e}[/]")
+        raise typer.Exit(code=1)
+    errors = sum(1 for m in b.meta if "error" in m)
+    con.print_json(data={"path": path, "format": bundle.FORMAT_VERSION,
+                         "source": b.source, "recipes": len(b), "errors": errors})
+
+
+@db_app.command("import")
+def db_import(
+    out: str = typer.Argument(..., help="Database file to write"),
+    root: Optional[str] = typer.Option(
+        None, help="Recipe tree to import (default: the current recipes)"
+    ),
+):
+    """Import a recipe tree into SQLite; use it with IR_CUES_RECIPES=<file>."""
+    from ir_cues import loader, store
+
+    try:
+        info = store.build(root or loader.RECIPES_DIR, out)
+    except ValueError as e:
+        con.print(f"[red]{e}[/]")
+        raise typer.Exit(code=1)
+    con.print(f"Imported {info['recipes']} recipes ({info['errors']} with errors) "
+              f"into {out} ({info['bytes']} bytes).")
+
 
 @app.command()
-def show(recipe_id: str):
-    r = load_recipe(recipe_id)
-    con.print_json(data={"id": r["id"], "vars": r.get("vars", {})})
+def includers(
+    recipe_id: str = typer.Argument(
+        ..., help="Recipe ID that is included", autocompletion=_complete_ids
+    ),
+    transitive: bool = typer.Option(
+        False, help="Also list playbooks that include it indirectly"
+    ),
+):
+    """List the playbooks that include a recipe (via include or include_step)."""
+    from ir_cues.store import includers as find_includers
+
+    found = find_includers(recipe_id, transitive=transitive)
+    if not found:
+        con.print("[dim]Not included anywhere.[/]")
+        raise typer.Exit(code=0)
+    for src, step_no, kind in found:
+        con.print(f"[bold]{src}[/] step {step_no} [dim]({kind})[/]")
+
+
+@app.command()
+def show(recipe_id: str = typer.Argument(..., autocompletion=_complete_ids)):
+    with _lookup(recipe_id):
+        with _streaming():
+            data = _daemon("show", recipe_id=recipe_id)
+            if data is None:
+                from ir_cues.plan import requirements
+
+                r = load_recipe(recipe_id)
+                data = {"id": r["id"], "vars": r.get("vars", {}), **requirements(r)}
+    con.print_json(data=data)
 
 @app.command()
-def run(recipe_id: str,
+def run(recipe_ids: Optional[List[str]] = typer.Argument(
+            None, help="Recipe ID(s); several form one combined playbook",
+            autocompletion=_complete_ids),
+        plan: Optional[str] = typer.Option(
+            None, "--plan", metavar="FILE",
+            help="File of recipe ids, one per line ('-' = stdin)"),
         vars: str = typer.Option("", help="JSON dict of variables"),
         format: str = typer.Option("text", help="text|md"),
-        copy: bool = typer.Option(False, help="Copy to clipboard")):
-    r = load_recipe(recipe_id)
+        copy: bool = typer.Option(False, help="Copy to clipboard"),
+        output: Optional[str] = typer.Option(None, "--output", "-o",
+                                             help="Write the playbook here "
+                                                  "instead of stdout")):
+    ids = _recipe_ids(recipe_ids, plan)
     v = json.loads(vars or "{}")
-    out = render_recipe(r, v, format=format)
+    with _lookup(*ids):
+        rendered = _daemon("render", recipe_ids=ids, vars=v, format=format)
+        if rendered is None:
+            from ir_cues.renderer import compose_render
+            rendered = compose_render([load_recipe(rid) for rid in ids], v,
+                                      format=format)
+    blocks = []
+    with _output(output) as out, _streaming():
+        tty = _interactive(out)
+        for block in rendered:
+            if tty:
+                con.print(block, markup=False)
+            else:
+                with timing.span("output"):
+                    out.write(block + "\n")
+            if copy:
+                blocks.append(block)
+        out.flush()
     if copy:
         try:
-            import pyperclip; pyperclip.copy(out)
+            import pyperclip; pyperclip.copy("\n".join(blocks))
         except Exception:
             pass
-    con.print(out)
 
 @app.command()
 def dry_run(
-    recipe_id: str = typer.Argument(..., help="Recipe ID to expand"),
+    recipe_ids: Optional[List[str]] = typer.Argument(
+        None, help="Recipe ID(s) to expand into one plan",
+        autocompletion=_complete_ids
+    ),
+    plan: Optional[str] = typer.Option(
+        None, "--plan", metavar="FILE",
+        help="File of recipe ids, one per line ('-' = stdin)"
+    ),
     vars: str = typer.Option("", help="JSON dict of variables"),
     variant: Optional[str] = typer.Option(None, help="Filter by variant: pwsh|cmd|bash|kql|..."),
-    format: str = typer.Option("text", help="text|md")
+    format: str = typer.Option("text", help="text|md|jsonl|json|plain|sh"),
+    output: Optional[str] = typer.Option(None, "--output", "-o",
+                                         help="Write the plan here instead of stdout"),
+    head: int = typer.Option(0, "--head", help="Stop after N commands (0 = all)"),
+    require_vars: bool = typer.Option(
+        False, "--require-vars",
+        help="Skip commands whose required variables are not provided"
+    ),
 ):
     """
     Examples:
@@ -116,40 +376,351 @@ def dry_run(
 
     # Markdown plan, with vars
     ir-cues dry-run windows/process/triage --vars '{"pid":4321}' --format md
+
+    # First five commands only (nothing after them is rendered)
+    ir-cues dry-run incident/host/linux-quick-triage --head 5
+
+    # Only commands whose variables are all supplied
+    ir-cues dry-run windows/process/triage --vars '{"pid":4321}' --require-vars
+
+    # Machine-readable plan for other tooling
+    ir-cues dry-run incident/host/windows-baseline --format jsonl -o plan.jsonl
+
+    # One combined plan for several recipes; commands they share are listed once
+    ir-cues dry-run incident/host/windows-quick-triage incident/host/linux-quick-triage
+    ir-cues dry-run --plan multi-os.txt
     """
-    import json
-    rec = load_recipe(recipe_id)
+    from ir_cues.output import FORMATS, write_plan
+
+    if format not in FORMATS:
+        con.print(f"[red]Unknown format '{format}' ({'|'.join(FORMATS)}).[/]")
+        raise typer.Exit(code=2)
+    ids = _recipe_ids(recipe_ids, plan)
     v = json.loads(vars or "{}")
-    seq = collect_commands(rec, v)
+    with _lookup(*ids):
+        seq = _daemon("commands", recipe_ids=ids, vars=v, variant=variant, head=head,
+                      require_vars=require_vars)
+        if seq is None:
+            from ir_cues.renderer import compose_commands
+            seq = compose_commands([load_recipe(rid) for rid in ids], v,
+                                   variant=variant, require_vars=require_vars)
+            if head > 0:
+                seq = itertools.islice(seq, head)
+    seq = iter(seq)
 
-    if variant:
-        seq = [s for s in seq if s["variant"] == variant]
+    with _output(output) as out, _streaming():
+        tty = format in ("text", "md") and _interactive(out)
+        first = next(seq, None)
+        if first is None and format in ("text", "md"):
+            if tty:
+                con.print("[dim]No commands produced.[/]")
+            else:
+                out.write("No commands produced.\n")
+            raise typer.Exit(code=0)
+        seq = itertools.chain([first], seq) if first is not None else seq
 
-    if not seq:
-        con.print("[dim]No commands produced.[/]")
-        raise typer.Exit(code=0)
+        if format == "text" and tty:
+            # rich table (needs every row to size its columns)
+            from rich.table import Table
+            from rich.text import Text
+
+            table = Table(show_header=True, header_style="bold")
+            table.add_column("#", width=4)
+            table.add_column("Recipe")
+            table.add_column("Step")
+            table.add_column("Variant", width=10)
+            table.add_column("Command")
+            total = 0
+            for i, s in enumerate(seq, 1):
+                cells = (Text(str(s[k])) for k in ("id", "step", "variant", "command"))
+                table.add_row(str(i), *cells)
+                total = i
+            con.print(table)
+            con.print(f"[dim]Total: {total} commands.[/]")
+        else:
+            # the span includes rendering, which the writers pull lazily
+            with timing.span("output"):
+                plain = "plain" if format == "text" else format
+                total = write_plan(out, seq, plain, ids)
+                if format == "text":
+                    out.write(f"Total: {total} commands.\n")
+                out.flush()
+
+@app.command()
+def watch(
+    recipe_ids: List[str] = typer.Argument(
+        ..., help="Recipe ID(s) to keep rendered", autocompletion=_complete_ids
+    ),
+    vars: str = typer.Option("", help="JSON dict of variables"),
+    format: str = typer.Option("text", help="text|md"),
+    interval: float = typer.Option(0.5, help="Seconds between polls"),
+):
+    """
+    Re-render playbooks whenever a recipe they are built from changes (Ctrl-C to stop).
+
+    Only changed files are re-parsed, and only playbooks that include them
+    (at any depth) are re-rendered. Errors and render times show up at once.
+    """
+    from ir_cues.watch import watch as run_watch
+
+    v = json.loads(vars or "{}")
+    for rid in recipe_ids:
+        with _lookup(rid):
+            load_recipe(rid)
+
+    def report(result):
+        changed = ""
+        if result["changed"]:
+            changed = f" after {', '.join(result['changed'])} changed"
+        if "error" in result:
+            con.print(f"[red]✗ {result['id']}[/]{changed}: {result['error']}",
+                      highlight=False)
+            return
+        con.rule(f"{result['id']} rendered in {result['ms']:.1f} ms{changed}",
+                 style="dim")
+        con.print(result["text"], markup=False, highlight=False)
+
+    try:
+        run_watch(recipe_ids, v, format=format, interval=interval, report=report)
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command()
+def batch(
+    recipe_id: str = typer.Argument(
+        ..., help="Recipe ID to render", autocompletion=_complete_ids
+    ),
+    rows: str = typer.Argument(
+        ..., help="JSONL or CSV file of variable sets ('-' = stdin)"
+    ),
+    variant: Optional[str] = typer.Option(
+        None, help="Filter by variant: pwsh|cmd|bash|kql|..."
+    ),
+    workers: int = typer.Option(
+        0, help="Worker processes (0 = one per CPU, 1 = no pool)"
+    ),
+    input_format: str = typer.Option("auto", help="auto|jsonl|csv"),
+    output: Optional[str] = typer.Option(None, "--output", "-o",
+                                         help="Write JSONL here instead of stdout"),
+):
+    """
+    Render one recipe for every row of variables, as JSONL (one line per command).
+
+    Example:
+    ir-cues batch windows/process/triage pids.csv --variant pwsh > plan.jsonl
+    """
+    from ir_cues.batch import iter_batch, read_rows
+
+    try:
+        var_rows = read_rows(rows, input_format)
+    except (OSError, ValueError) as e:
+        con.print(f"[red]Cannot read {rows}: {e}[/]")
+        raise typer.Exit(code=2)
+    with _lookup(recipe_id):
+        load_recipe(recipe_id)  # fail fast on an unknown id
+
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    try:
+        with _streaming():
+            for item in iter_batch(recipe_id, var_rows, variant=variant,
+                                   workers=workers):
+                out.write(json.dumps(item, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if output:
+            out.close()
+
+@app.command()
+def export(
+    out_dir: str = typer.Argument(..., help="Directory to write the site into"),
+    format: str = typer.Option("md", help="md|html"),
+    workers: int = typer.Option(
+        0, help="Worker processes (0 = one per CPU, 1 = no pool)"
+    ),
+    force: bool = typer.Option(
+        False, help="Re-render every page, not only the stale ones"
+    ),
+):
+    """
+    Render every recipe (default variables) into a static Markdown or HTML site.
+
+    Pages whose recipe, or any recipe it includes, is unchanged since the last
+    export into DIR are kept as they are.
+    """
+    from ir_cues.export import FORMATS
+    from ir_cues.export import export as run_export
+
+    if format not in FORMATS:
+        con.print(f"[red]Unknown format '{format}' ({'|'.join(FORMATS)}).[/]")
+        raise typer.Exit(code=2)
+    report = run_export(out_dir, format=format, workers=workers, force=force)
+    for rid, error in sorted(report["errors"].items()):
+        con.print(f"[red]{rid}[/]: {error}", highlight=False)
+    con.print(f"Exported {report['pages']} pages to {out_dir} "
+              f"({report['rendered']} rendered, {report['unchanged']} unchanged, "
+              f"{report['removed']} removed, {len(report['errors'])} errors).")
+    if report["errors"]:
+        raise typer.Exit(code=1)
+
+@app.command()
+def lint(
+    root: Optional[str] = typer.Argument(
+        None, help="Recipe directory (default: the bundled recipes)"
+    ),
+    format: str = typer.Option("text", help="text|json"),
+    workers: int = typer.Option(
+        0, help="Worker processes (0 = one per CPU, 1 = no pool)"
+    ),
+    cache: bool = typer.Option(
+        True, help="Reuse results for files whose content is unchanged"
+    ),
+):
+    """
+    Validate every recipe: schema, id/path, includes, cycles, Jinja syntax,
+    duplicates.
+    """
+    from ir_cues.lint import lint as run_lint
+
+    report = run_lint(root, workers=workers, use_cache=cache)
+    if format == "json":
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    else:
+        for i in report["issues"]:
+            where = i["path"] + (f" step {i['step']}" if i["step"] else "")
+            colour = "red" if i["severity"] == "error" else "yellow"
+            con.print(f"[{colour}]{i['code']}[/] {where}: {i['message']}",
+                      markup=True, highlight=False)
+        con.print(f"[dim]{report['files']} files "
+                  f"({report['checked']} checked, {report['cached']} cached): "
+                  f"{report['errors']} errors, {report['warnings']} warnings.[/]")
+    if report["errors"]:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def dedupe(
+    threshold: float = typer.Option(
+        0.8, help="Minimum Jaccard similarity (0-1) to report"
+    ),
+    num_perm: int = typer.Option(64, help="MinHash signature length"),
+    format: str = typer.Option("text", help="text|json"),
+    fail: bool = typer.Option(False, help="Exit 1 when any cluster is found"),
+):
+    """Report clusters of near-duplicate commands across all recipes."""
+    from ir_cues.dedupe import dedupe_report
 
-    if format == "md":
-        # markdown checklist
-        con.print(f"# Plan for `{recipe_id}`\n")
-        for i, s in enumerate(seq, 1):
-            con.print(f"**{i}. {s['id']} — {s['step']}**  \n*{s['variant']}*\n")
-            con.print("```")
-            con.print(s["command"])
-            con.print("```\n")
-        con.print(f"\nTotal: {len(seq)} commands.")
+    report = dedupe_report(threshold=threshold, num_perm=num_perm)
+    if format == "json":
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
     else:
-        # rich table
-        table = Table(show_header=True, header_style="bold")
-        table.add_column("#", width=4)
-        table.add_column("Recipe")
-        table.add_column("Step")
-        table.add_column("Variant", width=10)
-        table.add_column("Command")
-        for i, s in enumerate(seq, 1):
-            table.add_row(str(i), s["id"], s["step"], s["variant"], s["command"])
-        con.print(table)
-        con.print(f"[dim]Total: {len(seq)} commands.[/]")
+        for n, c in enumerate(report["clusters"], 1):
+            con.print(f"[bold]Cluster {n}[/] ({c['size']} commands, similarity "
+                      f"{c['min_similarity']:.2f}-{c['max_similarity']:.2f})")
+            for m in c["members"]:
+                first = m["command"].splitlines()[0] if m["command"] else ""
+                con.print(f"  {m['id']} step {m['step']} [{m['variant']}]: {first}",
+                          markup=False)
+        con.print(f"[dim]{report['commands']} commands, "
+                  f"{len(report['clusters'])} clusters "
+                  f"at similarity >= {threshold}.[/]")
+    if fail and report["clusters"]:
+        raise typer.Exit(code=1)
+
+
+@daemon_app.command("start")
+def daemon_start(foreground: bool = typer.Option(
+        False, help="Serve in this process (Ctrl-C to stop)")):
+    """Start the daemon for the current recipe directory."""
+    from ir_cues import daemon
+
+    if not daemon.enabled():
+        con.print("[red]Daemon mode needs Unix sockets and IR_CUES_NO_DAEMON unset.[/]")
+        raise typer.Exit(code=1)
+    if foreground:
+        con.print(f"Listening on {daemon.socket_path()}")
+        try:
+            daemon.serve()
+        except KeyboardInterrupt:
+            pass
+        return
+    try:
+        pid = daemon.start()
+    except RuntimeError as e:
+        con.print(f"[red]{e}[/]")
+        raise typer.Exit(code=1)
+    con.print(f"Daemon running (pid {pid}) on {daemon.socket_path()}")
+
+
+@daemon_app.command("stop")
+def daemon_stop():
+    """Stop the running daemon."""
+    from ir_cues import daemon
+
+    con.print("Daemon stopped." if daemon.stop() else "[dim]No daemon running.[/]")
+
+
+@daemon_app.command("status")
+def daemon_status():
+    """Show whether a daemon is serving the current recipe directory."""
+    from ir_cues import daemon
+
+    try:
+        info = daemon.request("ping")
+    except daemon.DaemonUnavailable:
+        con.print("[dim]No daemon running.[/]")
+        raise typer.Exit(code=1)
+    con.print_json(data={**info, "socket": daemon.socket_path()})
+
+
+@app.command()
+def shell():
+    """
+    Interactive prompt. Runs any ir_cues command (`search process`, `run <id>`, ...)
+    with the corpus, plans and templates kept warm; other input is searched for.
+    """
+    import shlex
+    global _local_only
+
+    try:
+        import readline  # noqa: F401  (line editing and history)
+    except ImportError:
+        pass
+
+    commands = {c.name or c.callback.__name__.replace("_", "-")
+                for c in app.registered_commands}
+    commands |= {g.name for g in app.registered_groups}
+    _local_only = True
+    con.print("What do you want to investigate? "
+              "(process, registry, network, persistence, ...)")
+    con.print("[dim]Type a command (list, search, show, run, dry-run, ...), "
+              "search words, or 'quit'.[/]")
+    while True:
+        try:
+            line = input("ir_cues> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            con.print()
+            break
+        if not line:
+            continue
+        if line in ("quit", "exit", "q"):
+            break
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            con.print(f"[red]{e}[/]")
+            continue
+        if args[0] == "shell":
+            continue
+        if args[0] not in commands and args[0] != "--help":
+            args = ["search", "--", *args]
+        try:
+            app(args, prog_name="ir_cues", standalone_mode=False)
+        except SystemExit:
+            pass
+        except Exception as e:
+            msg = e.format_message() if hasattr(e, "format_message") else str(e)
+            con.print(f"[red]{type(e).__name__}: {msg}[/]")
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -0,0 +1,145 @@
+#ir_cues/complete.py
+
+"""
+Recipe-id completion and "did you mean" suggestions.
+
+A small index over ids and titles is kept next to the recipe index cache:
+ids sorted casefolded (a flattened prefix trie, walked with bisect) and a
+trigram map over ids and titles for fuzzy matches, each posting list packed
+as base64 so the JSON loads in a few milliseconds and only the lists a query
+needs are decoded. It is rebuilt only when the recipe index cache (or the
+bundle / database file) changes, and loading it touches neither the recipe
+files nor jinja2 or rich.
+"""
+
+import bisect
+import collections
+import os
+
+from ir_cues import cache, loader
+
+COMPLETE_VERSION = 1
+
+
+def _grams(text: str):
+    text = f"  {text.casefold()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class IdIndex:
+    def __init__(self, ids, titles, grams, typecode):
+        self.ids = ids            # sorted by casefolded id
+        self.titles = titles
+        self.keys = [i.casefold() for i in ids]
+        self.grams = grams        # trigram -> packed [doc no, ...]
+        self.typecode = typecode  # array typecode of the packed doc numbers
+        self._segments = None
+
+    @classmethod
+    def build(cls, summaries):
+        recs = sorted((r for r in summaries if "error" not in r),
+                      key=lambda r: r["id"].casefold())
+        ids = [r["id"] for r in recs]
+        titles = [str(r.get("title", "")) for r in recs]
+        grams = {}
+        for no, (rid, title) in enumerate(zip(ids, titles)):
+            for g in _grams(rid) | _grams(title):
+                grams.setdefault(g, []).append(no)
+        typecode = "H" if len(ids) < 1 << 16 else "I"
+        grams = {g: cache.pack(nos, typecode) for g, nos in grams.items()}
+        return cls(ids, titles, grams, typecode)
+
+    def to_json(self) -> dict:
+        return {"ids": self.ids, "titles": self.titles, "grams": self.grams,
+                "typecode": self.typecode}
+
+    @classmethod
+    def from_json(cls, data: dict):
+        return cls(data["ids"], data["titles"], data["grams"], data["typecode"])
+
+    def _postings(self, gram: str):
+        return cache.unpack(self.grams.get(gram, ""), self.typecode)
+
+    def complete(self, prefix: str, limit: int = 100) -> list:
+        """
+        Ids starting with `prefix`; failing that, ids with a later path segment
+        starting with it.
+        """
+        p = prefix.casefold()
+        out = []
+        for i in range(bisect.bisect_left(self.keys, p), len(self.keys)):
+            if not self.keys[i].startswith(p) or len(out) >= limit:
+                break
+            out.append(self.ids[i])
+        if out or not p:
+            return out
+        if self._segments is None:
+            self._segments = sorted(
+                ("/".join(parts[i:]), no)
+                for no, parts in enumerate(k.split("/") for k in self.keys)
+                for i in range(1, len(parts))
+            )
+        seen = set()
+        for i in range(bisect.bisect_left(self._segments, (p,)), len(self._segments)):
+            seg, no = self._segments[i]
+            if not seg.startswith(p) or len(seen) >= limit:
+                break
+            seen.add(no)
+        return [self.ids[no] for no in sorted(seen)]
+
+    def suggest(self, text: str, limit: int = 5, cutoff: float = 0.3) -> list:
+        """Closest ids to a mistyped id or title words, best first."""
+        query = _grams(text)
+        shared = collections.Counter()
+        for g in query:
+            shared.update(self._postings(g))
+        # Jaccard against the id's trigrams (len + 1 of them, give or take repeats);
+        # grams shared with the title count too, so words from a title also find it
+        scored = [(min(1.0, n / (len(query) + len(self.keys[no]) + 1 - n)), no)
+                  for no, n in shared.items()]
+        scored.sort(key=lambda s: (-s[0], self.keys[s[1]]))
+        return [self.ids[no] for score, no in scored[:limit] if score >= cutoff]
+
+
+def _stamp(root: str):
+    """What the id index was built from: the packed file, or the recipe index cache."""
+    path = root if os.path.isfile(root) else cache.cache_path("index", root)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [path, st.st_mtime_ns, st.st_size]
+
+
+def load_id_index(root=None) -> IdIndex:
+    """
+    Id index for `root` (default: all sources), reused from the cache while the
+    corpus is unchanged.
+    """
+    roots = [root] if root else loader.sources()
+    path = cache.cache_path("ids", loader.corpus_key(roots))
+    if cache.cache_enabled():
+        stamp = [_stamp(r) for r in roots]
+        data = cache.read_json(path) if all(stamp) else None
+        if (data and data.get("stamp") == stamp
+                and data.get("complete_version") == COMPLETE_VERSION):
+            return IdIndex.from_json(data["index"])
+    idx = IdIndex.build(loader.recipe_summaries())
+    if cache.cache_enabled():
+        # the recipe index cache was refreshed by the line above, so stamp after it
+        cache.write_json(path, {"complete_version": COMPLETE_VERSION,
+                                "stamp": [_stamp(r) for r in roots],
+                                "index": idx.to_json()})
+    return idx
+
+
+def complete_ids(incomplete: str) -> list:
+    """Shell completion callback for recipe-id arguments."""
+    try:
+        return load_id_index().complete(incomplete)
+    except Exception:
+        return []  # completion must never crash the shell
+
+
+def did_you_mean(recipe_id: str, limit: int = 5) -> list:
+    return load_id_index().suggest(recipe_id, limit=limit)
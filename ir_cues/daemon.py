@@ -0,0 +1,261 @@
+#ir_cues/daemon.py
+
+"""
+Warm resident daemon for the CLI.
+
+The daemon keeps the recipe index, search index, parsed documents, plans and
+compiled templates in memory and answers requests over a local Unix socket,
+one JSON line each way. Before every request it rescans the recipe directory
+(stat only); just the files that changed are reparsed.
+
+When the socket exists, `list`, `search`, `show`, `run` and `dry-run` send their
+work here instead of loading everything themselves. Set ``IR_CUES_NO_DAEMON=1``
+to bypass it. Unix sockets only: on platforms without AF_UNIX the CLI always
+runs locally.
+"""
+
+import itertools
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+from ir_cues import cache, loader
+
+CONNECT_TIMEOUT = 0.5
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening (the caller should do the work itself)."""
+
+
+def socket_path() -> str:
+    env = os.environ.get("IR_CUES_DAEMON_SOCKET")
+    if env:
+        return env
+    path = cache.cache_path("daemon", loader.corpus_key(), ext="sock")
+    if len(path) > 100:  # AF_UNIX paths are limited to ~104-108 bytes
+        import tempfile
+        path = os.path.join(tempfile.gettempdir(),
+                            f"ir_cues-{os.getuid()}-" + os.path.basename(path))
+    return path
+
+
+def enabled() -> bool:
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    value = os.environ.get("IR_CUES_NO_DAEMON", "").strip().lower()
+    return value in ("", "0", "false", "no")
+
+
+# ---- server side ----
+
+class _State:
+    """In-memory corpus, refreshed from disk before each request."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fingerprint = None
+        self.records = []
+        self.search_index = None
+
+    def refresh(self):
+        from ir_cues import plan, search, templating
+
+        entries, _ = loader.scan()
+        fingerprint = search.fingerprint(entries)
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self.records = loader.index_records(entries)
+            self.search_index = search.load_search_index(entries=entries)
+            # a recipe changed: resolve ids, plans and templates afresh
+            loader.invalidate()
+            plan.clear_cache()
+            templating.save_template_vars()
+            templating.clear_caches()
+
+
+def _summary(rec: dict) -> dict:
+    out = {"id": rec["id"], "title": rec.get("title", ""), "tags": rec.get("tags", [])}
+    if "error" in rec:
+        out["error"] = rec["error"]
+    return out
+
+
+def handle(state: _State, op: str, args: dict):
+    """Run one request against the warm state and return a JSON-able result."""
+    if op == "ping":
+        return {"pid": os.getpid(), "root": loader.RECIPES_DIR}
+    state.refresh()
+    if op == "list":
+        return [_summary(r) for r in state.records]
+    if op == "search":
+        from ir_cues.search import parse_terms
+
+        hits = state.search_index.query(*parse_terms(args["terms"]),
+                                        limit=args.get("limit"))
+        by_id = {r["id"]: r for r in state.records}
+        return [_summary(by_id[rid]) for rid, _ in hits if rid in by_id]
+    if op == "show":
+        from ir_cues.plan import requirements
+
+        r = loader.load_recipe(args["recipe_id"])
+        return {"id": r["id"], "vars": r.get("vars", {}), **requirements(r)}
+    if op == "render":
+        from ir_cues.renderer import compose_render
+
+        ids = args.get("recipe_ids") or [args["recipe_id"]]
+        recs = [loader.load_recipe(rid) for rid in ids]
+        return list(compose_render(recs, args.get("vars") or {},
+                                   format=args.get("format", "text")))
+    if op == "commands":
+        from ir_cues.renderer import compose_commands
+
+        ids = args.get("recipe_ids") or [args["recipe_id"]]
+        recs = [loader.load_recipe(rid) for rid in ids]
+        seq = compose_commands(recs, args.get("vars") or {},
+                               variant=args.get("variant"),
+                               require_vars=bool(args.get("require_vars")))
+        return list(itertools.islice(seq, args["head"]) if args.get("head") else seq)
+    raise ValueError(f"unknown op '{op}'")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            req = json.loads(line)
+            if req.get("op") == "shutdown":
+                self.wfile.write(b'{"ok": true, "result": null}\n')
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            with self.server.state.lock:
+                result = handle(self.server.state, req.get("op"), req.get("args") or {})
+                reply = {"ok": True, "result": result}
+        except Exception as e:
+            reply = {"ok": False, "type": type(e).__name__, "error": str(e),
+                     "chain": getattr(e, "chain", None)}
+        self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path: str = None):
+    """Listen on `path` until interrupted (or a `shutdown` request arrives)."""
+    path = path or socket_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path):
+        try:
+            _request(path, "ping", {})
+            raise RuntimeError(f"a daemon is already listening on {path}")
+        except DaemonUnavailable:
+            os.unlink(path)  # stale socket from a daemon that died
+
+    server = _Server(path, _Handler)
+    server.state = _State()
+    server.state.refresh()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# ---- client side ----
+
+def _request(path: str, op: str, args: dict):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError as e:
+        sock.close()
+        raise DaemonUnavailable(str(e))
+    try:
+        with sock:
+            sock.settimeout(None)
+            sock.sendall((json.dumps({"op": op, "args": args}) + "\n").encode("utf-8"))
+            with sock.makefile("rb") as fh:
+                line = fh.readline()
+    except OSError as e:  # daemon went away mid-request (e.g. shutting down)
+        raise DaemonUnavailable(str(e))
+    if not line:
+        raise DaemonUnavailable("daemon closed the connection")
+    reply = json.loads(line)
+    if reply.get("ok"):
+        return reply.get("result")
+    if reply.get("type") == "FileNotFoundError":
+        raise FileNotFoundError(reply["error"])
+    if reply.get("type") == "IncludeCycleError":
+        from ir_cues.plan import IncludeCycleError
+        raise IncludeCycleError(reply.get("chain") or [])
+    raise RuntimeError(f"daemon: {reply.get('type')}: {reply.get('error')}")
+
+
+def request(op: str, **args):
+    """Send `op` to the running daemon; raises DaemonUnavailable if there is none."""
+    if not enabled():
+        raise DaemonUnavailable("daemon disabled")
+    path = socket_path()
+    if not os.path.exists(path):
+        raise DaemonUnavailable("no socket")
+    return _request(path, op, args)
+
+
+def start(wait: float = 5.0) -> int:
+    """Start a background daemon for the current recipe directory; return its pid."""
+    import subprocess
+    import time
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "ir_cues.daemon",
+         "--socket", socket_path(), "--recipes", loader.RECIPES_DIR],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        try:
+            return request("ping")["pid"]
+        except DaemonUnavailable:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.05)
+    raise RuntimeError("daemon did not come up")
+
+
+def stop(wait: float = 5.0) -> bool:
+    """Ask the daemon to exit and wait for its socket to go away."""
+    import time
+
+    try:
+        request("shutdown")
+    except DaemonUnavailable:
+        return False
+    deadline = time.monotonic() + wait
+    while os.path.exists(socket_path()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return True
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="ir_cues resident daemon")
+    ap.add_argument("--socket", default=None)
+    ap.add_argument("--recipes", default=None)
+    args = ap.parse_args(argv)
+    if args.recipes:
+        loader.RECIPES_DIR = args.recipes
+    serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
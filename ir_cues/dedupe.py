@@ -0,0 +1,182 @@
+#ir_cues/dedupe.py
+
+"""
+Near-duplicate command detection across the corpus (`ir_cues dedupe`).
+
+Every `render` template is whitespace-normalised and cut into character
+shingles. A one-permutation MinHash signature per command is split into LSH
+bands, so only commands that share a band bucket (same variant) become candidate
+pairs. Each
+candidate's shingle-set Jaccard similarity is then checked exactly, and
+confirmed pairs are merged into clusters. Work grows with the number of
+commands plus candidates, not with all pairs.
+"""
+
+import re
+import zlib
+
+from ir_cues import loader
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(command: str) -> str:
+    return _SPACE.sub(" ", command).strip()
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> frozenset:
+    if len(text) <= k:
+        return frozenset([text])
+    return frozenset(text[i:i + k] for i in range(len(text) - k + 1))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+_MASK = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15  # 64-bit golden-ratio multiplier spreads crc32 over all bits
+
+
+def minhash(shingle_set, num_perm: int = NUM_PERM) -> tuple:
+    """
+    One-permutation MinHash: each shingle is hashed once and lands in one of
+    `num_perm` bins, keeping the minimum per bin. Empty bins borrow from the next
+    filled bin (rotation densification) so short commands still get full signatures.
+    """
+    bins = [None] * num_perm
+    for s in shingle_set:
+        h = (zlib.crc32(s.encode("utf-8")) * _MIX) & _MASK
+        b, v = h % num_perm, h // num_perm
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+    for i in range(num_perm):
+        if bins[i] is None:
+            for step in range(1, num_perm):
+                v = bins[(i + step) % num_perm]
+                if v is not None:
+                    bins[i] = (v, step)
+                    break
+    return tuple(bins)
+
+
+def lsh_params(num_perm: int, threshold: float):
+    """
+    (bands, rows) with bands * rows == num_perm whose S-curve midpoint sits just
+    below `threshold`.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        # prefer recall: penalise a midpoint above the threshold twice as much
+        cost = (midpoint - threshold) * (2 if midpoint > threshold else 1)
+        if best is None or abs(cost) < best[0]:
+            best = (abs(cost), bands, rows)
+    return best[1], best[2]
+
+
+def corpus_commands(records=None):
+    """[(recipe id, step number, variant, command)] for every render template."""
+    records = loader.load_index() if records is None else records
+    out = []
+    for rec in records:
+        if "error" in rec:
+            continue
+        for i, step in enumerate(rec.get("steps") or [], start=1):
+            block = step.get("render") if isinstance(step, dict) else None
+            if isinstance(block, dict):
+                for variant, template in block.items():
+                    if isinstance(template, str) and template.strip():
+                        out.append((rec["id"], i, variant, template))
+    return out
+
+
+def find_clusters(commands, threshold: float = 0.8, num_perm: int = NUM_PERM):
+    """
+    Group near-duplicate commands. `commands` is a list of (id, step, variant, command).
+    Returns clusters (lists of command indexes, plus min/max confirmed similarity),
+    biggest first.
+    """
+    bands, rows = lsh_params(num_perm, threshold)
+    sets = [shingles(normalize(c[3])) for c in commands]
+    buckets = {}
+    for idx, (cmd, sh) in enumerate(zip(commands, sets)):
+        sig = minhash(sh, num_perm)
+        for band in range(bands):
+            key = (cmd[2], band, sig[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(idx)
+
+    parent = list(range(len(commands)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    edges, checked = {}, set()
+
+    def confirm(a, b):
+        pair = (a, b) if a < b else (b, a)
+        if pair in checked:
+            return pair in edges
+        checked.add(pair)
+        sim = jaccard(sets[a], sets[b])
+        if sim >= threshold:
+            edges[pair] = sim
+            parent[find(a)] = find(b)
+            return True
+        return False
+
+    for members in buckets.values():
+        # star around the first member, falling back to neighbours: linear per bucket
+        head = members[0]
+        for prev, idx in zip(members, members[1:]):
+            if find(idx) == find(head):
+                continue
+            if not confirm(head, idx):
+                confirm(prev, idx)
+
+    groups, sims = {}, {}
+    for idx in range(len(commands)):
+        groups.setdefault(find(idx), []).append(idx)
+    for (a, _), sim in edges.items():
+        sims.setdefault(find(a), []).append(sim)
+    clusters = [
+        {"members": members,
+         "min_similarity": min(sims[root]),
+         "max_similarity": max(sims[root])}
+        for root, members in groups.items() if len(members) > 1
+    ]
+    clusters.sort(key=lambda c: (-len(c["members"]), -c["max_similarity"],
+                                 c["members"][0]))
+    return clusters
+
+
+def dedupe_report(threshold: float = 0.8, num_perm: int = NUM_PERM) -> dict:
+    commands = corpus_commands()
+    clusters = find_clusters(commands, threshold=threshold, num_perm=num_perm)
+    return {
+        "commands": len(commands),
+        "threshold": threshold,
+        "clusters": [
+            {
+                "size": len(c["members"]),
+                "min_similarity": round(c["min_similarity"], 3),
+                "max_similarity": round(c["max_similarity"], 3),
+                "members": [
+                    {"id": commands[i][0], "step": commands[i][1],
+                     "variant": commands[i][2], "command": commands[i][3].strip()}
+                    for i in c["members"]
+                ],
+            }
+            for c in clusters
+        ],
+    }
@@ -0,0 +1,246 @@
+#ir_cues/export.py
+
+"""
+Static Markdown / HTML export of the whole corpus (`ir_cues export`).
+
+Every recipe is rendered with the defaults of its ``vars:`` block into
+``DIR/<id>.md`` (or ``.html``). Renders run on a process pool.
+``DIR/search-index.json`` lists id, title, tags and page path for every recipe,
+and ``DIR/index.md`` (or ``index.html``, with a filter box) links them all.
+
+``DIR/.export-manifest.json`` records, for each page, the content hash of
+every recipe file it was rendered from (its own and each transitively
+included one) and the variables it was rendered with. The next export
+re-renders a page only when one of those changed, and removes pages of
+recipes that are gone.
+"""
+
+import html
+import json
+import os
+
+from ir_cues import loader
+
+EXPORT_VERSION = 2
+POOL_THRESHOLD = 32  # fewer stale pages than this are rendered in-process
+MANIFEST = ".export-manifest.json"
+SEARCH_INDEX = "search-index.json"
+FORMATS = ("md", "html")
+
+
+def _includes(doc: dict) -> set:
+    out = set()
+    for step in doc.get("steps") or []:
+        for kind in ("include", "include_step"):
+            inc = step.get(kind) if isinstance(step, dict) else None
+            if isinstance(inc, dict) and inc.get("id"):
+                out.add(str(inc["id"]))
+    return out
+
+
+def dependencies(docs: dict, hashes: dict) -> dict:
+    """
+    {id: {dep id: file sha1 or None}} over each recipe and everything it
+    includes, at any depth.
+    """
+    edges = {rid: _includes(doc) for rid, doc in docs.items()}
+    out = {}
+    for rid in docs:
+        seen, todo = {rid}, [rid]
+        while todo:
+            for dst in edges.get(todo.pop(), ()):
+                if dst not in seen:
+                    seen.add(dst)
+                    todo.append(dst)
+        out[rid] = {dep: hashes.get(dep) for dep in sorted(seen)}
+    return out
+
+
+def default_vars(doc: dict) -> dict:
+    """{name: default} for the variables in `doc`'s ``vars:`` block that declare one."""
+    specs = doc.get("vars")
+    if not isinstance(specs, dict):
+        return {}
+    return {k: spec["default"] for k, spec in specs.items()
+            if isinstance(spec, dict) and "default" in spec}
+
+
+def page_path(recipe_id: str, format: str):
+    """
+    Page for `recipe_id` relative to the export directory, or None if the id is
+    not a safe path.
+    """
+    parts = recipe_id.split("/")
+    if (any(p in ("", ".", "..") for p in parts) or os.path.isabs(recipe_id)
+            or "\\" in recipe_id):
+        return None
+    return recipe_id + "." + format
+
+
+def _html_body(text: str) -> str:
+    out, code, buf = [], None, []
+    for line in text.splitlines():
+        if code is not None:
+            if line == "```":
+                lang = html.escape(code)
+                body = html.escape("\n".join(buf))
+                out.append(f'<pre><code class="language-{lang}">{body}</code></pre>')
+                code, buf = None, []
+            else:
+                buf.append(line)
+        elif line.startswith("```"):
+            code = line[3:]
+        elif line.startswith("# "):
+            tag = "h2" if out else "h1"  # included playbooks start with their own title
+            out.append(f"<{tag}>{html.escape(line[2:])}</{tag}>")
+        elif line.strip():
+            out.append(f"<p>{html.escape(line)}</p>")
+    return "\n".join(out)
+
+
+def _page(title: str, body: str, depth: int) -> str:
+    home = "../" * depth + "index.html"
+    return ('<!doctype html>\n<html><head><meta charset="utf-8">'
+            f'<title>{html.escape(title)}</title></head>\n'
+            f'<body><nav><a href="{home}">All playbooks</a></nav>\n'
+            f'{body}\n</body></html>\n')
+
+
+def _write(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+def _init_worker(recipes_dir: str):
+    from ir_cues import templating
+
+    loader.RECIPES_DIR = recipes_dir
+    templating.hold_saves()  # only the parent persists the template-variable cache
+
+
+def render_page(job):
+    """Render one recipe into its page; return (id, error or None)."""
+    from ir_cues.renderer import render_recipe
+
+    recipe_id, format, path = job
+    try:
+        doc = loader.load_recipe(recipe_id)
+        text = render_recipe(doc, default_vars(doc), format="md")
+        if format == "html":
+            text = _page(doc.get("title", recipe_id), _html_body(text),
+                         recipe_id.count("/"))
+        _write(path, text + ("" if text.endswith("\n") else "\n"))
+    except Exception as e:
+        return recipe_id, str(e)
+    return recipe_id, None
+
+
+def _index_page(records: list, format: str) -> str:
+    if format == "md":
+        lines = ["# Playbooks", ""]
+        lines += [f"- [{r['id']}]({r['path']}) — {r['title']}" for r in records]
+        return "\n".join(lines) + "\n"
+    def item(r):
+        hay = " ".join([r["id"], r["title"], *r["tags"]]).casefold()
+        return (f'<li data-hay="{html.escape(hay)}">'
+                f'<a href="{html.escape(r["path"])}">{html.escape(r["id"])}</a>'
+                f' — {html.escape(r["title"])}</li>')
+
+    items = "\n".join(item(r) for r in records)
+    script = ("<script>document.getElementById('q').oninput=function(e){"
+              "var t=e.target.value.toLowerCase().split(/\\s+/);"
+              "document.querySelectorAll('li').forEach(function(li){li.hidden=!t.every("
+              "function(w){return li.dataset.hay.indexOf(w)>=0})})}</script>")
+    body = ('<h1>Playbooks</h1>\n<input id="q" placeholder="Filter" autofocus>\n'
+            f'<ul>\n{items}\n</ul>\n{script}')
+    return ('<!doctype html>\n<html><head><meta charset="utf-8">'
+            '<title>Playbooks</title></head>\n'
+            f'<body>{body}</body></html>\n')
+
+
+def export(out_dir: str, format: str = "md", workers: int = 0,
+           force: bool = False) -> dict:
+    """Export every recipe under the current sources to `out_dir`; return a summary."""
+    if format not in FORMATS:
+        raise ValueError(f"unknown format '{format}' ({'|'.join(FORMATS)})")
+    entries, _ = loader.scan()
+    docs, hashes = {}, {}
+    for entry in entries.values():
+        doc = entry.get("doc") if "error" not in entry else None
+        if (isinstance(doc, dict) and isinstance(doc.get("id"), str)
+                and doc["id"] not in docs):
+            docs[doc["id"]] = doc
+            hashes[doc["id"]] = entry.get("sha1")
+    deps = dependencies(docs, hashes)
+
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as fh:
+            old = json.load(fh)
+    except (OSError, ValueError):
+        old = {}
+    if (force or old.get("export_version") != EXPORT_VERSION
+            or old.get("format") != format):
+        old = {}
+    old_pages = old.get("pages", {})
+
+    pages, todo, errors = {}, [], {}
+    for rid in docs:
+        path = page_path(rid, format)
+        if path is None:
+            errors[rid] = "id is not a safe file path"
+            continue
+        pages[rid] = {"path": path, "deps": deps[rid], "vars": default_vars(docs[rid])}
+        prev = old_pages.get(rid)
+        if prev != pages[rid] or not os.path.exists(os.path.join(out_dir, path)):
+            todo.append((rid, format, os.path.join(out_dir, path)))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) >= POOL_THRESHOLD:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(loader.RECIPES_DIR,)) as pool:
+            results = list(pool.map(render_page, todo,
+                                    chunksize=max(1, len(todo) // (workers * 4))))
+    else:
+        from ir_cues.templating import held_saves
+
+        with held_saves():
+            results = [render_page(job) for job in todo]
+    failed = {rid: error for rid, error in results if error}
+    for rid in failed:
+        del pages[rid]  # left out of the manifest, so it is retried next time
+    errors.update(failed)
+
+    removed = 0
+    for rid, prev in old_pages.items():
+        # the path is recomputed from the id, so a stale manifest cannot point
+        # outside out_dir
+        if rid not in docs and page_path(rid, format) == prev.get("path"):
+            try:
+                os.unlink(os.path.join(out_dir, prev["path"]))
+                removed += 1
+            except OSError:
+                pass
+
+    records = []
+    for rid in sorted(pages):
+        tags = docs[rid].get("tags")
+        tags = [str(t) for t in tags] if isinstance(tags, list) else []
+        records.append({"id": rid, "title": str(docs[rid].get("title", "")),
+                        "tags": tags, "path": pages[rid]["path"]})
+    _write(os.path.join(out_dir, SEARCH_INDEX),
+           json.dumps(records, ensure_ascii=False, indent=1) + "\n")
+    _write(os.path.join(out_dir, "index." + format), _index_page(records, format))
+    manifest = {"export_version": EXPORT_VERSION, "format": format, "pages": pages}
+    _write(manifest_path, json.dumps(manifest, separators=(",", ":")))
+    return {
+        "dir": os.path.abspath(out_dir),
+        "pages": len(pages),
+        "rendered": len(todo) - len(failed),
+        "unchanged": len(pages) - (len(todo) - len(failed)),
+        "removed": removed,
+        "errors": errors,
+    }
@@ -0,0 +1,263 @@
+#ir_cues/lint.py
+
+"""
+Corpus validator behind `ir_cues lint`.
+
+Each recipe file is parsed once and checked on its own (schema, id/path
+agreement, Jinja syntax) across a process pool. Results are cached per file by
+content hash, so later runs only recheck files that changed. Checks that need
+the whole corpus (duplicate ids, include targets, include cycles, duplicate
+commands) run afterwards over small per-file summaries.
+"""
+
+import hashlib
+import os
+
+from ir_cues import cache, loader
+
+LINT_VERSION = 1
+POOL_THRESHOLD = 64  # fewer changed files than this are checked in-process
+
+
+def _issue(code, message, path=None, rid=None, step=None, severity="error"):
+    return {"severity": severity, "code": code, "path": path, "id": rid, "step": step,
+            "message": message}
+
+
+def _expected_id(rel: str) -> str:
+    return os.path.splitext(rel)[0]
+
+
+def _syntax_error(env, source):
+    try:
+        env.parse(source)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def check_file(job):
+    """
+    Check one file in isolation. `job` is (relpath, path).
+    Returns {"issues": [...], "facts": {...}}; facts feed the corpus-wide checks.
+    """
+    import jinja2
+
+    rel, path = job
+    env = jinja2.Environment()
+    issues = []
+    with open(path, "rb") as fh:
+        entry = loader._parse_bytes(fh.read())
+    if "error" in entry:
+        issue = _issue("E001", f"YAML parse error: {entry['error']}", rel)
+        return {"issues": [issue], "facts": None}
+    doc = entry["doc"]
+    if not isinstance(doc, dict):
+        issue = _issue("E002", "recipe is not a mapping", rel)
+        return {"issues": [issue], "facts": None}
+
+    rid = doc.get("id")
+    if not isinstance(rid, str) or not rid.strip():
+        issues.append(_issue("E003", "missing 'id'", rel))
+        rid = None
+    elif rid.strip() != _expected_id(rel):
+        issues.append(_issue("E004", "id must match path "
+                                     f"(expected '{_expected_id(rel)}')", rel, rid))
+
+    steps = doc.get("steps")
+    if not isinstance(steps, list) or not steps:
+        issues.append(_issue("E005", "'steps' must be a non-empty list", rel, rid))
+        steps = []
+
+    facts = {"id": rid, "steps": [], "includes": [], "commands": []}
+    for i, step in enumerate(steps, start=1):
+        if not isinstance(step, dict):
+            issues.append(_issue("E006", "step is not a mapping", rel, rid, i))
+            facts["steps"].append({"name": None, "variants": []})
+            continue
+        render = step.get("render")
+        variants = list(render) if isinstance(render, dict) else []
+        facts["steps"].append({"name": step.get("name"), "variants": variants})
+        if not any(k in step for k in ("render", "include", "include_step")):
+            issues.append(_issue("E006", "step has neither 'render' nor 'include' "
+                                         "nor 'include_step'", rel, rid, i))
+
+        if "render" in step:
+            block = step["render"]
+            if not isinstance(block, dict) or not block:
+                issues.append(_issue("E007", "'render' must be a non-empty mapping",
+                                     rel, rid, i))
+                block = {}
+            for variant, template in block.items():
+                if not isinstance(template, str) or not template.strip():
+                    issues.append(_issue("E007", f"variant '{variant}' is empty",
+                                         rel, rid, i))
+                    continue
+                err = _syntax_error(env, template)
+                if err:
+                    issues.append(_issue("E008", f"variant '{variant}': Jinja syntax "
+                                                 f"error: {err}", rel, rid, i))
+                lines = template.strip().splitlines()
+                norm = "\n".join(line.rstrip() for line in lines)
+                facts["commands"].append([i, variant, norm])
+
+        for kind in ("include", "include_step"):
+            if kind not in step:
+                continue
+            inc = step[kind]
+            if not isinstance(inc, dict) or not inc.get("id"):
+                issues.append(_issue("E009", f"'{kind}' needs an 'id'", rel, rid, i))
+                continue
+            if kind == "include_step" and "step" not in inc:
+                issues.append(_issue("E009", "'include_step' needs a 'step'",
+                                     rel, rid, i))
+                continue
+            for k, v in (inc.get("vars") or {}).items():
+                err = _syntax_error(env, str(v))
+                if err:
+                    issues.append(_issue("E008", f"{kind} var '{k}': Jinja syntax "
+                                                 f"error: {err}", rel, rid, i))
+            facts["includes"].append({"step": i, "kind": kind, "id": inc["id"],
+                                      "selector": inc.get("step"),
+                                      "variant": inc.get("variant")})
+    return {"issues": issues, "facts": facts}
+
+
+def _find_cycles(graph: dict) -> list:
+    """Each include cycle in `graph` (id -> [child ids]) once, as an id chain."""
+    cycles, seen, state = [], set(), {}  # state: 1 = on the DFS path, 2 = done
+    for start in sorted(graph):
+        if state.get(start):
+            continue
+        path, iters = [start], [iter(graph[start])]
+        state[start] = 1
+        while iters:
+            child = next(iters[-1], None)
+            if child is None:
+                state[path.pop()] = 2
+                iters.pop()
+            elif state.get(child) == 1:
+                chain = path[path.index(child):] + [child]
+                if frozenset(chain) not in seen:
+                    seen.add(frozenset(chain))
+                    cycles.append(chain)
+            elif child in graph and not state.get(child):
+                state[child] = 1
+                path.append(child)
+                iters.append(iter(graph[child]))
+    return cycles
+
+
+def corpus_issues(results: dict) -> list:
+    """Cross-file checks over per-file facts.
+
+    `results` maps relpath -> check_file() output.
+    """
+    issues = []
+    by_id = {}
+    for rel in sorted(results):
+        facts = results[rel]["facts"]
+        if facts and facts["id"]:
+            if facts["id"] in by_id:
+                first = by_id[facts["id"]][0]
+                issues.append(_issue("E013", f"duplicate id (also in {first})",
+                                     rel, facts["id"]))
+            else:
+                by_id[facts["id"]] = (rel, facts)
+
+    graph = {}
+    seen_cmds = {}
+    for rid, (rel, facts) in sorted(by_id.items()):
+        graph[rid] = []
+        for inc in facts["includes"]:
+            target = by_id.get(inc["id"])
+            if target is None:
+                issues.append(_issue("E010", f"{inc['kind']} target '{inc['id']}' "
+                                             "not found", rel, rid, inc["step"]))
+                continue
+            if inc["kind"] == "include":
+                graph[rid].append(inc["id"])
+                continue
+            steps, sel = target[1]["steps"], inc["selector"]
+            if isinstance(sel, int):
+                sub = steps[sel - 1] if 1 <= sel <= len(steps) else None
+            else:
+                sub = next((s for s in steps if s["name"] == sel), None)
+            if sub is None:
+                issues.append(_issue("E011", f"include_step: step {sel!r} not found "
+                                             f"in '{inc['id']}'",
+                                     rel, rid, inc["step"]))
+            elif not sub["variants"]:
+                issues.append(_issue("E011", f"include_step: step {sel!r} of "
+                                             f"'{inc['id']}' has no render block",
+                                     rel, rid, inc["step"]))
+            elif inc["variant"] and inc["variant"] not in sub["variants"]:
+                issues.append(_issue("E011", "include_step: variant "
+                                             f"'{inc['variant']}' not in step {sel!r} "
+                                             f"of '{inc['id']}'",
+                                     rel, rid, inc["step"]))
+
+        for step_no, variant, cmd in facts["commands"]:
+            key = (variant, cmd)
+            if key in seen_cmds:
+                other = seen_cmds[key]
+                issues.append(_issue("E014", f"duplicate {variant} command "
+                                             f"(also {other[0]} step {other[1]})",
+                                     rel, rid, step_no))
+            else:
+                seen_cmds[key] = (rid, step_no)
+
+    for chain in _find_cycles(graph):
+        rel = by_id[chain[0]][0]
+        issues.append(_issue("E012", "include cycle: " + " -> ".join(chain),
+                             rel, chain[0]))
+    return issues
+
+
+def lint(root=None, workers: int = 0, use_cache: bool = True) -> dict:
+    """Validate the corpus under `root`; return a JSON-able report."""
+    root = root or loader.RECIPES_DIR
+    cache_file = cache.cache_path("lint", root)
+    use_cache = use_cache and cache.cache_enabled()
+    old = (cache.read_json(cache_file) or {}) if use_cache else {}
+    old_files = old.get("files", {}) if old.get("lint_version") == LINT_VERSION else {}
+
+    results, digests, todo = {}, {}, []
+    for rel, path in loader._iter_recipe_files(root):
+        with open(path, "rb") as fh:
+            digests[rel] = hashlib.sha1(fh.read()).hexdigest()
+        prev = old_files.get(rel)
+        if prev and prev.get("sha1") == digests[rel]:
+            results[rel] = prev["result"]
+        else:
+            todo.append((rel, path))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) >= POOL_THRESHOLD:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            checked = pool.map(check_file, todo,
+                               chunksize=max(1, len(todo) // (workers * 4)))
+            results.update((rel, res) for (rel, _), res in zip(todo, checked))
+    else:
+        results.update((rel, check_file((rel, path))) for rel, path in todo)
+
+    if use_cache and (todo or set(old_files) != set(results)):
+        cache.write_json(cache_file, {
+            "lint_version": LINT_VERSION,
+            "files": {rel: {"sha1": digests[rel], "result": results[rel]}
+                      for rel in results},
+        })
+
+    issues = [i for rel in sorted(results) for i in results[rel]["issues"]]
+    issues += corpus_issues(results)
+    return {
+        "root": os.path.abspath(root),
+        "files": len(results),
+        "checked": len(todo),
+        "cached": len(results) - len(todo),
+        "errors": sum(1 for i in issues if i["severity"] == "error"),
+        "warnings": sum(1 for i in issues if i["severity"] == "warning"),
+        "issues": issues,
+    }
@@ -1,34 +1,694 @@
 #ir_cues/loader.py
 
+import functools
+import hashlib
+import json
 import os
-import yaml
+from collections.abc import Mapping
 
-RECIPES_DIR = os.path.join(os.path.dirname(__file__), "recipes")
+from ir_cues import cache, timing
 
-def load_index():
-    """Return a list of all available recipes with metadata."""
+# a recipe tree, or a bundle file built by `ir_cues bundle build`
+RECIPES_DIR = (os.environ.get("IR_CUES_RECIPES")
+               or os.path.join(os.path.dirname(__file__), "recipes"))
+
+# parsed documents kept per process, shared by load_recipe() and the renderers
+DOC_CACHE_SIZE = 1024
+
+# a pack root holding this file with a "version" is read-only: its cached index is
+# reused without walking the tree until the version changes
+PACK_MANIFEST = "pack.json"
+
+# layout of the index cache files; older ones are rebuilt
+INDEX_VERSION = 3
+
+# heap bytes per recipe a warm index_records() scan may peak at
+# (tests/test_index_cache.py)
+SCAN_MEMORY_BUDGET = 2048
+
+_id_maps = {}   # source roots -> {recipe id: file path}
+_scanned = {}   # root -> (pack version, entries) from the last scan in this process
+_sources = {}   # (IR_CUES_PATH, config file, RECIPES_DIR) -> roots
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_loader():
+    """
+    Safe YAML loader that keeps timestamps as plain strings so docs stay JSON-clean.
+    PyYAML is imported here so a warm index never pays for it.
+    """
+    import yaml
+
+    base = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    resolvers = {
+        ch: [(tag, rx) for tag, rx in rs if tag != "tag:yaml.org,2002:timestamp"]
+        for ch, rs in base.yaml_implicit_resolvers.items()
+    }
+    return type("RecipeLoader", (base,), {"yaml_implicit_resolvers": resolvers})
+
+
+def config_path() -> str:
+    """
+    ``IR_CUES_CONFIG``, or ``$XDG_CONFIG_HOME/ir_cues/config.ini``
+    (``~/.config/ir_cues/config.ini``).
+    """
+    env = os.environ.get("IR_CUES_CONFIG")
+    if env:
+        return env
+    base = (os.environ.get("XDG_CONFIG_HOME")
+            or os.path.join(os.path.expanduser("~"), ".config"))
+    return os.path.join(base, "ir_cues", "config.ini")
+
+
+def _config_roots(path: str) -> list:
+    """
+    The ``paths`` of the config file's ``[sources]`` section, one per line;
+    relative to the file.
+    """
+    if not os.path.isfile(path):
+        return []
+    import configparser
+
+    parser = configparser.ConfigParser()
+    try:
+        parser.read(path, encoding="utf-8")
+    except configparser.Error as e:
+        raise ValueError(f"{path}: {e}")
+    base = os.path.dirname(os.path.abspath(path))
+    lines = parser.get("sources", "paths", fallback="").splitlines()
+    return [os.path.normpath(os.path.join(base, os.path.expanduser(p.strip())))
+            for p in lines if p.strip()]
+
+
+def sources() -> list:
+    """
+    Recipe roots, highest precedence first: the ``IR_CUES_PATH`` entries
+    (os.pathsep-separated), then the config file's ``[sources]`` paths, then
+    RECIPES_DIR. A recipe file in an earlier root hides the file at the same
+    relative path (and so the same id) in later roots.
+    """
+    key = (os.environ.get("IR_CUES_PATH", ""), config_path(), RECIPES_DIR)
+    roots = _sources.get(key)
+    if roots is None:
+        roots, seen = [], set()
+        candidates = [os.path.expanduser(p) for p in key[0].split(os.pathsep) if p]
+        for root in candidates + _config_roots(key[1]) + [RECIPES_DIR]:
+            if os.path.abspath(root) not in seen:
+                seen.add(os.path.abspath(root))
+                roots.append(root)
+        roots = _sources[key] = roots
+    return roots
+
+
+def corpus_key(roots=None) -> str:
+    """One string naming a set of roots, for per-corpus caches (one root: itself)."""
+    return os.pathsep.join(os.path.abspath(r) for r in roots or sources())
+
+
+def _pack_version(root: str):
+    """
+    The version declared in `root`'s pack manifest, or None for a tree that is
+    rechecked every run.
+    """
+    try:
+        with open(os.path.join(root, PACK_MANIFEST), "rb") as fh:
+            version = json.load(fh).get("version")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return None if version is None else str(version)
+
+
+def _walk(top: str, prefix: str):
+    """Yield (relpath, DirEntry) for recipe files under `top`, in os.walk order."""
+    try:
+        it = os.scandir(top)
+    except OSError:
+        return
+    dirs = []
+    with it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not entry.is_symlink():
+                    dirs.append(entry)
+            elif entry.name.endswith((".yaml", ".yml")):
+                yield prefix + entry.name, entry
+    for d in dirs:
+        yield from _walk(d.path, prefix + d.name + "/")
+
+
+def _iter_recipe_files(root):
+    """Yield (relpath, path) for every recipe file under `root`."""
+    for rel, entry in _walk(root, ""):
+        yield rel, entry.path
+
+
+def _parse_bytes(data: bytes) -> dict:
+    """Parse raw recipe bytes into a cache entry: {"doc": ...} or {"error": ...}."""
+    timing.count("files_parsed")
+    try:
+        import yaml
+
+        with timing.span("yaml_parse"):
+            return {"doc": yaml.load(data.decode("utf-8"), Loader=_yaml_loader())}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def packed_source(root):
+    """
+    The open Bundle or SQLite Store when `root` is a file rather than a directory,
+    else None. Both serve `entries()`, `doc(id)` and `summaries()`.
+    """
+    if not os.path.isfile(root):
+        return None
+    from ir_cues import store
+
+    if store.is_store(root):
+        return store.open_store(root)
+    from ir_cues import bundle
+
+    return bundle.open_bundle(root)
+
+
+@functools.lru_cache(maxsize=8)
+def _open_packed(cls, path: str, mtime_ns: int, size: int):
+    return cls(path)
+
+
+def open_packed(cls, path: str):
+    """The shared ``cls(path)`` (Bundle or Store); reopened if the file changes."""
+    st = os.stat(path)
+    return _open_packed(cls, path, st.st_mtime_ns, st.st_size)
+
+
+def scan(root=None, rebuild=False):
+    """
+    Bring the on-disk index caches up to date and return (entries, stats).
+
+    Without `root` every source is scanned (in parallel when there are several)
+    and merged, earlier sources winning. Entries are keyed by path relative to
+    their root. A file is reparsed only when its mtime/size changed *and* its
+    content hash differs from the cached one. Bundles and databases need no
+    cache: their entries decode documents on first access.
+    """
+    with timing.span("scan"):
+        scans = _scan_each([root] if root else sources(), rebuild)
+        if len(scans) == 1:
+            entries, stats = scans[0]
+        else:
+            entries, stats = {}, dict.fromkeys(scans[0][1], 0)
+            for part, st in scans:
+                for rel, entry in part.items():
+                    entries.setdefault(rel, entry)
+                for k in stats:
+                    stats[k] += st[k]
+    timing.count("index_files", stats["files"])
+    timing.count("index_cache_hits", stats["hits"] + stats["rehashed"])
+    return entries, stats
+
+
+def _scan_each(roots, rebuild=False) -> list:
+    """[(entries, stats)] per root, in order; each root has its own cache file."""
+    if len(roots) == 1:
+        return [_scan_root(roots[0], rebuild)]
+    from concurrent.futures import ThreadPoolExecutor
+
+    # stat/read calls release the GIL, so slow filesystems overlap
+    with ThreadPoolExecutor(max_workers=min(len(roots), 8)) as pool:
+        return list(pool.map(lambda r: _scan_root(r, rebuild), roots))
+
+
+def _meta(doc):
+    """[id, title, tags, variants, step count] of a non-empty mapping, else None."""
+    if not isinstance(doc, dict) or not doc:
+        return None
+    steps = doc.get("steps") if isinstance(doc.get("steps"), list) else []
+    variants = set()
+    for step in steps:
+        if isinstance(step, dict) and isinstance(step.get("render"), dict):
+            variants.update(str(v) for v in step["render"])
+    return [doc.get("id"), doc.get("title", ""), doc.get("tags", []),
+            sorted(variants), len(steps)]
+
+
+class LazyMapping(Mapping):
+    """
+    Read-only mapping over slots. The key set may differ per instance
+    (`_keys`), and values may be computed on access (`_value`, by default
+    the attribute of the same name). Scan entries and index records pass
+    for plain dicts this way without holding one.
+    """
+
+    __slots__ = ()
+
+    def _keys(self) -> tuple:
+        raise NotImplementedError
+
+    def _value(self, key):
+        return getattr(self, key)
+
+    def __getitem__(self, key):
+        if key not in self._keys():
+            raise KeyError(key)
+        return self._value(key)
+
+    def __contains__(self, key):
+        return key in self._keys()
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+
+_UNREAD = object()
+
+
+class _Docs:
+    """
+    One root's docs cache: a SQLite file of documents keyed by content hash.
+    Scans add only the documents they parsed; entries read theirs one at a time.
+    """
+
+    def __init__(self, root: str):
+        self.root, self._db, self._pid = root, None, None
+
+    def _conn(self):
+        import sqlite3
+
+        if self._pid != os.getpid():  # a forked worker opens its own connection
+            path = cache.cache_path("docs", self.root, ext="db")
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS docs "
+                                 "(sha1 TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+            except (OSError, sqlite3.Error):
+                self._db = None
+            self._pid = os.getpid()
+        return self._db
+
+    def get(self, sha1: str):
+        """The cached document with content hash `sha1`, or _UNREAD."""
+        import sqlite3
+
+        db = self._conn()
+        try:
+            row = db and db.execute("SELECT doc FROM docs WHERE sha1 = ?",
+                                    (sha1,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        return json.loads(row[0]) if row else _UNREAD
+
+    def update(self, docs: dict, live=None):
+        """Store `docs` ({sha1: doc}) and, given the `live` hashes, drop all others."""
+        import sqlite3
+
+        db = self._conn()
+        if db is None:
+            return
+        rows = [(s, json.dumps(doc, separators=(",", ":"))) for s, doc in docs.items()]
+        try:
+            with db:
+                db.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?)", rows)
+                if live is not None:
+                    stored = db.execute("SELECT sha1 FROM docs").fetchall()
+                    stale = [row for row in stored if row[0] not in live]
+                    db.executemany("DELETE FROM docs WHERE sha1 = ?", stale)
+        except (TypeError, ValueError, sqlite3.Error):
+            pass  # the cache is best effort; entries fall back to their files
+
+
+class _Entry(LazyMapping):
+    """
+    A scan entry: ``stamp``, ``sha1``, then ``meta`` (see `_meta`) and ``doc``, or
+    ``error``. Entries read from the index cache load ``doc`` from the docs cache
+    on first access.
+    """
+
+    __slots__ = ("stamp", "sha1", "meta", "error", "_doc", "_docs", "_rel")
+
+    def __init__(self, stamp, sha1, meta=None, error=None, doc=_UNREAD,
+                 docs=None, rel=None):
+        self.stamp, self.sha1, self.meta, self.error = stamp, sha1, meta, error
+        self._doc, self._docs, self._rel = doc, docs, rel
+
+    @classmethod
+    def parse(cls, stamp, sha1, data: bytes):
+        parsed = _parse_bytes(data)
+        doc = parsed.get("doc")
+        if "error" in parsed:
+            return cls(stamp, sha1, error=parsed["error"])
+        if doc and not isinstance(doc, dict):
+            return cls(stamp, sha1, error="recipe is not a mapping")
+        return cls(stamp, sha1, _meta(doc), doc=doc or None)
+
+    def _keys(self):
+        if self.error is not None:
+            return ("stamp", "sha1", "error")
+        return ("stamp", "sha1", "meta", "doc")
+
+    def _value(self, key):
+        if key != "doc":
+            return getattr(self, key)
+        if self._doc is _UNREAD:
+            self._doc = None if self.meta is None else self._docs.get(self.sha1)
+            if self._doc is _UNREAD:
+                self._reload()
+        return self._doc
+
+    def _reload(self):
+        """
+        The docs cache lacks this entry's document: parse the file if it still has
+        the scanned content, else take on what the file holds now (nothing if it
+        was removed) so meta and doc agree. The next scan picks up the change.
+        """
+        path = os.path.join(self._docs.root, self._rel)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except OSError:
+            self.meta, self._doc = None, None
+            return
+        digest = hashlib.sha1(data).hexdigest()
+        fresh = _Entry.parse(self.stamp, digest, data)
+        if digest == self.sha1:
+            self._docs.update({digest: fresh._doc})
+        self.meta, self.error = fresh.meta, fresh.error
+        self._doc = None if fresh.error is not None else fresh._doc
+
+    def loaded_doc(self):
+        """The document if it is already in memory, else None."""
+        return None if self._doc is _UNREAD else self._doc
+
+    def restamped(self, stamp):
+        return _Entry(stamp, self.sha1, self.meta, self.error,
+                      self._doc, self._docs, self._rel)
+
+    def to_json(self) -> dict:
+        if self.error is not None:
+            return {"stamp": self.stamp, "sha1": self.sha1, "error": self.error}
+        return {"stamp": self.stamp, "sha1": self.sha1, "meta": self.meta}
+
+
+def _scan_root(root, rebuild=False):
+    packed = packed_source(root)
+    if packed is not None:
+        entries = packed.entries()
+        n = len(entries)
+        return entries, {"files": n, "hits": n, "rehashed": 0, "parsed": 0,
+                         "removed": 0}
+    path = cache.cache_path("index", root)
+    use_cache = cache.cache_enabled()
+    version = _pack_version(root)
+    if rebuild or not use_cache:
+        old, old_version = {}, None
+    elif root in _scanned:
+        # long-lived processes skip rereading the cache file
+        old_version, old = _scanned[root]
+    else:
+        data = cache.read_json(path) or {}
+        if data.get("index_version") != INDEX_VERSION:
+            data = {}
+        docs = _Docs(root)
+        old = {rel: _Entry(e["stamp"], e["sha1"], e.get("meta"), e.get("error"),
+                           docs=docs, rel=rel)
+               for rel, e in (data.get("files") or {}).items()}
+        old_version = data.get("pack_version")
+    if version is not None and version == old_version and old:
+        _scanned[root] = (version, old)
+        return old, {"files": len(old), "hits": len(old),
+                     "rehashed": 0, "parsed": 0, "removed": 0}
+
+    entries, stats = {}, {"files": 0, "hits": 0, "rehashed": 0, "parsed": 0,
+                          "removed": 0}
+    parsed = []
+    for rel, dirent in _walk(root, ""):
+        stats["files"] += 1
+        fpath = dirent.path
+        try:
+            st = dirent.stat()
+        except OSError:
+            continue
+        stamp = [st.st_mtime_ns, st.st_size]
+        prev = old.get(rel)
+        if prev and prev.stamp == stamp:
+            entries[rel] = prev
+            stats["hits"] += 1
+            continue
+        with open(fpath, "rb") as fh:
+            data = fh.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if prev and prev.sha1 == digest:
+            entries[rel] = prev.restamped(stamp)
+            stats["rehashed"] += 1
+            continue
+        entries[rel] = _Entry.parse(stamp, digest, data)
+        parsed.append(entries[rel])
+        stats["parsed"] += 1
+
+    stats["removed"] = len(set(old) - set(entries))
+    if use_cache and (stats["parsed"] or stats["rehashed"] or stats["removed"]
+                      or rebuild or not old or version != old_version):
+        if parsed or stats["removed"]:
+            # step bodies live in their own store so metadata scans never read them;
+            # only this scan's new documents are written, and dropped ones pruned
+            docs = {e.sha1: e.loaded_doc() for e in parsed if e.meta is not None}
+            _Docs(root).update(docs, live={e.sha1 for e in entries.values()})
+        files = {rel: e.to_json() for rel, e in entries.items()}
+        cache.write_json(path, {"root": os.path.abspath(root),
+                                "index_version": INDEX_VERSION,
+                                "pack_version": version, "files": files})
+    if use_cache:
+        _scanned[root] = (version, entries)
+    return entries, stats
+
+
+def doc_records(entries: dict) -> list:
+    """Index records for scan entries.
+
+    Each is ``{"id": ..., **doc}``, or ``{"id": file, "error": ...}`` for a broken file.
+    """
     index = []
-    for root, _, files in os.walk(RECIPES_DIR):
-        for f in files:
-            if f.endswith(".yaml") or f.endswith(".yml"):
-                path = os.path.join(root, f)
-                with open(path, "r", encoding="utf-8") as fh:
-                    try:
-                        doc = yaml.safe_load(fh)
-                        if doc:
-                            index.append({"id": doc.get("id", f), **doc})
-                    except Exception as e:
-                        index.append({"id": f, "error": str(e)})
+    for rel, entry in entries.items():
+        f = rel.rsplit("/", 1)[-1]
+        if "error" in entry:
+            index.append({"id": f, "error": entry["error"]})
+        elif isinstance(entry.get("doc"), dict) and entry["doc"]:
+            doc = entry["doc"]
+            index.append({"id": doc.get("id", f), **doc})
+        elif entry.get("doc"):
+            index.append({"id": f, "error": "recipe is not a mapping"})
     return index
 
+
+class IndexRecord(LazyMapping):
+    """
+    One recipe of the index without its steps: id, title, tags, path (relative to
+    its source), variants and step count, or id (the file name) and error.
+    Reads like the summary dict ``{"id", "title", "tags"}`` or ``{"id", "error"}``;
+    `doc()` loads the full recipe.
+    """
+
+    __slots__ = ("id", "title", "tags", "path", "variants", "steps", "error")
+
+    def __init__(self, id, path, title="", tags=(), variants=(), steps=0, error=None):
+        self.id, self.path, self.title, self.tags = id, path, title, tags
+        self.variants, self.steps, self.error = variants, steps, error
+
+    def _keys(self):
+        return ("id", "error") if self.error is not None else ("id", "title", "tags")
+
+    def __repr__(self):
+        return f"IndexRecord({dict(self)!r})"
+
+    def doc(self) -> dict:
+        return load_recipe(self.id)
+
+
+def index_records(entries: dict = None) -> list:
+    """
+    IndexRecords for scan `entries` (default: all sources) in index order, without
+    loading step bodies.
+    """
+    if entries is None:
+        entries, _ = scan()
+    index = []
+    for rel, entry in entries.items():
+        f = rel.rsplit("/", 1)[-1]
+        if "error" in entry:
+            index.append(IndexRecord(f, rel, error=entry["error"]))
+            continue
+        meta = entry.meta  # every source's entries carry it, so no document is decoded
+        if meta is None:
+            if entry.get("doc"):
+                index.append(IndexRecord(f, rel, error="recipe is not a mapping"))
+            continue
+        rid, title, tags, variants, steps = meta
+        index.append(IndexRecord(f if rid is None else rid, rel,
+                                 title, tags, variants, steps))
+    return index
+
+
+def load_index():
+    """Return a list of all available recipes with metadata."""
+    entries, _ = scan()
+    return doc_records(entries)
+
+
+def recipe_summaries() -> list:
+    """
+    Summary mappings (id/title/tags, or id/error) for every recipe: `IndexRecord`s,
+    or plain dicts straight from a lone bundle's or database's metadata.
+    """
+    roots = sources()
+    packed = packed_source(roots[0]) if len(roots) == 1 else None
+    if packed is not None:
+        return packed.summaries()
+    return index_records()
+
+
+def rebuild_index() -> dict:
+    """
+    Drop the cached index of every source (vendor packs too), reparse everything
+    and return scan stats.
+    """
+    _, stats = scan(rebuild=True)
+    return stats
+
+
+def index_stats() -> dict:
+    """Describe the cached index of each source (refreshing them first)."""
+    entries, stats = scan()
+    roots = []
+    for root in sources():
+        path = cache.cache_path("index", root)
+        roots.append({
+            "root": root,
+            "pack_version": _pack_version(root),
+            "cache_file": (path if cache.cache_enabled() and packed_source(root) is None
+                           else None),
+            "cache_bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+        })
+    return {
+        "root": RECIPES_DIR,
+        "sources": roots,
+        "recipes": sum(1 for r in index_records(entries) if r.error is None),
+        "errors": sum(1 for e in entries.values() if "error" in e),
+        **stats,
+    }
+
+
+@functools.lru_cache(maxsize=DOC_CACHE_SIZE)
+def _parse_file(path: str, mtime_ns: int, size: int) -> dict:
+    with open(path, "rb") as fh:
+        return _parse_bytes(fh.read())
+
+
+def _read_doc(path: str, root: str = None):
+    """
+    Parsed document for `path`: the entry from this process's last scan of `root`
+    when the file still has its stamp, else from the LRU while the file is unchanged.
+    """
+    st = os.stat(path)
+    if root in _scanned:
+        entry = _scanned[root][1].get(os.path.relpath(path, root).replace(os.sep, "/"))
+        if (entry and entry.get("stamp") == [st.st_mtime_ns, st.st_size]
+                and entry.loaded_doc() is not None):
+            return entry.loaded_doc()
+    entry = _parse_file(path, st.st_mtime_ns, st.st_size)
+    if "error" in entry:
+        raise ValueError(f"Recipe file {path} failed to parse: {entry['error']}")
+    return entry["doc"]
+
+
+def _id_map(roots: list, refresh: bool = False) -> dict:
+    """
+    Map recipe id -> file path across the directory `roots` (earlier roots win),
+    built once per process.
+    """
+    key = corpus_key(roots)
+    if refresh or key not in _id_maps:
+        # packed roots are looked up by id directly
+        trees = [r for r in roots if packed_source(r) is None]
+        ids = {}
+        for root, (entries, _) in zip(trees, _scan_each(trees) if trees else []):
+            for rel, e in entries.items():
+                if e.meta is not None and isinstance(e.meta[0], str):
+                    ids.setdefault(e.meta[0], os.path.join(root, rel))
+        _id_maps[key] = ids
+    return _id_maps[key]
+
+
+def invalidate():
+    """Forget the id maps, after files were added or removed or an id changed."""
+    _id_maps.clear()
+
+
+def clear_caches():
+    """Forget the per-process source list, id map, scan results and parsed documents."""
+    _sources.clear()
+    _id_maps.clear()
+    _scanned.clear()
+    _parse_file.cache_clear()
+    _open_packed.cache_clear()
+
+
+def _path_for_id(root: str, recipe_id: str):
+    """Conventional location of `recipe_id` (ids mirror paths), or None."""
+    parts = recipe_id.split("/")
+    if (not recipe_id or os.path.isabs(recipe_id)
+            or any(p in ("", ".", "..") for p in parts)):
+        return None
+    for ext in (".yaml", ".yml"):
+        path = os.path.join(root, *parts) + ext
+        if os.path.isfile(path):
+            return path
+    return None
+
+
 def load_recipe(recipe_id: str):
-    """Load a single recipe by id or filename."""
-    for root, _, files in os.walk(RECIPES_DIR):
-        for f in files:
-            if f.endswith((".yaml", ".yml")):
-                path = os.path.join(root, f)
-                with open(path, "r", encoding="utf-8") as fh:
-                    doc = yaml.safe_load(fh)
-                    if doc and doc.get("id") == recipe_id:
-                        return doc
-    raise FileNotFoundError(f"Recipe '{recipe_id}' not found in {RECIPES_DIR}")
\ No newline at end of file
+    """
+    Load a single recipe by id.
+
+    Ids normally mirror the file path, so that file is tried in each source in
+    turn; otherwise the per-process id map is consulted (and rebuilt once if it
+    looks stale).
+    Returned documents are cached and shared: treat them as read-only.
+    """
+    timing.count("load_recipe")
+    with timing.span("load_recipe"):
+        return _load_recipe(recipe_id)
+
+
+def _load_recipe(recipe_id: str):
+    roots = sources()
+    for root in roots:
+        packed = packed_source(root)
+        if packed is not None:
+            doc = packed.doc(recipe_id)
+            if doc is not None:
+                return doc
+            continue
+        path = _path_for_id(root, recipe_id)
+        if path:
+            doc = _read_doc(path, root)
+            if isinstance(doc, dict) and doc.get("id") == recipe_id:
+                return doc
+    attempts = (False,) if corpus_key(roots) not in _id_maps else (False, True)
+    for refresh in attempts:
+        path = _id_map(roots, refresh=refresh).get(recipe_id)
+        if path:
+            try:
+                doc = _read_doc(path)
+            except (OSError, ValueError):
+                continue
+            if isinstance(doc, dict) and doc.get("id") == recipe_id:
+                return doc
+    raise FileNotFoundError(f"Recipe '{recipe_id}' not found in "
+                            f"{os.pathsep.join(roots)}")
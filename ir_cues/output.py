@@ -0,0 +1,85 @@
+#ir_cues/output.py
+
+"""
+Plain writers for command plans (`dry-run --format`, `--output FILE`).
+
+Items are the dicts `renderer.iter_commands` yields. They are written straight
+to a buffered text stream with no markup parsing, wrapping or measuring, so
+``[...]`` in PowerShell survives and large plans stay I/O-bound. Rich is only
+used for an interactive terminal.
+
+    jsonl   one JSON object per line
+    json    one JSON array (streamed, one object per line)
+    plain   numbered headers, each command indented below its header
+    sh      a shell script; commands of non-shell variants and notes are commented out
+    md      markdown checklist
+"""
+
+import json
+
+FORMATS = ("text", "md", "jsonl", "json", "plain", "sh")
+SHELL_VARIANTS = ("bash", "sh", "zsh")
+
+
+def _header(i: int, item: dict) -> str:
+    return f"{i}. {item['id']} — {item['step']} ({item['variant']})"
+
+
+def _jsonl(out, seq):
+    n = 0
+    for n, item in enumerate(seq, 1):
+        out.write(json.dumps(item, ensure_ascii=False) + "\n")
+    return n
+
+
+def _json(out, seq):
+    n = 0
+    out.write("[")
+    for n, item in enumerate(seq, 1):
+        sep = "\n  " if n == 1 else ",\n  "
+        out.write(sep + json.dumps(item, ensure_ascii=False))
+    out.write("\n]\n" if n else "]\n")
+    return n
+
+
+def _plain(out, seq):
+    n = 0
+    for n, item in enumerate(seq, 1):
+        body = "\n".join("    " + line for line in item["command"].splitlines())
+        out.write(f"{_header(n, item)}\n{body}\n\n")
+    return n
+
+
+def _sh(out, seq):
+    n = 0
+    out.write("#!/bin/sh\n")
+    for n, item in enumerate(seq, 1):
+        cmd = item["command"]
+        if item["variant"] not in SHELL_VARIANTS:
+            cmd = "\n".join("# " + line for line in cmd.splitlines())
+        out.write(f"\n# {_header(n, item)}\n{cmd}\n")
+    return n
+
+
+def _md(out, seq, recipe_ids):
+    n = 0
+    out.write("# Plan for " + ", ".join(f"`{rid}`" for rid in recipe_ids) + "\n\n")
+    for n, item in enumerate(seq, 1):
+        out.write(f"**{n}. {item['id']} — {item['step']}**  \n*{item['variant']}*\n\n"
+                  f"```\n{item['command']}\n```\n\n")
+    out.write(f"\nTotal: {n} commands.\n")
+    return n
+
+
+def write_plan(out, seq, format: str, recipe_ids=()) -> int:
+    """
+    Write the plan items in `seq` to `out` as `format` (any of FORMATS but text);
+    return how many.
+    """
+    if format == "md":
+        return _md(out, seq,
+                   [recipe_ids] if isinstance(recipe_ids, str) else recipe_ids)
+    writer = {"jsonl": _jsonl, "json": _json, "plain": _plain, "sh": _sh}.get(format)
+    if writer is None:
+        raise ValueError(f"unknown format '{format}' ({'|'.join(FORMATS)})")
+    return writer(out, seq)
@@ -0,0 +1,363 @@
+#ir_cues/plan.py
+
+"""
+Execution plans: a recipe's include tree resolved once and flattened.
+
+`compile_plan()` walks `include` / `include_step` steps, loads every child recipe,
+selects included steps and compiles every template, producing an immutable
+`Plan`. Plans are cached per recipe id (and reused when the same sub-recipe is
+included from several playbooks), so rendering only has to bind variables.
+
+Include `vars` are expressions over the includer's variables, so they cannot be
+pre-rendered. Each include opens a `Scope` holding those compiled expressions;
+`bind()` evaluates all scopes for one set of vars.
+
+Plans also record which variants and variables every command and include
+subtree (`Block`) needs, so `skips()` can drop whole subtrees that cannot yield
+a wanted command before anything is rendered.
+"""
+
+from typing import NamedTuple, Optional
+
+from ir_cues import timing
+from ir_cues.loader import load_recipe as _load_recipe
+from ir_cues.templating import compile_template, save_template_vars, template_vars
+
+TEXT = "text"        # a line only render_recipe prints (title, step heading, hint, ...)
+COMMAND = "command"  # a template to render
+NOTE = "note"        # a failed/empty step, reported by both renderers
+
+
+class IncludeCycleError(ValueError):
+    """A recipe includes itself, directly or through other recipes."""
+
+    def __init__(self, chain):
+        self.chain = list(chain)
+        super().__init__("Include cycle: " + " -> ".join(self.chain))
+
+
+class Scope(NamedTuple):
+    parent: Optional[int]  # index of the including scope (None for the root)
+    bindings: tuple        # ((name, template or Exception), ...) from include `vars`
+    fmt: Optional[str]     # include `format` override (None inherits)
+    needs: tuple = ()      # required variables of each binding, aligned with `bindings`
+
+
+class Entry(NamedTuple):
+    kind: str
+    scope: int
+    recipe_id: str = ""
+    step: str = ""
+    variant: str = ""
+    template: object = None  # compiled template, or the exception compiling it raised
+    text: str = ""           # TEXT/NOTE line as render_recipe prints it
+    note: str = ""           # NOTE command as collect_commands reports it
+    needs: frozenset = frozenset()  # COMMAND: required variables, in its scope
+
+
+class Block(NamedTuple):
+    """The entries spliced in by one include / include_step."""
+    start: int
+    end: int                  # one past the last entry
+    scope: int                # the include's scope
+    variants: frozenset       # variants of its commands, plus "note" if it reports any
+    floor: Optional[frozenset]  # variables all its commands need, in includer terms
+
+
+class Plan(NamedTuple):
+    recipe_id: str
+    scopes: tuple
+    entries: tuple
+    deps: tuple  # ((recipe id, document or MISSING), ...) for every included recipe
+    blocks: tuple = ()
+    variants: frozenset = frozenset()   # every variant (and "note") the plan can yield
+    needs: frozenset = frozenset()      # variables some command requires
+    optional: frozenset = frozenset()   # variables only read through `| default(...)`
+    floor: Optional[frozenset] = None   # variables every command requires (None: none)
+
+
+_plans = {}  # recipe id -> (document, Plan)
+
+MISSING = object()  # in Plan.deps: the include failed to load, so recheck it
+
+
+def clear_cache():
+    _plans.clear()
+
+
+def select_step(doc: dict, selector):
+    steps = doc.get("steps", [])
+    if isinstance(selector, int):
+        idx = selector - 1
+        if idx < 0 or idx >= len(steps):
+            raise IndexError(f"Step {selector} out of range (1..{len(steps)})")
+        return steps[idx]
+    if isinstance(selector, str):
+        for st in steps:
+            if st.get("name") == selector:
+                return st
+        raise KeyError(f"Step named '{selector}' not found")
+    raise TypeError("step selector must be int (1-based) or str (step name)")
+
+
+def _compile(source):
+    try:
+        return compile_template(source)
+    except Exception as e:
+        return e
+
+
+def _refs(source):
+    """(required, optional) variables of a template source."""
+    if not isinstance(source, str):
+        return frozenset(), frozenset()
+    return template_vars(source)
+
+
+def _bindings(inc: dict) -> tuple:
+    return tuple((k, _compile(str(v))) for k, v in (inc.get("vars") or {}).items())
+
+
+def _binding_needs(inc: dict) -> dict:
+    return {k: _refs(str(v))[0] for k, v in (inc.get("vars") or {}).items()}
+
+
+def _translate(names, bound: dict) -> frozenset:
+    """Variables needed in the includer's scope to provide `names` inside an include."""
+    return frozenset().union(*(bound[n] if n in bound else (n,) for n in names))
+
+
+def _fresh(plan: Plan) -> bool:
+    """True while every include still loads the same document (or still fails to)."""
+    for dep_id, dep_doc in plan.deps:
+        try:
+            doc = _load_recipe(dep_id)
+        except Exception:
+            doc = MISSING
+        if doc is not dep_doc:
+            return False
+    return True
+
+
+def _plan_for(doc: dict, stack: tuple) -> Plan:
+    rid = doc.get("id", "<unknown>")
+    if rid in stack:
+        raise IncludeCycleError(stack[stack.index(rid):] + (rid,))
+    hit = _plans.get(rid)
+    if hit and hit[0] is doc and _fresh(hit[1]):
+        plan = hit[1]
+        for dep_id, _ in plan.deps:
+            if dep_id in stack:
+                raise IncludeCycleError(stack[stack.index(dep_id):] + (rid, dep_id))
+        timing.count("plan_cache_hits")
+        return plan
+    timing.count("plans_built")
+    timing.peak("include_depth", len(stack))
+    with timing.span("plan_build", id=rid):
+        plan = _build(doc, stack + (rid,))
+    _plans[rid] = (doc, plan)
+    return plan
+
+
+def _build(doc: dict, stack: tuple) -> Plan:
+    rid = doc.get("id", "<unknown>")
+    scopes = [Scope(None, (), None)]
+    entries = [Entry(TEXT, 0, rid, text=f"# {doc.get('title', rid)}\n")]
+    deps = {}
+    blocks, variants, needs, optional = [], set(), set(), set()
+    floor = None
+
+    def note(step_name, text, command):
+        entries.append(Entry(NOTE, 0, rid, step_name, "note", text=text, note=command))
+        variants.add("note")
+
+    def meet(required):
+        nonlocal floor
+        floor = required if floor is None else floor & required
+
+    for i, step in enumerate(doc.get("steps", []), start=1):
+        name = step.get("name") or step.get("title") or f"Step {i}"
+        entries.append(Entry(TEXT, 0, rid, name, text=f"[{i}] {name}"))
+
+        if "render" in step:
+            for variant, template in step["render"].items():
+                req, opt = _refs(template)
+                entries.append(Entry(COMMAND, 0, rid, name, variant, _compile(template),
+                                     needs=req))
+                variants.add(variant)
+                needs.update(req)
+                optional.update(opt)
+                meet(req)
+
+        elif "include" in step:
+            inc = step["include"]
+            child_id = inc["id"]
+            child_doc = MISSING
+            try:
+                child_doc = _load_recipe(child_id)
+                child = _plan_for(child_doc, stack)
+            except IncludeCycleError:
+                raise
+            except Exception as e:
+                deps[child_id] = child_doc
+                note(name, f"[!] Failed to include {child_id}: {e}",
+                     f"# include failed {child_id}: {e}")
+            else:
+                deps[child_id] = child_doc
+                deps.update(child.deps)
+                # splice the child in; its root scope becomes this include's scope
+                offset, start = len(scopes), len(entries)
+                bound = _binding_needs(inc)
+                for j, s in enumerate(child.scopes):
+                    if j == 0:
+                        scopes.append(Scope(0, _bindings(inc), inc.get("format"),
+                                            tuple(bound.values())))
+                    else:
+                        scopes.append(s._replace(parent=s.parent + offset))
+                entries.extend(e._replace(scope=e.scope + offset)
+                               for e in child.entries)
+                child_floor = (None if child.floor is None
+                               else _translate(child.floor, bound))
+                blocks.append(Block(start, len(entries), offset, child.variants,
+                                    child_floor))
+                blocks.extend(b._replace(start=b.start + start, end=b.end + start,
+                                         scope=b.scope + offset) for b in child.blocks)
+                variants.update(child.variants)
+                needs.update(_translate(child.needs, bound))
+                optional.update(n for n in child.optional if n not in bound)
+                if child_floor is not None:
+                    meet(child_floor)
+
+        elif "include_step" in step:
+            inc = step["include_step"]
+            child_id = inc["id"]
+            only_variant = inc.get("variant")
+            child_doc = MISSING
+            try:
+                child_doc = _load_recipe(child_id)
+                sub = select_step(child_doc, inc["step"])
+                if "render" not in sub or not isinstance(sub["render"], dict):
+                    raise ValueError("selected step has no render block")
+                picked = sub["render"]
+                if only_variant:
+                    picked = {only_variant: picked[only_variant]}
+            except Exception as e:
+                deps[child_id] = child_doc
+                note(name, f"[!] Failed to include step from {child_id}: {e}",
+                     f"# include_step failed {child_id}: {e}")
+            else:
+                deps[child_id] = child_doc
+                scope, start = len(scopes), len(entries)
+                bound = _binding_needs(inc)
+                scopes.append(Scope(0, _bindings(inc), inc.get("format"),
+                                    tuple(bound.values())))
+                sub_name = sub.get("name") or "Step?"
+                block_floor = None
+                for variant, template in picked.items():
+                    req, opt = _refs(template)
+                    entries.append(Entry(COMMAND, scope, child_id, sub_name, variant,
+                                         _compile(template), needs=req))
+                    outer = _translate(req, bound)
+                    block_floor = outer if block_floor is None else block_floor & outer
+                    needs.update(outer)
+                    optional.update(n for n in opt if n not in bound)
+                    meet(outer)
+                blocks.append(Block(start, len(entries), scope, frozenset(picked),
+                                    block_floor))
+                variants.update(picked)
+
+        else:
+            note(name, "[!] Step has neither 'render', 'include', nor 'include_step'.",
+                 "# no render/include/include_step")
+
+        if "hint" in step:
+            entries.append(Entry(TEXT, 0, rid, name, text=f"Hint: {step['hint']}"))
+        if "next" in step:
+            entries.append(Entry(TEXT, 0, rid, name,
+                                 text="Next pivots: " + ", ".join(step["next"])))
+        entries.append(Entry(TEXT, 0, rid, name, text=""))
+
+    return Plan(rid, tuple(scopes), tuple(entries), tuple(deps.items()),
+                tuple(blocks), frozenset(variants), frozenset(needs),
+                frozenset(optional - needs), floor)
+
+
+def compile_plan(recipe: dict) -> Plan:
+    """
+    Resolve `recipe`'s include tree into a cached `Plan`.
+    Raises IncludeCycleError if the tree includes a recipe from inside itself.
+    """
+    plan = _plan_for(recipe, ())
+    save_template_vars()
+    return plan
+
+
+def render_entry(entry: Entry, vars: dict) -> str:
+    """Render one COMMAND entry; raises whatever rendering (or compiling) raised."""
+    if isinstance(entry.template, Exception):
+        raise entry.template
+    return entry.template.render(**vars)
+
+
+def available(plan: Plan, vars: dict) -> list:
+    """
+    Per scope, the variable names that are provided: by the caller, or by an
+    include binding whose own required variables are provided.
+    """
+    out = []
+    for s in plan.scopes:
+        if s.parent is None:
+            out.append(frozenset(vars))
+            continue
+        base = out[s.parent]
+        names = {k for k, _ in s.bindings}
+        ok = {k for (k, _), need in zip(s.bindings, s.needs) if need <= base}
+        out.append((base - names) | ok)
+    return out
+
+
+def skips(plan: Plan, variant: str = None, have: list = None) -> dict:
+    """
+    {start: end} of include blocks that cannot yield a command of `variant`, or
+    (with `have` from `available()`) whose commands all lack a required variable.
+    """
+    notes_wanted = not variant or variant == "note"
+    out = {}
+    for b in plan.blocks:
+        if variant and variant not in b.variants:
+            out[b.start] = max(out.get(b.start, 0), b.end)
+        elif (have is not None and b.floor is not None
+              and not b.floor <= have[plan.scopes[b.scope].parent]
+              and not (notes_wanted and "note" in b.variants)):
+            out[b.start] = max(out.get(b.start, 0), b.end)
+    return out
+
+
+def requirements(recipe: dict) -> dict:
+    """Variables and variants a playbook needs, including everything it includes."""
+    plan = compile_plan(recipe)
+    return {
+        "needs": sorted(plan.needs),
+        "optional": sorted(plan.optional),
+        "variants": sorted(plan.variants - {"note"}),
+    }
+
+
+def bind(plan: Plan, vars: dict, format: str = "text"):
+    """Return (vars, format) per scope of `plan` for the caller's vars and format."""
+    scope_vars, scope_fmt = [], []
+    for s in plan.scopes:
+        if s.parent is None:
+            base, fmt = vars, format
+        else:
+            base, fmt = scope_vars[s.parent], scope_fmt[s.parent]
+        if s.bindings:
+            rendered = {}
+            for k, t in s.bindings:
+                if isinstance(t, Exception):
+                    raise t
+                rendered[k] = t.render(**base)
+            base = {**base, **rendered}
+        scope_vars.append(base)
+        scope_fmt.append(s.fmt if s.fmt is not None else fmt)
+    return scope_vars, scope_fmt
@@ -1,160 +1,130 @@
-from ir_cues.loader import load_recipe as _load_recipe
-import jinja2
+from ir_cues import timing
+from ir_cues.plan import (
+    COMMAND,
+    NOTE,
+    available,
+    bind,
+    compile_plan,
+    render_entry,
+    skips,
+)
+
+
+def iter_commands(recipe: dict, vars: dict, variant: str = None,
+                  require_vars: bool = False, seen: set = None):
+    """
+    Yield the commands to run, in order, as they are rendered.
+    Each item: dict(id, step, variant, command).
+    With `variant`, other variants are skipped without being rendered; with
+    `require_vars`, so are commands whose required variables are not provided.
+    Include subtrees with nothing left to yield are skipped whole.
+    Items whose (id, step, variant, command) is already in `seen` are dropped; new
+    ones are added.
+    """
+    with timing.span("plan"):
+        plan = compile_plan(recipe)
+        scope_vars, _ = bind(plan, vars)
+        have = available(plan, vars) if require_vars else None
+        jumps = skips(plan, variant, have)
+
+    entries, i = plan.entries, 0
+    while i < len(entries):
+        if i in jumps:
+            timing.count("blocks_skipped")
+            i = jumps[i]
+            continue
+        e = entries[i]
+        i += 1
+        if e.kind == COMMAND:
+            if variant and e.variant != variant:
+                continue
+            if have is not None and not e.needs <= have[e.scope]:
+                continue
+            try:
+                with timing.span("render"):
+                    cmd = render_entry(e, scope_vars[e.scope]).strip()
+            except Exception as ex:
+                cmd = f"# ERROR rendering template: {ex}"
+            if cmd and _first(seen, (e.recipe_id, e.step, e.variant, cmd)):
+                yield {"id": e.recipe_id, "step": e.step, "variant": e.variant,
+                       "command": cmd}
+        elif e.kind == NOTE:
+            if variant and variant != "note":
+                continue
+            if _first(seen, (e.recipe_id, e.step, "note", e.note)):
+                yield {"id": e.recipe_id, "step": e.step, "variant": "note",
+                       "command": e.note}
+
+
+def _first(seen, key) -> bool:
+    """True unless `key` was already seen (always True without a `seen` set)."""
+    if seen is None:
+        return True
+    if key in seen:
+        return False
+    seen.add(key)
+    return True
+
+
+def compose_commands(recipes, vars: dict, variant: str = None,
+                     require_vars: bool = False):
+    """
+    iter_commands() over several recipes as one plan. Includes they share are
+    expanded from the same cached plans, and an identical (id, step, variant,
+    command) item is yielded once, where it is first seen.
+    """
+    seen = set()
+    for recipe in recipes:
+        yield from iter_commands(recipe, vars, variant=variant,
+                                 require_vars=require_vars, seen=seen)
+
 
-def collect_commands(recipe: dict, vars: dict, _stack=None):
+def collect_commands(recipe: dict, vars: dict):
     """
     Return a flat sequence of commands to run, in order.
     Each item: dict(id, step, variant, command).
-    Expands include and include_step.
+    Expands include and include_step (via the recipe's cached plan).
     """
-    _stack = _stack or []
-    rid = recipe.get("id", "<unknown>")
-    if rid in _stack:
-        return []  # prevent recursion
-    _stack = _stack + [rid]
-
-    seq = []
-    for i, step in enumerate(recipe.get("steps", []), start=1):
-        step_name = step.get("name") or step.get("title") or f"Step {i}"
-
-        if "render" in step:
-            for variant, template in step["render"].items():
-                try:
-                    cmd = jinja2.Template(template).render(**vars).strip()
-                except Exception as e:
-                    cmd = f"# ERROR rendering template: {e}"
-                if cmd:
-                    seq.append({"id": rid, "step": step_name, "variant": variant, "command": cmd})
-
-        elif "include" in step:
-            inc = step["include"]
-            child_id = inc["id"]
-            # inherit vars, then override
-            child_vars = {**vars}
-            for k, v in (inc.get("vars") or {}).items():
-                child_vars[k] = jinja2.Template(str(v)).render(**vars)
-            try:
-                child = _load_recipe(child_id)
-                seq.extend(collect_commands(child, child_vars, _stack=_stack))
-            except Exception as e:
-                seq.append({"id": rid, "step": step_name, "variant": "note", "command": f"# include failed {child_id}: {e}"})
-
-        elif "include_step" in step:
-            inc = step["include_step"]
-            child_id = inc["id"]
-            selector = inc["step"]
-            only_variant = inc.get("variant")
-            child_vars = {**vars}
-            for k, v in (inc.get("vars") or {}).items():
-                child_vars[k] = jinja2.Template(str(v)).render(**vars)
+    return list(iter_commands(recipe, vars))
 
-            try:
-                child = _load_recipe(child_id)
-                # select step
-                steps = child.get("steps", [])
-                if isinstance(selector, int):
-                    idx = selector - 1
-                    sub = steps[idx]
-                else:
-                    sub = next(s for s in steps if s.get("name") == selector)
-                rblock = sub.get("render") or {}
-                variants = {only_variant: rblock[only_variant]} if only_variant else rblock
-                for variant, template in variants.items():
-                    cmd = jinja2.Template(template).render(**child_vars).strip()
-                    if cmd:
-                        seq.append({"id": child_id, "step": sub.get("name") or f"Step?", "variant": variant, "command": cmd})
-            except Exception as e:
-                seq.append({"id": rid, "step": step_name, "variant": "note", "command": f"# include_step failed {child_id}: {e}"})
-        else:
-            seq.append({"id": rid, "step": step_name, "variant": "note", "command": "# no render/include/include_step"})
-    return seq
 
 def _render_text_block(kind: str, content: str, fmt: str) -> str:
     if fmt == "md":
         return f"```{kind}\n{content}\n```"
     return f"{kind.upper()}:\n{content}"
 
-def _select_step(doc: dict, selector):
-    steps = doc.get("steps", [])
-    if isinstance(selector, int):
-        idx = selector - 1
-        if idx < 0 or idx >= len(steps):
-            raise IndexError(f"Step {selector} out of range (1..{len(steps)})")
-        return steps[idx]
-    if isinstance(selector, str):
-        for st in steps:
-            if st.get("name") == selector:
-                return st
-        raise KeyError(f"Step named '{selector}' not found")
-    raise TypeError("step selector must be int (1-based) or str (step name)")
-
-def render_recipe(recipe: dict, vars: dict, format: str = "text", _stack=None) -> str:
-    _stack = _stack or []
-    rid = recipe.get("id", "<unknown>")
-    if rid in _stack:
-        return f"[!] Cycle detected including {rid}. Skipping.\n"
-    _stack = _stack + [rid]
-
-    out = []
-    title = recipe.get("title", rid)
-    out.append(f"# {title}\n")
-
-    for i, step in enumerate(recipe.get("steps", []), start=1):
-        name = step.get("name") or step.get("title") or f"Step {i}"
-        out.append(f"[{i}] {name}")
-
-        if "render" in step:
-            for variant, template in step["render"].items():
-                try:
-                    rendered = jinja2.Template(template).render(**vars)
-                except Exception as e:
-                    rendered = f"ERROR: {e}"
-                out.append(_render_text_block(variant, rendered, format))
-
-        elif "include" in step:
-            inc = step["include"]
-            child_id = inc["id"]
-            child_vars = {**vars, **{k: jinja2.Template(str(v)).render(**vars)
-                                     for k, v in (inc.get("vars") or {}).items()}}
-            child_fmt = inc.get("format", format)
-            try:
-                child = _load_recipe(child_id)
-                rendered = render_recipe(child, child_vars, child_fmt, _stack=_stack)
-            except Exception as e:
-                rendered = f"[!] Failed to include {child_id}: {e}"
-            out.append(rendered)
-
-        elif "include_step" in step:
-            inc = step["include_step"]
-            child_id = inc["id"]
-            selector = inc["step"]
-            child_fmt = inc.get("format", format)
-            only_variant = inc.get("variant")
-            child_vars = {**vars, **{k: jinja2.Template(str(v)).render(**vars)
-                                     for k, v in (inc.get("vars") or {}).items()}}
-            try:
-                child = _load_recipe(child_id)
-                sub = _select_step(child, selector)
-                if "render" not in sub or not isinstance(sub["render"], dict):
-                    raise ValueError("selected step has no render block")
-                # Render either one variant or all
-                variants = {only_variant: sub["render"][only_variant]} if only_variant else sub["render"]
-                for variant, template in variants.items():
-                    try:
-                        rendered = jinja2.Template(template).render(**child_vars)
-                    except Exception as e:
-                        rendered = f"ERROR: {e}"
-                    out.append(_render_text_block(variant, rendered, child_fmt))
-            except Exception as e:
-                out.append(f"[!] Failed to include step from {child_id}: {e}")
 
+def iter_render(recipe: dict, vars: dict, format: str = "text", seen: set = None):
+    """
+    Yield the blocks of render_recipe() one at a time; command blocks already in
+    `seen` are dropped.
+    """
+    with timing.span("plan"):
+        plan = compile_plan(recipe)
+        scope_vars, scope_fmt = bind(plan, vars, format)
+
+    for e in plan.entries:
+        if e.kind == COMMAND:
+            try:
+                with timing.span("render"):
+                    rendered = render_entry(e, scope_vars[e.scope])
+            except Exception as ex:
+                rendered = f"ERROR: {ex}"
+            if _first(seen, (e.recipe_id, e.step, e.variant, rendered.strip())):
+                yield _render_text_block(e.variant, rendered, scope_fmt[e.scope])
         else:
-            out.append("[!] Step has neither 'render', 'include', nor 'include_step'.")
+            yield e.text
+
+
+def compose_render(recipes, vars: dict, format: str = "text"):
+    """
+    iter_render() over several recipes, each command block rendered once (see
+    compose_commands).
+    """
+    seen = set()
+    for recipe in recipes:
+        yield from iter_render(recipe, vars, format, seen=seen)
 
-        if "hint" in step:
-            out.append(f"Hint: {step['hint']}")
-        if "next" in step:
-            out.append("Next pivots: " + ", ".join(step["next"]))
-        out.append("")
 
-    return "\n".join(out)
\ No newline at end of file
+def render_recipe(recipe: dict, vars: dict, format: str = "text") -> str:
+    return "\n".join(iter_render(recipe, vars, format))
@@ -0,0 +1,301 @@
+#ir_cues/search.py
+
+"""
+Full-text search over the recipe corpus.
+
+Each recipe contributes its id, title, tags, step names, hints and template
+bodies. The index keeps a trigram -> recipes map so `+required` / `-excluded` /
+optional substring terms only verify a handful of candidates, and a word ->
+weighted term frequency map used for BM25 ranking. Both are packed (see
+`cache.pack`) and decoded per term when a query needs them. The built index is
+stored next to the recipe index cache, without the recipe texts, and reused
+until a recipe file changes; a process keeps the one it loaded.
+"""
+
+import bisect
+import hashlib
+import math
+import os
+import re
+
+from ir_cues import cache, loader
+
+SEARCH_VERSION = 2
+
+# how much a word occurrence counts in each field when ranking
+FIELD_WEIGHTS = {"id": 3.0, "title": 3.0, "tags": 2.0,
+                 "steps": 1.5, "hints": 1.0, "body": 1.0}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_WEIGHT = 0.5
+
+_WORD = re.compile(r"\w+")
+
+
+def parse_terms(terms):
+    """Split raw query terms into (required, excluded, optional) casefolded lists."""
+    required, excluded, optional = [], [], []
+    for raw in terms:
+        t = raw.strip()
+        # drop one leading + or -
+        prefix = t[0] if t[:1] in ("+", "-") else ""
+        body = t[1:] if prefix else t
+        # strip surrounding single/double quotes if present
+        if len(body) >= 2 and body[0] == body[-1] and body[0] in ("'", '"'):
+            body = body[1:-1]
+        body = body.casefold()
+        if not body:
+            continue
+        if prefix == "+":
+            required.append(body)
+        elif prefix == "-":
+            excluded.append(body)
+        else:
+            optional.append(body)
+    return required, excluded, optional
+
+
+def recipe_fields(rec: dict) -> dict:
+    """Searchable text of a recipe, per field."""
+    steps, hints, body = [], [], []
+    for step in rec.get("steps") or []:
+        if not isinstance(step, dict):
+            continue
+        for key in ("name", "title"):
+            if step.get(key):
+                steps.append(str(step[key]))
+        if step.get("hint"):
+            hints.append(str(step["hint"]))
+        if isinstance(step.get("render"), dict):
+            body.extend(str(t) for t in step["render"].values())
+        for key in ("include", "include_step"):
+            if isinstance(step.get(key), dict) and step[key].get("id"):
+                steps.append(str(step[key]["id"]))
+    tags = rec.get("tags") or []
+    return {
+        "id": str(rec.get("id", "")),
+        "title": str(rec.get("title", "")),
+        "tags": " ".join(str(t) for t in tags) if isinstance(tags, list) else str(tags),
+        "steps": " ".join(steps),
+        "hints": " ".join(hints),
+        "body": "\n".join(body),
+    }
+
+
+def haystack(rec: dict) -> str:
+    """All searchable text of a recipe, casefolded; substring terms must occur in it."""
+    return " ".join(recipe_fields(rec).values()).casefold()
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _Haystacks:
+    """Haystack per doc number, rebuilt from its scan entry when first checked."""
+
+    def __init__(self, entries: dict, rels: list):
+        self.entries, self.rels, self._hays = entries, rels, {}
+
+    def __getitem__(self, doc_no: int) -> str:
+        hay = self._hays.get(doc_no)
+        if hay is None:
+            rel = self.rels[doc_no]
+            doc = self.entries[rel]["doc"] or {}
+            rec = {"id": doc.get("id", rel.rsplit("/", 1)[-1]), **doc}
+            hay = self._hays[doc_no] = haystack(rec)
+        return hay
+
+
+class SearchIndex:
+    """Inverted index over a list of recipe ids (positions are the doc numbers)."""
+
+    def __init__(self, ids, texts, lengths, postings, trigrams, typecode):
+        self.ids = ids
+        self.texts = texts          # casefolded haystack per doc (see `_Haystacks`)
+        self.lengths = lengths      # weighted word count per doc
+        self.postings = postings    # word -> [packed docs, packed weighted tfs]
+        self.trigrams = trigrams    # trigram -> packed sorted [doc, ...]
+        self.typecode = typecode    # array typecode of the packed doc numbers
+        self.vocab = sorted(postings)
+        self.avg_len = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    @classmethod
+    def build(cls, records):
+        ids, texts, lengths, postings, trigrams = [], [], [], {}, {}
+        for doc_no, rec in enumerate(records):
+            fields = recipe_fields(rec)
+            hay = " ".join(fields.values()).casefold()
+            ids.append(fields["id"])
+            texts.append(hay)
+            length = 0.0
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for word in _WORD.findall(text.casefold()):
+                    tf = postings.setdefault(word, {})
+                    tf[doc_no] = tf.get(doc_no, 0.0) + weight
+                    length += weight
+            lengths.append(length)
+            for gram in _trigrams(hay):
+                trigrams.setdefault(gram, []).append(doc_no)
+        typecode = "H" if len(ids) < 1 << 16 else "I"
+        postings = {w: [cache.pack(p, typecode), cache.pack(p.values(), "f")]
+                    for w, p in postings.items()}
+        trigrams = {g: cache.pack(docs, typecode) for g, docs in trigrams.items()}
+        return cls(ids, texts, lengths, postings, trigrams, typecode)
+
+    def to_json(self) -> dict:
+        """Everything but the texts, which `from_json` takes from the recipes."""
+        return {"ids": self.ids, "lengths": self.lengths, "postings": self.postings,
+                "trigrams": self.trigrams, "typecode": self.typecode}
+
+    @classmethod
+    def from_json(cls, data: dict, texts):
+        return cls(data["ids"], texts, data["lengths"], data["postings"],
+                   data["trigrams"], data["typecode"])
+
+    def _docs(self, gram: str):
+        return cache.unpack(self.trigrams.get(gram, ""), self.typecode)
+
+    def _postings(self, word: str) -> dict:
+        docs, tfs = self.postings[word]
+        return dict(zip(cache.unpack(docs, self.typecode), cache.unpack(tfs, "f")))
+
+    def _containing(self, term: str):
+        """Docs whose haystack contains `term` (word or trigram lookup, then verify)."""
+        if _WORD.fullmatch(term):
+            # a run of word characters only ever occurs inside one indexed word
+            found = set()
+            for word in self.vocab:
+                if term in word:
+                    found.update(cache.unpack(self.postings[word][0], self.typecode))
+            return found
+        grams = _trigrams(term)
+        if not grams:
+            # every haystack is longer than a trigram, so the grams holding a one or
+            # two character term list exactly the docs containing it
+            found = set()
+            for gram in self.trigrams:
+                if term in gram:
+                    found.update(self._docs(gram))
+            return found
+        lists = sorted((self._docs(g) for g in grams), key=len)
+        candidates = set(lists[0])
+        for other in lists[1:]:
+            candidates.intersection_update(other)
+            if not candidates:
+                break
+        if len(term) == 3:
+            return candidates
+        return {d for d in candidates if term in self.texts[d]}
+
+    def _bm25(self, doc_no: int, tf: float, df: int) -> float:
+        n = len(self.ids)
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        rel_len = self.lengths[doc_no] / self.avg_len if self.avg_len else 1
+        norm = 1 - BM25_B + BM25_B * rel_len
+        return idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+    def _score(self, docs, terms):
+        scores = dict.fromkeys(docs, 0.0)
+        for term in terms:
+            for word in set(_WORD.findall(term)):
+                best = {}
+                start = bisect.bisect_left(self.vocab, word)
+                for token in self.vocab[start:]:
+                    if not token.startswith(word):
+                        break
+                    postings = self._postings(token)
+                    weight = 1.0 if token == word else PREFIX_WEIGHT
+                    for d in docs.intersection(postings):
+                        s = weight * self._bm25(d, postings[d], len(postings))
+                        if s > best.get(d, 0.0):
+                            best[d] = s
+                for d, s in best.items():
+                    scores[d] += s
+        return scores
+
+    def query(self, required=(), excluded=(), optional=(), limit=None):
+        """Return [(id, score)] matching the boolean query, best first."""
+        docs = None
+        for term in required:
+            hits = self._containing(term)
+            docs = hits if docs is None else docs & hits
+        if optional:
+            any_opt = set().union(*(self._containing(t) for t in optional))
+            docs = any_opt if docs is None else docs & any_opt
+        if docs is None:
+            docs = set(range(len(self.ids)))
+        for term in excluded:
+            docs -= self._containing(term)
+        scores = self._score(docs, list(required) + list(optional))
+        ranked = sorted(docs, key=lambda d: (-scores[d], d))
+        if limit:
+            ranked = ranked[:limit]
+        return [(self.ids[d], scores[d]) for d in ranked]
+
+
+def fingerprint(entries: dict) -> str:
+    """Hash of every scan entry's path and content; changes with any recipe file."""
+    h = hashlib.sha1()
+    for rel in entries:
+        h.update(f"{rel}\0{entries[rel].get('sha1', '')}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+_loaded = {}  # corpus key -> (fingerprint, SearchIndex) last loaded in this process
+
+
+def load_search_index(root=None, entries=None) -> SearchIndex:
+    """
+    Search index for `root` (default: all sources), reused from the cache while no
+    recipe changed.
+    """
+    # several sources share one index
+    key = os.path.abspath(root) if root else loader.corpus_key()
+    packed = loader.packed_source(key)
+    if hasattr(packed, "query"):
+        return packed  # SQLite store: queries run against its FTS5 table
+    if entries is None:
+        entries, _ = loader.scan(root)
+    digest = fingerprint(entries)
+    if key in _loaded and _loaded[key][0] == digest:
+        return _loaded[key][1]
+    path = cache.cache_path("search", key)
+    data = cache.read_json(path) if cache.cache_enabled() else None
+    fresh = data and data.get("search_version") == SEARCH_VERSION
+    if fresh and data.get("fingerprint") == digest:
+        idx = SearchIndex.from_json(data["index"], _Haystacks(entries, data["rels"]))
+    else:
+        rels, records = [], []
+        for rel in entries:
+            rec = loader.doc_records({rel: entries[rel]})
+            if rec and "error" not in rec[0]:
+                rels.append(rel)
+                records.append(rec[0])
+        idx = SearchIndex.build(records)
+        if cache.cache_enabled():
+            cache.write_json(path, {"root": key, "search_version": SEARCH_VERSION,
+                                    "fingerprint": digest, "rels": rels,
+                                    "index": idx.to_json()})
+    _loaded[key] = (digest, idx)
+    return idx
+
+
+def clear_cache():
+    """Forget the search indexes loaded in this process."""
+    _loaded.clear()
+
+
+def search(terms, limit=None):
+    """
+    Run a raw query (list of terms) and return the matching
+    `loader.IndexRecord`s, best first.
+    """
+    required, excluded, optional = parse_terms(terms)
+    entries, _ = loader.scan()
+    hits = load_search_index(entries=entries).query(required, excluded, optional,
+                                                    limit=limit)
+    by_id = {r["id"]: r for r in loader.index_records(entries)}
+    return [by_id[rid] for rid, _ in hits if rid in by_id]
@@ -0,0 +1,325 @@
+#ir_cues/store.py
+
+"""
+SQLite storage backend (`ir_cues db import`).
+
+The corpus is imported into one SQLite database:
+
+    recipes      one row per recipe file: id, title, tags, sha1, error, JSON document
+    steps        one row per step: name and kind (render / include / include_step)
+    variants     one row per render variant, with its template
+    includes     include / include_step edges (src id -> dst id), indexed by dst
+    recipes_fts  FTS5 table (trigram tokenizer) over the same fields `search` uses
+
+Point ``IR_CUES_RECIPES`` (or ``loader.RECIPES_DIR``) at the database file to
+use it. Lookups and searches then become indexed queries and documents are
+decoded one at a time, so memory stays flat however big the corpus is. Several
+shells can read the same database at once. The connection is read-only.
+YAML stays the authoring format; reimport after editing.
+"""
+
+import functools
+import json
+import os
+import sqlite3
+
+from ir_cues import loader
+
+SCHEMA_VERSION = 1
+SQLITE_MAGIC = b"SQLite format 3\0"
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE recipes (
+    no INTEGER PRIMARY KEY, rel TEXT UNIQUE NOT NULL, id TEXT NOT NULL,
+    title TEXT, tags TEXT, sha1 TEXT, error TEXT, doc TEXT, hay TEXT
+);
+CREATE INDEX recipes_id ON recipes (id);
+CREATE TABLE steps (
+    recipe_no INTEGER NOT NULL, step_no INTEGER NOT NULL, name TEXT, kind TEXT,
+    PRIMARY KEY (recipe_no, step_no)
+);
+CREATE TABLE variants (
+    recipe_no INTEGER NOT NULL, step_no INTEGER NOT NULL, variant TEXT NOT NULL,
+    template TEXT
+);
+CREATE INDEX variants_variant ON variants (variant);
+CREATE TABLE includes (
+    src_id TEXT NOT NULL, step_no INTEGER NOT NULL, kind TEXT NOT NULL,
+    dst_id TEXT NOT NULL, selector TEXT, variant TEXT
+);
+CREATE INDEX includes_dst ON includes (dst_id);
+CREATE VIRTUAL TABLE recipes_fts USING fts5(
+    id, title, tags, steps, hints, body, tokenize='trigram'
+);
+"""
+
+
+def is_store(path: str) -> bool:
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def _step_kind(step) -> str:
+    if not isinstance(step, dict):
+        return "invalid"
+    return next((k for k in ("render", "include", "include_step") if k in step), "none")
+
+
+def _include(step, kind: str) -> bool:
+    """Whether `step` of `kind` is an include / include_step with a target id."""
+    if kind not in ("include", "include_step"):
+        return False
+    return isinstance(step[kind], dict) and bool(step[kind].get("id"))
+
+
+def build(root: str, out: str) -> dict:
+    """Import the recipe tree under `root` into the database `out`; return a summary."""
+    from ir_cues.search import recipe_fields
+
+    entries, _ = loader.scan(root)
+    tmp = out + ".tmp"
+    if os.path.exists(tmp):
+        os.unlink(tmp)
+    db = sqlite3.connect(tmp)
+    try:
+        db.executescript(_SCHEMA)
+    except sqlite3.OperationalError as e:
+        db.close()
+        os.unlink(tmp)
+        raise ValueError(f"cannot create the database with SQLite "
+                         f"{sqlite3.sqlite_version} ({e}); full-text search needs "
+                         "FTS5 with the trigram tokenizer (SQLite 3.34+)") from e
+    with db:
+        db.executemany("INSERT INTO meta VALUES (?, ?)",
+                       [("schema", str(SCHEMA_VERSION)),
+                        ("source", os.path.abspath(root))])
+        count = errors = 0
+        for no, (rel, entry) in enumerate(entries.items(), start=1):
+            name = rel.rsplit("/", 1)[-1]
+            doc = entry.get("doc")
+            if "error" in entry or (doc and not isinstance(doc, dict)):
+                error = entry.get("error") or "recipe is not a mapping"
+                db.execute("INSERT INTO recipes (no, rel, id, sha1, error) "
+                           "VALUES (?, ?, ?, ?, ?)",
+                           (no, rel, name, entry.get("sha1", ""), error))
+                count, errors = count + 1, errors + 1
+                continue
+            if not doc:
+                continue
+            rid = doc.get("id", name)
+            fields = recipe_fields({"id": rid, **doc})
+            db.execute(
+                "INSERT INTO recipes (no, rel, id, title, tags, sha1, doc, hay) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (no, rel, rid, doc.get("title", ""), json.dumps(doc.get("tags", [])),
+                 entry.get("sha1", ""), json.dumps(doc, separators=(",", ":")),
+                 " ".join(fields.values()).casefold()),
+            )
+            db.execute("INSERT INTO recipes_fts "
+                       "(rowid, id, title, tags, steps, hints, body) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)", (no, *fields.values()))
+            for i, step in enumerate(doc.get("steps") or [], start=1):
+                kind = _step_kind(step)
+                label = step.get("name") if isinstance(step, dict) else None
+                db.execute("INSERT INTO steps VALUES (?, ?, ?, ?)",
+                           (no, i, label, kind))
+                if kind == "render" and isinstance(step["render"], dict):
+                    db.executemany("INSERT INTO variants VALUES (?, ?, ?, ?)",
+                                   [(no, i, v, str(t))
+                                    for v, t in step["render"].items()])
+                elif _include(step, kind):
+                    inc = step[kind]
+                    sel = None if inc.get("step") is None else str(inc["step"])
+                    db.execute("INSERT INTO includes VALUES (?, ?, ?, ?, ?, ?)",
+                               (rid, i, kind, str(inc["id"]), sel, inc.get("variant")))
+            count += 1
+    db.close()
+    os.replace(tmp, out)
+    return {"database": out, "recipes": count, "errors": errors,
+            "bytes": os.path.getsize(out)}
+
+
+def _phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+class _Entry(loader.LazyMapping):
+    """Scan entry for row `no` of the recipes table; `doc` is queried on first read."""
+
+    __slots__ = ("_store", "_no", "sha1", "meta", "error")
+
+    def __init__(self, store, no, sha1, meta, error):
+        self._store, self._no, self.sha1 = store, no, sha1
+        self.meta, self.error = meta, error
+
+    def _keys(self):
+        return ("sha1", "error") if self.error is not None else ("sha1", "doc")
+
+    def _value(self, key):
+        if key == "doc":
+            return self._store.doc_at(self._no, self.sha1)
+        return getattr(self, key)
+
+
+class Store:
+    """Read-only view of an imported corpus."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True,
+                                  check_same_thread=False)
+        try:
+            meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"{path} is not an ir_cues database: {e}")
+        if meta.get("schema") != str(SCHEMA_VERSION):
+            raise ValueError(f"{path}: database schema {meta.get('schema')} is not "
+                             f"supported (expected {SCHEMA_VERSION}); reimport it")
+        self.source = meta.get("source")
+        self.doc_at = functools.lru_cache(maxsize=loader.DOC_CACHE_SIZE)(self._decode)
+
+    def __len__(self):
+        return self.db.execute("SELECT count(*) FROM recipes").fetchone()[0]
+
+    def _decode(self, no: int, sha1: str):
+        row = self.db.execute("SELECT doc FROM recipes WHERE no = ?", (no,)).fetchone()
+        return json.loads(row[0])
+
+    def doc(self, recipe_id: str):
+        """Document of the first row with `recipe_id` (an indexed lookup) or None."""
+        row = self.db.execute("SELECT no, sha1 FROM recipes "
+                              "WHERE id = ? AND error IS NULL ORDER BY no LIMIT 1",
+                              (recipe_id,)).fetchone()
+        return None if row is None else self.doc_at(*row)
+
+    def entries(self) -> dict:
+        """
+        One entry per imported row, keyed by the file's path in the source tree.
+        Each carries its index metadata from three queries; no document is read.
+        """
+        db = self.db
+        steps = dict(db.execute("SELECT recipe_no, count(*) FROM steps "
+                                "GROUP BY recipe_no"))
+        variants = {}
+        for no, variant in db.execute("SELECT DISTINCT recipe_no, variant "
+                                      "FROM variants"):
+            variants.setdefault(no, []).append(variant)
+        out = {}
+        rows = db.execute("SELECT rel, no, id, title, tags, sha1, error FROM recipes "
+                          "ORDER BY no")
+        for rel, no, rid, title, tags, sha1, error in rows:
+            meta = None
+            if error is None:
+                meta = [rid, title, json.loads(tags), sorted(variants.get(no, ())),
+                        steps.get(no, 0)]
+            out[rel] = _Entry(self, no, sha1, meta, error)
+        return out
+
+    def summaries(self) -> list:
+        """Summary dicts (id/title/tags, or id/error) in import order."""
+        out = []
+        rows = self.db.execute("SELECT id, title, tags, error FROM recipes ORDER BY no")
+        for rid, title, tags, error in rows:
+            out.append({"id": rid, "error": error} if error is not None
+                       else {"id": rid, "title": title, "tags": json.loads(tags)})
+        return out
+
+    def query(self, required=(), excluded=(), optional=(), limit=None):
+        """
+        Same contract as `search.SearchIndex.query`. Terms of three or more
+        characters use the FTS5 trigram index; every term is then confirmed as a
+        substring of the casefolded haystack. Ranking is FTS5's bm25 with
+        `search.FIELD_WEIGHTS`.
+        """
+        from ir_cues.search import FIELD_WEIGHTS
+
+        def indexed(terms):
+            return [_phrase(t) for t in terms if len(t) >= 3]
+
+        req, opt, exc = indexed(required), indexed(optional), indexed(excluded)
+        match = []
+        if req:
+            match.append(" AND ".join(req))
+        if opt and len(opt) == len(optional):
+            match.append("(" + " OR ".join(opt) + ")")
+        expr = " AND ".join(match)
+        if expr and exc:
+            expr = f"({expr}) NOT ({' OR '.join(exc)})"
+
+        where, params = ["r.error IS NULL"], []
+        for t in required:
+            where.append("instr(r.hay, ?) > 0")
+            params.append(t)
+        for t in excluded:
+            where.append("instr(r.hay, ?) = 0")
+            params.append(t)
+        if optional:
+            any_of = " OR ".join("instr(r.hay, ?) > 0" for _ in optional)
+            where.append("(" + any_of + ")")
+            params.extend(optional)
+
+        cond = " AND ".join(where)
+        if expr:
+            weights = ", ".join(str(w) for w in FIELD_WEIGHTS.values())
+            sql = (f"SELECT r.id, -bm25(recipes_fts, {weights}) "
+                   f"FROM recipes_fts JOIN recipes r ON r.no = recipes_fts.rowid "
+                   f"WHERE recipes_fts MATCH ? AND {cond} "
+                   f"ORDER BY bm25(recipes_fts, {weights}), r.no")
+            params.insert(0, expr)
+        else:
+            sql = f"SELECT r.id, 0.0 FROM recipes r WHERE {cond} ORDER BY r.no"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.db.execute(sql, params).fetchall()
+
+    def includers(self, recipe_id: str, transitive: bool = False):
+        """
+        [(src id, step no, kind)] of recipes that include `recipe_id` (directly, or
+        at any depth).
+        """
+        if not transitive:
+            return self.db.execute("SELECT src_id, step_no, kind FROM includes "
+                                   "WHERE dst_id = ? ORDER BY src_id, step_no",
+                                   (recipe_id,)).fetchall()
+        return self.db.execute(
+            "WITH RECURSIVE up(id) AS (SELECT ? UNION "
+            "SELECT src_id FROM includes JOIN up ON dst_id = up.id) "
+            "SELECT src_id, step_no, kind FROM includes "
+            "WHERE dst_id IN (SELECT id FROM up) "
+            "AND src_id != ? ORDER BY src_id, step_no",
+            (recipe_id, recipe_id)).fetchall()
+
+
+def open_store(path: str) -> Store:
+    """Read-only view of the database at `path`, shared until it is reimported."""
+    return loader.open_packed(Store, path)
+
+
+def includers(recipe_id: str, transitive: bool = False):
+    """
+    [(src id, step no, kind)] of recipes including `recipe_id`. Indexed when
+    the only source is a database; otherwise worked out from the recipe index.
+    """
+    roots = loader.sources()
+    packed = loader.packed_source(roots[0]) if len(roots) == 1 else None
+    if isinstance(packed, Store):
+        return packed.includers(recipe_id, transitive)
+    edges = []
+    for rec in loader.load_index():
+        for i, step in enumerate(rec.get("steps") or [], start=1):
+            kind = _step_kind(step)
+            if _include(step, kind):
+                edges.append((rec["id"], i, kind, str(step[kind]["id"])))
+    targets, found = {recipe_id}, set()
+    while True:
+        new = {(src, i, kind) for src, i, kind, dst in edges
+               if dst in targets and src != recipe_id} - found
+        found |= new
+        if not transitive or not new:
+            break
+        targets |= {src for src, _, _ in new}
+    return sorted(found)
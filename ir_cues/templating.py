@@ -0,0 +1,164 @@
+#ir_cues/templating.py
+
+"""
+One shared Jinja2 environment for rendering recipe templates.
+
+Templates are compiled once per process (keyed by their source text) and, unless
+disabled, their bytecode is persisted under the cache directory so a cold start
+does not recompile the corpus. Set ``IR_CUES_JINJA_BYTECODE=0`` to turn the
+bytecode cache off.
+
+`template_vars()` reports which variables a template reads. The analysis needs
+a parse, so results are kept on disk by source hash and reused across runs.
+"""
+
+import contextlib
+import functools
+import hashlib
+import os
+
+import jinja2
+
+from ir_cues import cache, timing
+
+TEMPLATE_CACHE_SIZE = 4096
+
+
+class _SourceLoader(jinja2.BaseLoader):
+    """Serves template sources registered under their content hash."""
+
+    def __init__(self):
+        self.sources = {}
+
+    def get_source(self, environment, name):
+        source = self.sources.get(name)
+        if source is None:
+            raise jinja2.TemplateNotFound(name)
+        return source, None, lambda: True
+
+
+def _bytecode_cache():
+    if not cache.cache_enabled():
+        return None
+    flag = os.environ.get("IR_CUES_JINJA_BYTECODE", "1").strip().lower()
+    if flag in ("0", "false", "no"):
+        return None
+    directory = os.path.join(cache.cache_dir(), "jinja")
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None
+    return jinja2.FileSystemBytecodeCache(directory)
+
+
+@functools.lru_cache(maxsize=None)
+def get_environment() -> jinja2.Environment:
+    """The process-wide rendering environment (same defaults as ``jinja2.Template``)."""
+    return jinja2.Environment(
+        loader=_SourceLoader(),
+        cache_size=TEMPLATE_CACHE_SIZE,
+        bytecode_cache=_bytecode_cache(),
+    )
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(source: str) -> jinja2.Template:
+    """Compiled template for `source`, shared across all renders in this process."""
+    env = get_environment()
+    name = hashlib.sha1(source.encode("utf-8")).hexdigest()
+    env.loader.sources[name] = source
+    timing.count("templates_compiled")
+    try:
+        with timing.span("jinja_compile"):
+            return env.get_template(name)
+    finally:
+        env.loader.sources.pop(name, None)
+
+
+_vars = None         # source sha1 -> [required, optional], loaded on first use
+_vars_dirty = False
+
+
+def _vars_path() -> str:
+    return os.path.join(cache.cache_dir(), "template-vars.json")
+
+
+def _analyse(source: str):
+    from jinja2 import meta, nodes
+
+    try:
+        ast = get_environment().parse(source)
+    except jinja2.TemplateSyntaxError:
+        return [], []
+    names = meta.find_undeclared_variables(ast)
+    loads, defaulted = {}, {}
+    for n in ast.find_all(nodes.Name):
+        if n.ctx == "load":
+            loads[n.name] = loads.get(n.name, 0) + 1
+    for f in ast.find_all(nodes.Filter):
+        if f.name in ("default", "d") and isinstance(f.node, nodes.Name):
+            defaulted[f.node.name] = defaulted.get(f.node.name, 0) + 1
+    optional = {n for n in names if defaulted.get(n, 0) >= loads.get(n, 0)}
+    return sorted(names - optional), sorted(optional)
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def template_vars(source: str):
+    """
+    (required, optional) frozensets of the undeclared variables `source` reads.
+    A variable is optional when every use of it goes through `| default(...)`.
+    """
+    global _vars, _vars_dirty
+    if _vars is None:
+        data = cache.read_json(_vars_path()) if cache.cache_enabled() else None
+        _vars = (data or {}).get("templates", {})
+    key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+    hit = _vars.get(key)
+    if hit is None:
+        hit = _vars[key] = _analyse(source)
+        _vars_dirty = True
+    return frozenset(hit[0]), frozenset(hit[1])
+
+
+_saves_held = 0
+
+
+@contextlib.contextmanager
+def held_saves():
+    """Hold save_template_vars() back until the block ends, then save once."""
+    global _saves_held
+    _saves_held += 1
+    try:
+        yield
+    finally:
+        _saves_held -= 1
+        save_template_vars()
+
+
+def hold_saves():
+    """Hold save_template_vars() back for the rest of the process (pool workers)."""
+    global _saves_held
+    _saves_held += 1
+
+
+def save_template_vars():
+    """Persist template_vars() results computed since the last save."""
+    global _vars_dirty
+    if _saves_held:
+        return
+    if _vars_dirty and cache.cache_enabled():
+        cache.write_json(_vars_path(), {"templates": _vars})
+    _vars_dirty = False
+
+
+def render(source: str, vars: dict) -> str:
+    return compile_template(source).render(**vars)
+
+
+def clear_caches():
+    """Drop compiled templates (the environment is rebuilt on next use)."""
+    global _vars, _vars_dirty
+    compile_template.cache_clear()
+    template_vars.cache_clear()
+    get_environment.cache_clear()
+    _vars, _vars_dirty = None, False
@@ -0,0 +1,125 @@
+#ir_cues/timing.py
+
+"""
+Phase timers and counters behind `--profile` and ``IR_CUES_TRACE``.
+
+Instrumented code wraps phases in `span(name)` and bumps counters with
+`count(name)` / `peak(name, value)`. Both return at once while recording is
+off, so they can stay in hot paths. `--profile` prints a per-phase summary to
+stderr. ``IR_CUES_TRACE=FILE`` writes every span as a Chrome trace-event JSON
+file, which chrome://tracing or Perfetto can open. `--cprofile FILE` dumps
+cProfile stats for the whole command.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+_on = False
+_t0 = time.perf_counter()
+_events = []    # (name, start, duration, thread id, args)
+_counters = {}
+_NULL = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name, self.args = name, args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _events.append((self.name, self.start, time.perf_counter() - self.start,
+                        threading.get_ident(), self.args))
+        return False
+
+
+def enabled() -> bool:
+    return _on
+
+
+def enable():
+    global _on
+    _on = True
+
+
+def reset():
+    """Stop recording and forget everything recorded so far."""
+    global _on, _t0
+    _on = False
+    _t0 = time.perf_counter()
+    _events.clear()
+    _counters.clear()
+
+
+def span(name: str, **args):
+    """Context manager timing one phase (a no-op unless recording)."""
+    return _Span(name, args) if _on else _NULL
+
+
+def count(name: str, n: int = 1):
+    if _on:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def peak(name: str, value: int):
+    """Keep the largest `value` seen for `name` (e.g. include depth)."""
+    if _on and value > _counters.get(name, 0):
+        _counters[name] = value
+
+
+def summary() -> dict:
+    """
+    {"phases": {name: {"calls", "total_ms", "max_ms"}}, "counters": {...}};
+    phase times are inclusive.
+    """
+    phases = {}
+    for name, _, dur, _, _ in _events:
+        p = phases.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        p["calls"] += 1
+        p["total_ms"] += dur * 1000
+        p["max_ms"] = max(p["max_ms"], dur * 1000)
+    return {"phases": phases, "counters": dict(_counters)}
+
+
+def format_summary(wall_ms: float = None) -> str:
+    data = summary()
+    lines = [f"{'phase':<20} {'calls':>7} {'total ms':>10} {'max ms':>9}"]
+    for name, p in sorted(data["phases"].items(), key=lambda kv: -kv[1]["total_ms"]):
+        lines.append(f"{name:<20} {p['calls']:>7} {p['total_ms']:>10.2f} "
+                     f"{p['max_ms']:>9.2f}")
+    if wall_ms is not None:
+        lines.append(f"{'wall':<20} {'':>7} {wall_ms:>10.2f}")
+    if data["counters"]:
+        counters = sorted(data["counters"].items())
+        lines.append("counters: " + " ".join(f"{k}={v}" for k, v in counters))
+    return "\n".join(lines)
+
+
+def chrome_trace() -> dict:
+    """Recorded spans and final counters in Chrome trace-event format (microseconds)."""
+    pid = os.getpid()
+    events = [
+        {"name": name, "ph": "X",
+         "ts": round((start - _t0) * 1e6, 3), "dur": round(dur * 1e6, 3),
+         "pid": pid, "tid": tid, **({"args": args} if args else {})}
+        for name, start, dur, tid, args in _events
+    ]
+    if _counters:
+        end = max((start + dur for _, start, dur, _, _ in _events),
+                  default=time.perf_counter())
+        events.append({"name": "counters", "ph": "C",
+                       "ts": round((end - _t0) * 1e6, 3), "pid": pid,
+                       "tid": threading.get_ident(), "args": dict(_counters)})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_trace(path: str):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(chrome_trace(), fh)
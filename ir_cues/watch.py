@@ -0,0 +1,115 @@
+#ir_cues/watch.py
+
+"""
+Watch mode for recipe authors (`ir_cues watch`).
+
+The corpus stays parsed in memory. Each poll re-walks the sources with the
+scanner, which only re-parses files whose stamp and content changed. The
+changed files are mapped to recipe ids, and a watched playbook is re-rendered
+only if one of those ids is in its include closure (before or after the
+change). Plans of untouched includes are reused, because the loader keeps
+serving the same document objects for unchanged files.
+"""
+
+import time
+
+from ir_cues import loader
+from ir_cues.export import dependencies
+
+
+def _ids(entries: dict) -> tuple:
+    """
+    ({id: doc}, {id: sha1}, {rel: id or file name}) for scan entries; the first
+    file with an id wins.
+    """
+    docs, hashes, by_rel = {}, {}, {}
+    for rel, entry in entries.items():
+        doc = entry.get("doc") if "error" not in entry else None
+        rid = doc.get("id") if isinstance(doc, dict) else None
+        by_rel[rel] = rid if isinstance(rid, str) else rel.rsplit("/", 1)[-1]
+        if isinstance(rid, str) and rid not in docs:
+            docs[rid], hashes[rid] = doc, entry.get("sha1")
+    return docs, hashes, by_rel
+
+
+class Watcher:
+    """
+    Keeps `recipe_ids` rendered, re-rendering one only when a recipe it is built
+    from changes.
+    """
+
+    def __init__(self, recipe_ids, vars=None, format: str = "text"):
+        self.recipe_ids = list(recipe_ids)
+        self.vars = vars or {}
+        self.format = format
+        self.entries = {}
+        self.deps = {}
+
+    def _refresh(self):
+        """Rescan; return (changed rel paths, ids they held before or hold now)."""
+        old = self.entries
+        entries, _ = loader.scan()
+        self.entries = dict(entries)
+        changed = sorted(
+            rel for rel in set(old) | set(entries)
+            if old.get(rel, {}).get("sha1") != entries.get(rel, {}).get("sha1"))
+        if not changed:
+            return [], set()
+        _, _, old_rels = _ids(old)
+        docs, hashes, new_rels = _ids(entries)
+        if old_rels != new_rels:
+            loader.invalidate()
+        self.deps = dependencies(docs, hashes)
+        return changed, {m[rel] for rel in changed
+                         for m in (old_rels, new_rels) if rel in m}
+
+    def render(self, recipe_id: str, changed=()) -> dict:
+        """Render one playbook: {"id", "changed", "ms", then "text" or "error"}."""
+        from ir_cues.renderer import render_recipe
+
+        start = time.perf_counter()
+        out = {"id": recipe_id, "changed": list(changed)}
+        try:
+            out["text"] = render_recipe(loader.load_recipe(recipe_id), self.vars,
+                                        format=self.format)
+        except Exception as e:
+            # cycles, missing ids and broken templates are all shown, not raised
+            out["error"] = f"{type(e).__name__}: {e}"
+        out["ms"] = (time.perf_counter() - start) * 1000
+        return out
+
+    def start(self) -> list:
+        """Initial scan and render of every watched playbook."""
+        self._refresh()
+        return [self.render(rid) for rid in self.recipe_ids]
+
+    def problems(self, changed) -> list:
+        """(rel, error) for changed files that no longer parse."""
+        return [(rel, self.entries[rel]["error"]) for rel in changed
+                if "error" in self.entries.get(rel, {})]
+
+    def poll(self) -> tuple:
+        """Rescan once; return (changed rel paths, renders of affected playbooks)."""
+        before = {rid: set(self.deps.get(rid, (rid,))) for rid in self.recipe_ids}
+        changed, ids = self._refresh()
+        if not changed:
+            return [], []
+        affected = [rid for rid in self.recipe_ids
+                    if ids & (before[rid] | set(self.deps.get(rid, (rid,))))]
+        return changed, [self.render(rid, changed) for rid in affected]
+
+
+def watch(recipe_ids, vars=None, format: str = "text", interval: float = 0.5,
+          report=print):
+    """Poll forever (until interrupted), passing every render to `report`."""
+    watcher = Watcher(recipe_ids, vars, format)
+    for result in watcher.start():
+        report(result)
+    while True:
+        time.sleep(interval)
+        changed, results = watcher.poll()
+        for rel, error in watcher.problems(changed):
+            report({"id": rel, "changed": [rel], "ms": 0.0,
+                    "error": f"parse error: {error}"})
+        for result in results:
+            report(result)
@@ -0,0 +1,37 @@
+import pytest
+
+from ir_cues import loader, plan
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path_factory, monkeypatch):
+    # keep persistent caches out of the user's home directory during tests
+    monkeypatch.setenv("IR_CUES_CACHE_DIR",
+                       str(tmp_path_factory.getbasetemp() / "cache"))
+    # and ignore the user's own recipe sources
+    monkeypatch.setenv("IR_CUES_CONFIG",
+                       str(tmp_path_factory.getbasetemp() / "no-config.ini"))
+    monkeypatch.delenv("IR_CUES_PATH", raising=False)
+
+
+@pytest.fixture
+def write():
+    """``write(root, rel, text)``: save `text` as ``root / rel``, making directories."""
+    def write(root, rel, text):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        return path
+    return write
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """An empty recipe tree as the only source, with the per-process caches reset."""
+    root = tmp_path / "recipes"
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(root))
+    loader.clear_caches()
+    plan.clear_cache()
+    yield root
+    loader.clear_caches()
+    plan.clear_cache()
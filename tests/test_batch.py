@@ -0,0 +1,36 @@
+import json
+import subprocess
+import sys
+
+from ir_cues.batch import iter_batch, read_rows
+
+
+def test_pool_and_in_process_results_match_and_keep_input_order():
+    rows = [{"pid": n} for n in range(1, 21)]
+    serial = list(iter_batch("windows/process/triage", rows, workers=1))
+    pooled = list(iter_batch("windows/process/triage", rows, workers=2, chunksize=3))
+    assert pooled == serial
+    assert [r["row"] for r in serial] == sorted(r["row"] for r in serial)
+    first = serial[0]
+    assert set(first) == {"row", "id", "step", "variant", "command", "input"}
+    assert first["input"] == {"pid": 1} and "ProcessId=1" in first["command"]
+
+
+def test_read_rows_jsonl_and_csv(tmp_path):
+    (tmp_path / "v.jsonl").write_text('{"pid": 4}\n\n{"pid": 5}\n', encoding="utf-8")
+    (tmp_path / "v.csv").write_text("pid,host\n4,a\n", encoding="utf-8")
+    assert read_rows(str(tmp_path / "v.jsonl")) == [{"pid": 4}, {"pid": 5}]
+    assert read_rows(str(tmp_path / "v.csv")) == [{"pid": "4", "host": "a"}]
+
+
+def test_cli_batch_writes_jsonl(tmp_path):
+    rows = tmp_path / "rows.jsonl"
+    rows.write_text('{"pid": 11}\n{"pid": 12}\n', encoding="utf-8")
+    out = subprocess.run(
+        [sys.executable, "-m", "ir_cues.cli", "batch",
+         "windows/process/triage", str(rows),
+         "--variant", "cmd", "--workers", "1"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    lines = [json.loads(line) for line in out.splitlines()]
+    assert [(r["row"], r["input"]["pid"]) for r in lines] == [(1, 11), (2, 12)]
@@ -0,0 +1,23 @@
+from benchmarks import corpus
+from ir_cues import loader, plan
+from ir_cues.renderer import collect_commands
+
+
+def test_synthetic_corpus_is_valid_and_acyclic(tmp_path, monkeypatch):
+    ids = corpus.generate(str(tmp_path / "recipes"), 60, seed=1)
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(tmp_path / "recipes"))
+    loader.clear_caches()
+    plan.clear_cache()
+    try:
+        index = loader.load_index()
+        assert sorted(r["id"] for r in index) == sorted(ids)
+        assert not [r for r in index if "error" in r]
+        kinds = {k for r in index for s in r["steps"]
+                 for k in ("render", "include", "include_step") if k in s}
+        assert kinds == {"render", "include", "include_step"}
+        for rid in ids:
+            seq = collect_commands(loader.load_recipe(rid), {"pid": 1})
+            assert seq and not [s for s in seq if s["variant"] == "note"]
+    finally:
+        loader.clear_caches()
+        plan.clear_cache()
@@ -0,0 +1,53 @@
+import pytest
+from typer.testing import CliRunner
+
+from ir_cues import bundle, cli, loader, plan, search
+from ir_cues.renderer import collect_commands
+
+
+@pytest.fixture
+def packed(tmp_path, monkeypatch, corpus, write):
+    write(corpus, "a/one.yaml", "id: a/one\ntitle: One\ntags: [x]\nsteps:\n"
+                                "  - render: {bash: 'kill {{ pid }}'}\n")
+    write(corpus, "a/two.yaml", "id: a/two\ntitle: Two\nsteps:\n"
+                                "  - include: {id: a/one, vars: {pid: 7}}\n")
+    write(corpus, "a/bad.yaml", "id: [oops\n")
+    out = tmp_path / "corpus.ircb"
+    info = bundle.build(str(corpus), str(out))
+    assert (info["recipes"], info["errors"]) == (3, 1)
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(out))
+    loader.clear_caches()
+    plan.clear_cache()
+    return out
+
+
+def test_bundle_serves_index_recipes_and_search(packed):
+    ids = sorted(r["id"] for r in loader.load_index())
+    assert ids == ["a/one", "a/two", "bad.yaml"]
+    assert collect_commands(loader.load_recipe("a/two"), {})[0]["command"] == "kill 7"
+    assert [r["id"] for r in search.search(["kill"])] == ["a/one"]
+    with pytest.raises(FileNotFoundError):
+        loader.load_recipe("a/missing")
+
+
+def test_documents_are_decoded_lazily(packed):
+    search.search(["kill"])  # builds the search index, which reads every recipe
+    loader.clear_caches()
+    search.clear_cache()
+    opened = bundle.open_bundle(str(packed))
+    summaries = loader.recipe_summaries()
+    assert {"id": "a/one", "title": "One", "tags": ["x"]} in summaries
+    assert opened._docs == {}
+    hits = search.search(["kill"])
+    assert [(r["id"], r.variants, r.steps) for r in hits] == [("a/one", ["bash"], 1)]
+    assert opened._docs == {}
+    result = CliRunner().invoke(cli.app, ["show", "a/one"])
+    assert result.exit_code == 0 and '"a/one"' in result.output
+    assert list(opened._docs) == [0]
+
+
+def test_rejects_files_that_are_not_bundles(tmp_path):
+    path = tmp_path / "not.ircb"
+    path.write_bytes(b"id: nope\n" * 8)
+    with pytest.raises(bundle.BundleError):
+        bundle.Bundle(str(path))
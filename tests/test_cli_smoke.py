@@ -27,3 +27,13 @@ def test_cli_show_and_run_smoke():
     vars_json = json.dumps({"pid": 1})
     run_out = run_cli("run", recipe_id, "--vars", vars_json).stdout
     assert "Get-CimInstance" in run_out or run_out.strip(), "Run output looked empty"
+
+
+def test_cli_shell_runs_commands_and_searches_plain_words():
+    out = subprocess.run(
+        [sys.executable, "-m", "ir_cues.cli", "shell"],
+        input="show windows/process/triage\nprocess triage\nquit\n",
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert '"id": "windows/process/triage"' in out
+    assert "linux/process/triage" in out
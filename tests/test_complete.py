@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+from ir_cues import complete, loader
+
+SUMMARIES = [
+    {"id": "windows/process/triage", "title": "Quick process triage by PID"},
+    {"id": "windows/process/list", "title": "Process list with ancestry"},
+    {"id": "linux/network/connections", "title": "Active TCP/UDP listeners"},
+    {"id": "broken.yaml", "error": "bad"},
+]
+
+
+def test_prefix_and_segment_completion():
+    idx = complete.IdIndex.build(SUMMARIES)
+    assert idx.complete("windows/process/") == ["windows/process/list",
+                                                "windows/process/triage"]
+    assert idx.complete("WIN", limit=1) == ["windows/process/list"]
+    assert idx.complete("triage") == ["windows/process/triage"]
+    assert idx.complete("network/con") == ["linux/network/connections"]
+    assert idx.complete("zzz") == []
+
+
+def test_suggestions_tolerate_typos_and_title_words():
+    idx = complete.IdIndex.from_json(complete.IdIndex.build(SUMMARIES).to_json())
+    assert idx.suggest("windows/proces/triag")[0] == "windows/process/triage"
+    assert idx.suggest("linux/netwrk/conections")[0] == "linux/network/connections"
+    assert "linux/network/connections" in idx.suggest("listeners")
+    assert idx.suggest("qqqqqq") == []
+
+
+def test_id_index_is_cached_until_the_corpus_changes(tmp_path, monkeypatch):
+    root = tmp_path / "recipes"
+    (root / "a").mkdir(parents=True)
+    (root / "a/one.yaml").write_text("id: a/one\nsteps: []\n", encoding="utf-8")
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(root))
+    assert complete.load_id_index().ids == ["a/one"]
+
+    with monkeypatch.context() as m:
+        m.setattr(loader, "recipe_summaries", lambda: 1 / 0)
+        assert complete.load_id_index().ids == ["a/one"]  # served from the cache
+
+    (root / "a/two.yaml").write_text("id: a/two\nsteps: []\n", encoding="utf-8")
+    loader.load_index()  # any full command refreshes the recipe index cache
+    assert complete.load_id_index().ids == ["a/one", "a/two"]
+
+
+def test_completion_and_unknown_ids_skip_heavy_imports():
+    probe = ("import sys\n"
+             "from ir_cues.complete import complete_ids\n"
+             "complete_ids('windows/')\n"
+             "print(sorted(m for m in ('jinja2', 'rich') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", probe],
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
+
+    res = subprocess.run([sys.executable, "-m", "ir_cues.cli", "show",
+                          "windows/proces/triag"],
+                         capture_output=True, text=True)
+    assert res.returncode == 1
+    assert "Did you mean: windows/process/triage" in res.stdout
@@ -0,0 +1,76 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+from ir_cues import daemon, loader
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"),
+                                reason="needs Unix sockets")
+
+
+@pytest.fixture
+def running(tmp_path, monkeypatch):
+    root = tmp_path / "recipes"
+    (root / "d").mkdir(parents=True)
+    (root / "d" / "one.yaml").write_text(
+        "id: d/one\ntitle: First\ntags: [x]\nsteps:\n"
+        "  - render: {bash: 'kill {{ pid }}'}\n", encoding="utf-8")
+    sock = os.path.join(tempfile.mkdtemp(prefix="irc"), "d.sock")
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(root))
+    monkeypatch.setenv("IR_CUES_DAEMON_SOCKET", sock)
+    monkeypatch.delenv("IR_CUES_NO_DAEMON", raising=False)
+    t = threading.Thread(target=daemon.serve, daemon=True)
+    t.start()
+    for _ in range(100):
+        if os.path.exists(sock):
+            break
+        time.sleep(0.02)
+    yield root, sock
+    daemon.stop()
+    t.join(timeout=5)
+    loader.clear_caches()
+
+
+def test_requests_are_served_from_warm_state(running):
+    assert daemon.request("ping")["pid"] == os.getpid()
+    assert [r["id"] for r in daemon.request("list")] == ["d/one"]
+    cmds = daemon.request("commands", recipe_id="d/one", vars={"pid": 3})
+    assert cmds[0]["command"] == "kill 3"
+    with pytest.raises(FileNotFoundError):
+        daemon.request("show", recipe_id="d/missing")
+
+
+def test_daemon_picks_up_changed_and_new_files(running):
+    root, _ = running
+    assert [r["id"] for r in daemon.request("search", terms=["second"])] == []
+    (root / "d" / "two.yaml").write_text("id: d/two\ntitle: Second\nsteps:\n"
+                                         "  - render: {bash: ls}\n")
+    assert [r["id"] for r in daemon.request("search", terms=["second"])] == ["d/two"]
+
+    (root / "d" / "top.yaml").write_text("id: d/top\nsteps:\n"
+                                         "  - include: {id: d/leaf}\n")
+    first = daemon.request("commands", recipe_id="d/top")[0]["command"]
+    assert first.startswith("# include failed d/leaf")
+    (root / "d" / "leaf.yaml").write_text("id: d/leaf\nsteps:\n"
+                                          "  - render: {bash: uptime}\n")
+    assert daemon.request("commands", recipe_id="d/top")[0]["command"] == "uptime"
+
+
+def test_cli_uses_daemon_and_falls_back_when_it_is_gone(running):
+    root, sock = running
+    env = {**os.environ, "IR_CUES_DAEMON_SOCKET": sock}
+    # the subprocess points at the package recipes, the daemon at tmp ones: the
+    # output tells who answered
+    out = subprocess.run([sys.executable, "-m", "ir_cues.cli", "list"], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "d/one - First"
+    assert daemon.stop()
+    out = subprocess.run([sys.executable, "-m", "ir_cues.cli", "list"], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    assert "windows/process/triage" in out
@@ -0,0 +1,46 @@
+from ir_cues import dedupe
+
+
+def _cmd(rid, text, variant="bash", step=1):
+    return (rid, step, variant, text)
+
+
+def test_minhash_estimates_jaccard():
+    a = dedupe.shingles(dedupe.normalize(
+        "Get-Process -Id {{ pid }} | Select-Object * | Format-List"))
+    b = dedupe.shingles(dedupe.normalize(
+        "Get-Process   -Id {{ pid }} | Select-Object *  | Format-Table"))
+    sa, sb = dedupe.minhash(a, 128), dedupe.minhash(b, 128)
+    estimate = sum(x == y for x, y in zip(sa, sb)) / 128
+    assert abs(estimate - dedupe.jaccard(a, b)) < 0.2
+    assert dedupe.minhash(a) == dedupe.minhash(set(a))
+
+
+def test_clusters_near_duplicates_within_a_variant():
+    commands = [
+        _cmd("a/one", "find /etc -type f -mmin -{{ minutes }} -printf '%p\\n' "
+                      "2>/dev/null | sort"),
+        _cmd("b/two", "find /etc  -type f -mmin -{{ minutes }} -printf '%p\\n' "
+                      "2>/dev/null | sort -r"),
+        _cmd("c/three", "ss -tulpn | grep -v 127.0.0.1"),
+        _cmd("d/four", "find /etc -type f -mmin -{{ minutes }} -printf '%p\\n' "
+                       "2>/dev/null | sort", variant="zsh"),
+    ]
+    clusters = dedupe.find_clusters(commands, threshold=0.8)
+    assert [c["members"] for c in clusters] == [[0, 1]]
+    assert 0.8 <= clusters[0]["min_similarity"] <= clusters[0]["max_similarity"] < 1.0
+
+
+def test_lsh_params_split_signature():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = dedupe.lsh_params(64, threshold)
+        assert bands * rows == 64
+        assert (1 / bands) ** (1 / rows) <= threshold + 0.05
+
+
+def test_bundled_corpus_report():
+    report = dedupe.dedupe_report(threshold=0.6)
+    assert report["commands"] > 0
+    for c in report["clusters"]:
+        assert c["size"] == len(c["members"]) >= 2
+        assert len({m["variant"] for m in c["members"]}) == 1
@@ -1,7 +1,18 @@
 # tests/test_dry_run.py
+import itertools
 import json
+import subprocess
+import sys
+
 from ir_cues.loader import load_recipe
-from ir_cues.renderer import collect_commands
+from ir_cues.renderer import (
+    collect_commands,
+    compose_commands,
+    iter_commands,
+    iter_render,
+    render_recipe,
+)
+
 
 def test_collect_commands_flatten_includes():
     rec = load_recipe("windows/process/list")
@@ -15,3 +26,40 @@ def test_collect_commands_filters_vars():
     seq = collect_commands(rec, {"pid": 1})
     # all commands should have the rendered pid
     assert any("ProcessId=1" in s["command"] or " -Id 1" in s["command"] for s in seq)
+
+def test_iter_commands_streams_and_filters_lazily():
+    rec = load_recipe("incident/host/windows-quick-triage")
+    full = collect_commands(rec, {"suspect_pid": 5})
+    assert list(iter_commands(rec, {"suspect_pid": 5})) == full
+    assert list(itertools.islice(iter_commands(rec, {"suspect_pid": 5}), 2)) == full[:2]
+    pwsh = list(iter_commands(rec, {"suspect_pid": 5}, variant="pwsh"))
+    assert pwsh == [s for s in full if s["variant"] == "pwsh"]
+
+def test_iter_render_joins_to_render_recipe():
+    rec = load_recipe("incident/host/linux-quick-triage")
+    lines = iter_render(rec, {"pid": 1}, "md")
+    assert "\n".join(lines) == render_recipe(rec, {"pid": 1}, "md")
+
+def test_compose_commands_collapses_shared_includes_in_first_seen_order():
+    ids = ["incident/host/windows-quick-triage", "windows/process/triage",
+           "windows/process/list"]
+    recs = [load_recipe(i) for i in ids]
+    separate = [s for r in recs for s in iter_commands(r, {"pid": 3})]
+    combined = list(compose_commands(recs, {"pid": 3}))
+    expected = []
+    for s in separate:
+        if s not in expected:
+            expected.append(s)
+    assert combined == expected and len(combined) < len(separate)
+
+def test_dry_run_reads_a_plan_file(tmp_path):
+    plan = tmp_path / "plan.txt"
+    plan.write_text("# multi-OS\nincident/host/linux-quick-triage\n"
+                    "linux/process/triage  # again\n", encoding="utf-8")
+    out = subprocess.run([sys.executable, "-m", "ir_cues.cli", "dry-run", "--plan",
+                          str(plan), "--format", "jsonl"],
+                         capture_output=True, text=True, check=True).stdout
+    items = [json.loads(line) for line in out.splitlines()]
+    keys = [(i["id"], i["step"], i["variant"], i["command"]) for i in items]
+    assert len(keys) == len(set(keys))
+    assert items[0]["id"].startswith(("incident/", "linux/"))
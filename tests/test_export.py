@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from ir_cues.export import MANIFEST, SEARCH_INDEX, _html_body, export
+
+
+@pytest.fixture
+def tree(corpus, write):
+    write(corpus, "a/leaf.yaml", "id: a/leaf\ntitle: Leaf\nsteps:\n"
+                                 "  - render: {bash: echo leaf}\n")
+    write(corpus, "a/mid.yaml", "id: a/mid\ntitle: Mid\nsteps:\n"
+                                "  - include: {id: a/leaf}\n")
+    write(corpus, "a/top.yaml", "id: a/top\ntitle: Top\ntags: [x]\nsteps:\n"
+                                "  - include: {id: a/mid}\n")
+    write(corpus, "b/other.yaml", "id: b/other\ntitle: Other\nsteps:\n"
+                                  "  - render: {pwsh: 'Get-Item [a]'}\n")
+    return corpus
+
+
+def test_export_rebuilds_only_pages_depending_on_changed_files(tmp_path, tree, write):
+    out = tmp_path / "site"
+    first = export(str(out), "md", workers=1)
+    assert (first["pages"], first["rendered"], first["errors"]) == (4, 4, {})
+    assert "echo leaf" in (out / "a/top.md").read_text(encoding="utf-8")
+    index = json.loads((out / SEARCH_INDEX).read_text(encoding="utf-8"))
+    assert {"id": "a/top", "title": "Top", "tags": ["x"], "path": "a/top.md"} in index
+    assert export(str(out), "md", workers=1)["rendered"] == 0
+
+    write(tree, "a/leaf.yaml", "id: a/leaf\ntitle: Leaf\nsteps:\n"
+                               "  - render: {bash: echo changed}\n")
+    second = export(str(out), "md", workers=1)
+    assert (second["rendered"], second["unchanged"]) == (3, 1)
+    assert "echo changed" in (out / "a/top.md").read_text(encoding="utf-8")
+    manifest = json.loads((out / MANIFEST).read_text(encoding="utf-8"))
+    assert sorted(manifest["pages"]["a/top"]["deps"]) == ["a/leaf", "a/mid", "a/top"]
+
+    (tree / "b/other.yaml").unlink()
+    assert export(str(out), "md", workers=1)["removed"] == 1
+    assert not (out / "b/other.md").exists()
+
+
+def test_html_export_escapes_commands(tmp_path, tree):
+    out = tmp_path / "site"
+    export(str(out), "html", workers=1)
+    page = (out / "b/other.html").read_text(encoding="utf-8")
+    assert '<code class="language-pwsh">Get-Item [a]</code>' in page
+    assert 'href="../index.html"' in page
+    assert 'href="a/top.html"' in (out / "index.html").read_text(encoding="utf-8")
+
+
+def test_pages_use_the_declared_variable_defaults(tmp_path, tree, write):
+    cmd = 'journalctl --since "{{ minutes }} minutes ago"'
+    write(tree, "c/since.yaml", "id: c/since\ntitle: Since\nvars:\n"
+                                "  minutes: {type: int, default: 60}\n"
+                                f"steps:\n  - render: {{bash: '{cmd}'}}\n")
+    out = tmp_path / "site"
+    assert export(str(out), "md", workers=1)["errors"] == {}
+    page = (out / "c/since.md").read_text(encoding="utf-8")
+    assert 'journalctl --since "60 minutes ago"' in page
+    manifest = json.loads((out / MANIFEST).read_text(encoding="utf-8"))
+    assert manifest["pages"]["c/since"]["vars"] == {"minutes": 60}
+
+
+def test_html_body_starting_with_a_code_block():
+    body = _html_body("```bash\necho <hi>\n```\n# After\n```\nls\n```")
+    assert body.startswith('<pre><code class="language-bash">echo '
+                           '&lt;hi&gt;</code></pre>')
+    assert body.endswith('<h2>After</h2>\n<pre><code class="language-">ls</code></pre>')
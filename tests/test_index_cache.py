@@ -0,0 +1,139 @@
+import os
+
+import pytest
+
+from ir_cues import loader
+
+
+@pytest.fixture(autouse=True)
+def _own_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("IR_CUES_CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def tree(corpus, write):
+    write(corpus, "a/one.yaml", "id: a/one\ntitle: One\nsteps:\n"
+                                "  - render: {bash: echo 1}\n")
+    write(corpus, "a/two.yaml", "id: a/two\ntitle: Two\nsteps:\n"
+                                "  - render: {bash: echo 2}\n")
+    return corpus
+
+
+def test_warm_index_reparses_only_changed_files(tree, write):
+    assert loader.index_stats()["parsed"] == 2
+
+    stats = loader.index_stats()
+    assert (stats["hits"], stats["parsed"]) == (2, 0)
+
+    write(tree, "a/two.yaml", "id: a/two\ntitle: Two v2\nsteps:\n"
+                              "  - render: {bash: echo 22}\n")
+    stats = loader.index_stats()
+    assert (stats["hits"], stats["parsed"]) == (1, 1)
+    titles = {r["id"]: r["title"] for r in loader.load_index()}
+    assert titles == {"a/one": "One", "a/two": "Two v2"}
+
+
+def test_touched_file_with_same_content_is_not_reparsed(tree):
+    loader.load_index()
+    path = tree / "a/one.yaml"
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    stats = loader.index_stats()
+    assert (stats["rehashed"], stats["parsed"]) == (1, 0)
+
+
+def test_removed_and_broken_files(tree, write):
+    loader.load_index()
+    (tree / "a/one.yaml").unlink()
+    write(tree, "b/bad.yaml", "id: [unclosed\n")
+    stats = loader.index_stats()
+    assert stats["removed"] == 1 and stats["errors"] == 1
+    bad = [r for r in loader.load_index() if "error" in r]
+    assert [r["id"] for r in bad] == ["bad.yaml"]
+
+
+def test_rebuild_and_disabled_cache(monkeypatch, tree):
+    loader.load_index()
+    assert loader.rebuild_index()["parsed"] == 2
+    monkeypatch.setenv("IR_CUES_NO_CACHE", "1")
+    assert loader.index_stats()["parsed"] == 2
+    assert loader.index_stats()["parsed"] == 2
+
+
+BODY = "echo " + "x" * 4000
+
+
+def _large_corpus(root, write, n):
+    for i in range(n):
+        write(root, f"r/{i}.yaml", f"id: r/{i}\ntitle: R {i}\ntags: [t]\nsteps:\n"
+                                   f"  - render: {{bash: '{BODY}', pwsh: '{BODY}'}}\n"
+                                   "  - render: {bash: x}\n")
+    loader.index_records()
+    loader.clear_caches()
+    return root
+
+
+def _peak_index_records():
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        records = loader.index_records()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return records, peak
+
+
+def test_index_records_skip_step_bodies_within_memory_budget(corpus, write):
+    n = 300
+    root = _large_corpus(corpus, write, n)
+    records, peak = _peak_index_records()
+    assert len(records) == n and peak < loader.SCAN_MEMORY_BUDGET * n
+    entries = loader._scanned[str(root)][1]
+    assert all(e.loaded_doc() is None for e in entries.values())
+
+    rec = next(r for r in records if r.id == "r/0")
+    got = (rec.id, rec.path, rec.title, rec.variants, rec.steps)
+    assert got == ("r/0", "r/0.yaml", "R 0", ["bash", "pwsh"], 2)
+    assert dict(rec) == {"id": "r/0", "title": "R 0", "tags": ["t"]}
+    assert rec.doc()["steps"][0]["render"]["bash"] == BODY
+
+
+def test_editing_one_file_stays_within_memory_budget(corpus, write):
+    n = 300
+    root = _large_corpus(corpus, write, n)
+    write(root, "r/7.yaml", "id: r/7\ntitle: Seven\nsteps: []\n")
+    records, peak = _peak_index_records()
+    assert len(records) == n and peak < loader.SCAN_MEMORY_BUDGET * n
+    entries = loader._scanned[str(root)][1]
+    loaded = [rel for rel, e in entries.items() if e.loaded_doc() is not None]
+    assert loaded == ["r/7.yaml"]
+
+    loader.clear_caches()
+    entries, _ = loader.scan()
+    assert entries["r/7.yaml"]["doc"]["title"] == "Seven"
+    assert entries["r/8.yaml"]["doc"]["steps"][0]["render"]["bash"] == BODY
+
+
+def test_missing_docs_cache_falls_back_to_the_file(tmp_path, tree):
+    loader.load_index()
+    loader.clear_caches()
+    for f in (tmp_path / "cache").glob("docs-*.db"):
+        f.unlink()
+    steps = {r["id"]: r["steps"] for r in loader.load_index()}["a/one"]
+    assert steps == [{"render": {"bash": "echo 1"}}]
+
+
+def test_docs_cache_fallback_follows_the_file(tmp_path, tree, write):
+    loader.load_index()
+    loader.clear_caches()
+    for f in (tmp_path / "cache").glob("docs-*.db"):
+        f.unlink()
+    entries, _ = loader.scan()
+    write(tree, "a/one.yaml", "id: a/one\ntitle: One v2\nsteps: []\n")
+    (tree / "a/two.yaml").unlink()
+    one, two = entries["a/one.yaml"], entries["a/two.yaml"]
+    assert one["doc"]["title"] == one["meta"][1] == "One v2"
+    assert two["doc"] is None and two["meta"] is None
+    assert {r["id"]: r["title"] for r in loader.load_index()} == {"a/one": "One v2"}
@@ -0,0 +1,65 @@
+from ir_cues import lint
+
+
+def _codes(report):
+    return sorted((i["code"], i["path"]) for i in report["issues"])
+
+
+def test_bundled_corpus_passes_per_file_and_structural_checks():
+    report = lint.lint(use_cache=False)
+    assert report["files"] >= 28
+    # E010 (missing include target) is reported separately; the rest must be clean
+    assert [i for i in report["issues"] if i["code"] != "E010"] == []
+
+
+def test_reports_each_class_of_problem(tmp_path, write):
+    root = tmp_path / "r"
+    write(root, "a/ok.yaml", "id: a/ok\nsteps:\n  - name: s\n"
+                             "    render: {bash: 'ps -p {{ pid }}'}\n")
+    write(root, "a/badid.yaml", "id: a/other\nsteps:\n  - render: {bash: uptime}\n")
+    write(root, "a/broken.yaml", "id: [oops\n")
+    write(root, "a/syntax.yaml", "id: a/syntax\nsteps:\n  - render: {bash: '{{ nope'}\n"
+                                 "  - name: empty\n")
+    write(root, "a/inc.yaml", "id: a/inc\nsteps:\n  - include: {id: a/missing}\n"
+           "  - include_step: {id: a/ok, step: s, variant: pwsh}\n")
+    write(root, "c/x.yaml", "id: c/x\nsteps:\n  - include: {id: c/y}\n")
+    write(root, "c/y.yaml", "id: c/y\nsteps:\n  - include: {id: c/x}\n")
+    write(root, "d/dup.yaml", "id: d/dup\nsteps:\n"
+                              "  - render: {bash: 'ps -p {{ pid }}  '}\n")
+
+    report = lint.lint(str(root), workers=1, use_cache=False)
+    assert _codes(report) == [
+        ("E001", "a/broken.yaml"),
+        ("E004", "a/badid.yaml"),
+        ("E006", "a/syntax.yaml"),
+        ("E008", "a/syntax.yaml"),
+        ("E010", "a/inc.yaml"),
+        ("E011", "a/inc.yaml"),
+        ("E012", "c/x.yaml"),
+        ("E014", "d/dup.yaml"),
+    ]
+    assert report["errors"] == 8
+
+
+def test_only_changed_files_are_rechecked(tmp_path, write):
+    root = tmp_path / "r"
+    for n in range(5):
+        write(root, f"p/r{n}.yaml", f"id: p/r{n}\nsteps:\n"
+                                    f"  - render: {{bash: 'echo {n}'}}\n")
+    assert lint.lint(str(root))["checked"] == 5
+    write(root, "p/r3.yaml", "id: p/r3\nsteps:\n  - include: {id: p/gone}\n")
+    report = lint.lint(str(root))
+    assert (report["checked"], report["cached"]) == (1, 4)
+    assert _codes(report) == [("E010", "p/r3.yaml")]
+
+
+def test_pool_gives_same_report(tmp_path, monkeypatch, write):
+    root = tmp_path / "r"
+    for n in range(6):
+        write(root, f"p/r{n}.yaml", f"id: p/r{n}\nsteps:\n"
+                                    f"  - render: {{bash: 'echo {{{{ x }}}} {n}'}}\n")
+    write(root, "p/bad.yaml", "id: p/bad\nsteps:\n  - render: {bash: '{% if %}'}\n")
+    monkeypatch.setattr(lint, "POOL_THRESHOLD", 0)
+    pooled = lint.lint(str(root), workers=2, use_cache=False)
+    serial = lint.lint(str(root), workers=1, use_cache=False)
+    assert pooled == serial and _codes(pooled) == [("E008", "p/bad.yaml")]
@@ -0,0 +1,44 @@
+import io
+import json
+import subprocess
+import sys
+
+from ir_cues.output import write_plan
+
+ITEMS = [
+    {"id": "a/x", "step": "List", "variant": "pwsh",
+     "command": "Get-Item $p | ?{ $_.Name -match '[a-z]' }"},
+    {"id": "a/x", "step": "Find", "variant": "bash",
+     "command": "find / -name '*.log'\nls [ab]*"},
+]
+
+
+def _write(format):
+    out = io.StringIO()
+    assert write_plan(out, iter(ITEMS), format, "a/x") == 2
+    return out.getvalue()
+
+
+def test_machine_formats_round_trip():
+    assert [json.loads(line) for line in _write("jsonl").splitlines()] == ITEMS
+    assert json.loads(_write("json")) == ITEMS
+    empty = io.StringIO()
+    write_plan(empty, iter(()), "json")
+    assert json.loads(empty.getvalue()) == []
+
+
+def test_sh_comments_out_non_shell_variants():
+    text = _write("sh")
+    assert text.startswith("#!/bin/sh\n")
+    assert "\n# Get-Item $p" in text
+    assert "\nfind / -name '*.log'\nls [ab]*\n" in text
+
+
+def test_dry_run_output_file_skips_rich(tmp_path):
+    out = tmp_path / "plan.txt"
+    subprocess.run([sys.executable, "-m", "ir_cues.cli", "dry-run",
+                    "windows/process/triage", "--vars", '{"pid": 7}',
+                    "--format", "plain", "--output", str(out)], check=True)
+    text = out.read_text(encoding="utf-8")
+    assert text.startswith("1. windows/process/triage — ")
+    assert "─" not in text and "\x1b[" not in text
@@ -0,0 +1,121 @@
+import pytest
+
+from ir_cues import loader, plan
+from ir_cues.renderer import collect_commands, render_recipe
+
+
+@pytest.fixture
+def recipe(corpus, write):
+    """``recipe(rid, text)``: save `rid` where ids point, `text` after its id line."""
+    return lambda rid, text: write(corpus, f"{rid}.yaml", f"id: {rid}\n{text}")
+
+
+def test_include_cycle_is_reported_up_front(recipe):
+    recipe("c/a", "steps:\n  - include: {id: c/b}\n")
+    recipe("c/b", "steps:\n  - render: {bash: echo b}\n  - include: {id: c/a}\n")
+    with pytest.raises(plan.IncludeCycleError) as err:
+        collect_commands(loader.load_recipe("c/a"), {})
+    assert err.value.chain == ["c/a", "c/b", "c/a"]
+    with pytest.raises(plan.IncludeCycleError):
+        render_recipe(loader.load_recipe("c/b"), {})
+
+
+def test_plans_are_cached_and_shared_between_includers(recipe):
+    recipe("p/leaf", "steps:\n  - render: {bash: 'ps -p {{ pid }}'}\n")
+    recipe("p/one", "steps:\n  - include: {id: p/leaf, vars: {pid: '{{ suspect }}'}}\n")
+    recipe("p/two", "steps:\n  - include: {id: p/leaf}\n")
+    one = plan.compile_plan(loader.load_recipe("p/one"))
+    assert plan.compile_plan(loader.load_recipe("p/one")) is one
+    leaf = plan.compile_plan(loader.load_recipe("p/leaf"))
+    plan.compile_plan(loader.load_recipe("p/two"))
+    assert plan.compile_plan(loader.load_recipe("p/leaf")) is leaf
+
+    rec = loader.load_recipe("p/one")
+    assert [s["command"] for s in collect_commands(rec, {"suspect": 7})] == ["ps -p 7"]
+    assert [s["command"] for s in collect_commands(rec, {"suspect": 9})] == ["ps -p 9"]
+
+
+def test_plan_is_rebuilt_when_an_included_file_changes(recipe):
+    recipe("p/leaf", "steps:\n  - render: {bash: echo old}\n")
+    recipe("p/top", "steps:\n  - include: {id: p/leaf}\n")
+    rec = loader.load_recipe("p/top")
+    assert collect_commands(rec, {})[0]["command"] == "echo old"
+    recipe("p/leaf", "steps:\n  - render: {bash: echo newer}\n")
+    assert collect_commands(rec, {})[0]["command"] == "echo newer"
+
+
+def test_failed_include_is_retried_once_the_recipe_exists(recipe):
+    recipe("p/top", "steps:\n  - include: {id: p/leaf}\n")
+    rec = loader.load_recipe("p/top")
+    assert "include failed p/leaf" in collect_commands(rec, {})[0]["command"]
+    assert plan.compile_plan(rec) is plan.compile_plan(rec)
+    recipe("p/leaf", "steps:\n  - render: {bash: echo leaf}\n")
+    assert collect_commands(rec, {})[0]["command"] == "echo leaf"
+
+
+def test_include_step_and_format_override(recipe):
+    recipe("s/src", "steps:\n  - name: a\n    render: {bash: 'a {{ x }}', cmd: 'ca'}\n")
+    recipe("s/top", "steps:\n"
+           "  - include_step: {id: s/src, step: a, variant: bash, "
+           "vars: {x: '{{ y }}!'}, format: md}\n"
+           "  - include_step: {id: s/src, step: 5}\n")
+    rec = loader.load_recipe("s/top")
+    seq = collect_commands(rec, {"y": 1})
+    assert seq[0] == {"id": "s/src", "step": "a", "variant": "bash", "command": "a 1!"}
+    assert seq[1]["variant"] == "note" and "out of range" in seq[1]["command"]
+    assert "```bash\na 1!\n```" in render_recipe(rec, {"y": 1})
+
+
+def _skip_free(monkeypatch):
+    """iter_commands with subtree skipping disabled, as the reference result."""
+    from ir_cues import renderer
+    monkeypatch.setattr(renderer, "skips", lambda *a, **k: {})
+
+
+def renderer_iter(doc, vars, variant, require_vars):
+    from ir_cues.renderer import iter_commands
+    return iter_commands(doc, vars, variant=variant, require_vars=require_vars)
+
+
+def test_needs_and_variants_cross_include_bindings(recipe):
+    recipe("v/leaf", "steps:\n"
+                     "  - render: {bash: 'ps -p {{ pid }} {{ n | default(5) }}', pwsh: "
+                     "'gps {{ pid }}'}\n")
+    recipe("v/kql", "steps:\n  - render: {kql: 'T | where H == \"{{ host }}\"'}\n")
+    recipe("v/top", "steps:\n  - include: {id: v/leaf, vars: {pid: '{{ suspect }}'}}\n"
+           "  - include: {id: v/kql}\n"
+           "  - include_step: {id: v/leaf, step: 1, variant: pwsh}\n")
+    top = loader.load_recipe("v/top")
+    assert plan.requirements(top) == {"needs": ["host", "pid", "suspect"],
+                                      "optional": ["n"],
+                                      "variants": ["bash", "kql", "pwsh"]}
+    p = plan.compile_plan(top)
+    kql_block = next(b for b in p.blocks if b.variants == {"kql"})
+    assert kql_block.floor == {"host"}
+    assert kql_block.start in plan.skips(p, "pwsh")
+
+
+def test_variant_and_required_var_filters_skip_subtrees(corpus, recipe, monkeypatch):
+    recipe("f/leaf", "steps:\n"
+                     "  - render: {bash: 'ps -p {{ pid }}', pwsh: 'gps {{ pid }}'}\n")
+    recipe("f/net", "steps:\n  - render: {bash: 'ss -p | grep {{ host }}'}\n"
+                    "  - include: {id: f/leaf}\n")
+    recipe("f/top", "steps:\n  - include: {id: f/leaf, vars: {pid: '{{ suspect }}'}}\n"
+           "  - include: {id: f/net}\n  - render: {bash: uptime}\n"
+           "  - include: {id: f/missing}\n")
+    top = loader.load_recipe("f/top")
+    cases = [("pwsh", False, {}), ("bash", True, {"suspect": 1}),
+             (None, True, {"pid": 2}), ("note", True, {})]
+
+    def run():
+        return [[c["command"] for c in renderer_iter(top, v, variant, req)]
+                for variant, req, v in cases]
+
+    got = run()
+    _skip_free(monkeypatch)
+    assert got == run()
+    assert got[0] == ["gps", "gps"]
+    assert got[1] == ["ps -p 1", "uptime"]
+    assert got[2] == ["ps -p 2", "gps 2", "uptime",
+                      "# include failed f/missing: Recipe 'f/missing' not found in "
+                      + str(corpus)]
@@ -0,0 +1,45 @@
+import pytest
+
+from ir_cues import loader
+from ir_cues.renderer import collect_commands, render_recipe
+
+
+@pytest.fixture
+def parse_counter(monkeypatch):
+    loader.clear_caches()
+    calls = []
+    real = loader._parse_bytes
+
+    def counting(data):
+        calls.append(data)
+        return real(data)
+
+    monkeypatch.setattr(loader, "_parse_bytes", counting)
+    yield calls
+    loader.clear_caches()
+
+
+def test_include_tree_parses_each_file_at_most_once(parse_counter):
+    rec = loader.load_recipe("incident/host/windows-quick-triage")
+    collect_commands(rec, {"suspect_pid": 4})
+    render_recipe(rec, {"suspect_pid": 4})
+    render_recipe(rec, {"suspect_pid": 8}, format="md")
+    assert len(parse_counter) == len(set(parse_counter))
+
+
+def test_lookup_falls_back_to_id_map(tmp_path, monkeypatch):
+    root = tmp_path / "recipes"
+    (root / "misc").mkdir(parents=True)
+    (root / "misc" / "renamed.yaml").write_text("id: team/special\nsteps: []\n",
+                                                encoding="utf-8")
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(root))
+    loader.clear_caches()
+    try:
+        assert loader.load_recipe("team/special")["id"] == "team/special"
+        (root / "misc" / "late.yaml").write_text("id: team/late\nsteps: []\n",
+                                                 encoding="utf-8")
+        assert loader.load_recipe("team/late")["id"] == "team/late"
+        with pytest.raises(FileNotFoundError):
+            loader.load_recipe("../recipes/misc/renamed")
+    finally:
+        loader.clear_caches()
@@ -0,0 +1,90 @@
+from ir_cues import cache, loader
+from ir_cues.search import (
+    SearchIndex,
+    clear_cache,
+    load_search_index,
+    parse_terms,
+    search,
+)
+
+
+def _mk(rec_id, title, tags, steps=()):
+    return {"id": rec_id, "title": title, "tags": tags, "steps": list(steps)}
+
+
+IDX = [
+    _mk("windows/process/list", "Process list and triage", ["windows", "process"],
+        [{"name": "Snapshot", "render": {"pwsh": "Get-CimInstance Win32_Process"}}]),
+    _mk("windows/network/connections", "Active network connections",
+        ["windows", "network"]),
+    _mk("linux/process/list", "Process list", ["linux", "process"],
+        [{"name": "Sockets", "render": {"bash": "lsof -i -nP"}, "hint": "needs root"}]),
+    _mk("windows/persistence/autostarts", "Autostarts", ["windows", "persistence"]),
+]
+
+
+def _ids(terms, idx=SearchIndex.build(IDX), limit=None):
+    return [rid for rid, _ in idx.query(*parse_terms(terms), limit=limit)]
+
+
+def test_boolean_semantics_match_linear_scan():
+    assert _ids(['+windows', '-persistence', 'process']) == ['windows/process/list']
+    assert _ids(['+"active network"']) == ['windows/network/connections']
+    assert _ids(['+"process list"', '+windows']) == ['windows/process/list']
+
+
+def test_finds_recipes_by_command_body_and_hint():
+    assert _ids(['Get-CimInstance']) == ['windows/process/list']
+    assert _ids(['"lsof -i"']) == ['linux/process/list']
+    assert _ids(['+root']) == ['linux/process/list']
+
+
+def test_ranking_and_limit():
+    # a title hit outranks a hit that only appears in a command body
+    idx = SearchIndex.build([
+        _mk("b/body", "Sockets", [], [{"render": {"bash": "netstat -an"}}]),
+        _mk("t/title", "Netstat listeners", []),
+    ])
+    assert _ids(['netstat'], idx) == ['t/title', 'b/body']
+    assert _ids(['windows', 'process'], limit=1) == ['windows/process/list']
+    idx = SearchIndex.build(IDX)
+    stored = SearchIndex.from_json(idx.to_json(), idx.texts)
+    assert stored.query(['list'], (), ()) == idx.query(['list'], (), ())
+
+
+def test_search_index_is_cached_until_a_recipe_changes(tmp_path, monkeypatch):
+    root = tmp_path / "recipes"
+    root.mkdir()
+    (root / "a.yaml").write_text("id: a\ntitle: Alpha\nsteps:\n"
+                                 "  - render: {bash: netstat -an}\n")
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(root))
+    assert [r["id"] for r in search(["netstat"])] == ["a"]
+
+    with monkeypatch.context() as m:
+        m.setattr(SearchIndex, "build",
+                  classmethod(lambda cls, recs: (_ for _ in ()).throw(AssertionError)))
+        assert [r["id"] for r in search(["alpha"])] == ["a"]
+
+    (root / "b.yaml").write_text("id: b\ntitle: Beta\nsteps:\n"
+                                 "  - render: {bash: ss -tanp}\n")
+    assert [r["id"] for r in search(["ss -tanp"])] == ["b"]
+    assert sorted(load_search_index().ids) == ["a", "b"]
+
+
+def test_stored_index_leaves_out_texts_and_is_kept_per_process(tmp_path, monkeypatch):
+    root = tmp_path / "recipes"
+    root.mkdir()
+    (root / "a.yaml").write_text("id: a\ntitle: Alpha\n"
+                                 "steps: [render: {bash: netstat -an}]\n")
+    (root / "b.yaml").write_text("id: b\nsteps:\n  - render: {bash: netstat -s -an}\n")
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(root))
+    idx = load_search_index()
+    assert load_search_index() is idx
+    data = cache.read_json(cache.cache_path("search", loader.corpus_key()))
+    assert "texts" not in data["index"] and sorted(data["rels"]) == ["a.yaml", "b.yaml"]
+
+    clear_cache()
+    # both hold every trigram of "netstat -an": the texts, rebuilt from the docs, decide
+    assert [r["id"] for r in search(['"netstat -an"'])] == ["a"]
+    assert [r["id"] for r in search(["s", "+alph"])] == ["a"]
+    assert load_search_index() is not idx
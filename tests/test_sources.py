@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+from ir_cues import cache, loader, search
+
+
+def _recipe(rid, title):
+    return f"id: {rid}\ntitle: {title}\nsteps:\n  - render: {{bash: echo {title}}}\n"
+
+
+@pytest.fixture
+def packs(tmp_path, monkeypatch, write):
+    base, team, vendor = tmp_path / "base", tmp_path / "team", tmp_path / "vendor"
+    write(base, "a/one.yaml", _recipe("a/one", "base"))
+    write(base, "a/two.yaml", _recipe("a/two", "base"))
+    write(team, "a/one.yaml", _recipe("a/one", "team"))
+    write(vendor, "a/two.yaml", _recipe("a/two", "vendor"))
+    write(vendor, "v/only.yaml", _recipe("v/only", "vendor"))
+    write(vendor, "pack.json", json.dumps({"name": "vendor", "version": "1.0"}))
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(base))
+    monkeypatch.setenv("IR_CUES_CONFIG", str(tmp_path / "none.ini"))
+    monkeypatch.setenv("IR_CUES_PATH", os.pathsep.join([str(team), str(vendor)]))
+    loader.clear_caches()
+    return base, team, vendor
+
+
+def test_earlier_sources_override_later_ones(packs):
+    base, team, vendor = packs
+    assert loader.sources() == [str(team), str(vendor), str(base)]
+    titles = {r["id"]: r["title"] for r in loader.load_index()}
+    assert titles == {"a/one": "team", "a/two": "vendor", "v/only": "vendor"}
+    assert loader.load_recipe("a/one")["title"] == "team"
+    assert loader.load_recipe("v/only")["title"] == "vendor"
+    assert sorted(search.load_search_index().ids) == ["a/one", "a/two", "v/only"]
+    assert {cache.cache_path("index", r) for r in (base, team, vendor)} == {
+        s["cache_file"] for s in loader.index_stats()["sources"]}
+
+
+def test_config_file_lists_sources_after_the_environment(
+    tmp_path, monkeypatch, packs, write
+):
+    base, team, vendor = packs
+    conf = tmp_path / "conf" / "config.ini"
+    write(conf.parent, "config.ini", "[sources]\npaths =\n    ../vendor\n")
+    monkeypatch.setenv("IR_CUES_CONFIG", str(conf))
+    monkeypatch.setenv("IR_CUES_PATH", str(team))
+    assert loader.sources() == [str(team), str(vendor), str(base)]
+
+
+def test_versioned_pack_is_not_rescanned_until_its_version_changes(packs, write):
+    base, team, vendor = packs
+    loader.load_index()
+    write(vendor, "v/only.yaml", _recipe("v/only", "edited"))
+    write(team, "a/one.yaml", _recipe("a/one", "team2"))
+    loader.clear_caches()
+    titles = {r["id"]: r["title"] for r in loader.load_index()}
+    assert titles["a/one"] == "team2" and titles["v/only"] == "vendor"
+
+    write(vendor, "pack.json", json.dumps({"name": "vendor", "version": "1.1"}))
+    loader.clear_caches()
+    titles = {r["id"]: r["title"] for r in loader.load_index()}
+    assert titles["v/only"] == "edited"
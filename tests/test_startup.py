@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+
+_PROBE = """
+import json, sys
+{setup}
+mods = ("jinja2", "rich", "typer", "yaml")
+print(json.dumps(sorted(m for m in mods if m in sys.modules)))
+"""
+
+
+def _loaded(setup):
+    out = subprocess.run([sys.executable, "-c", _PROBE.format(setup=setup)],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_package_import_is_lightweight():
+    assert _loaded("import ir_cues") == []
+
+
+def test_cli_import_defers_heavy_dependencies():
+    assert _loaded("import ir_cues.cli") == ["typer"]
+
+
+def test_list_and_search_never_import_jinja2():
+    warm = "from ir_cues.cli import app\napp(['list'], standalone_mode=False)\n"
+    subprocess.run([sys.executable, "-c", warm], capture_output=True, check=True)
+    loaded = _loaded(warm + "app(['search', 'process'], standalone_mode=False)")
+    assert "jinja2" not in loaded and "yaml" not in loaded
@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from ir_cues import loader, plan, search, store
+from ir_cues.renderer import collect_commands
+
+
+@pytest.fixture
+def tree(corpus, write):
+    write(corpus, "a/leaf.yaml", "id: a/leaf\ntitle: Leaf\ntags: [x]\nsteps:\n"
+          "  - name: kill\n"
+          "    render: {bash: 'kill -9 {{ pid }}', pwsh: 'Stop-Process {{ pid }}'}\n")
+    write(corpus, "a/mid.yaml", "id: a/mid\ntitle: Mid\nsteps:\n"
+                                "  - include: {id: a/leaf, vars: {pid: 7}}\n")
+    write(corpus, "a/top.yaml", "id: a/top\ntitle: Top\nsteps:\n"
+                                "  - include: {id: a/mid}\n"
+          "  - include_step: {id: a/leaf, step: kill}\n")
+    write(corpus, "a/bad.yaml", "id: [oops\n")
+    return corpus
+
+
+def _use(monkeypatch, path):
+    monkeypatch.setattr(loader, "RECIPES_DIR", str(path))
+    loader.clear_caches()
+    plan.clear_cache()
+
+
+def test_database_matches_the_tree(tmp_path, monkeypatch, tree):
+    queries = [["kill"], ["+leaf", "-mid"], ["Stop-Process", "mid"], ["-top"],
+               ['"kill -9"'], ["9"]]
+    expected = {tuple(q): sorted(r["id"] for r in search.search(q)) for q in queries}
+    index = sorted(r["id"] for r in loader.load_index())
+    tree_includers = store.includers("a/leaf", transitive=True)
+
+    db = tmp_path / "corpus.db"
+    assert store.build(str(tree), str(db))["errors"] == 1
+    _use(monkeypatch, db)
+    assert sorted(r["id"] for r in loader.load_index()) == index
+    for q in queries:
+        assert sorted(r["id"] for r in search.search(q)) == expected[tuple(q)], q
+    commands = collect_commands(loader.load_recipe("a/mid"), {})
+    assert [c["command"] for c in commands] == ["kill -9 7", "Stop-Process 7"]
+    with pytest.raises(FileNotFoundError):
+        loader.load_recipe("a/missing")
+    assert store.includers("a/leaf", transitive=True) == tree_includers
+    assert store.includers("a/leaf") == [("a/mid", 1, "include"),
+                                         ("a/top", 2, "include_step")]
+
+
+def test_documents_are_shared_and_connection_is_read_only(tmp_path, monkeypatch, tree):
+    db = tmp_path / "corpus.db"
+    store.build(str(tree), str(db))
+    _use(monkeypatch, db)
+    assert loader.load_recipe("a/leaf") is loader.load_recipe("a/leaf")
+    opened = store.open_store(str(db))
+    with pytest.raises(sqlite3.OperationalError):
+        opened.db.execute("DELETE FROM recipes")
+
+
+def test_search_decodes_no_documents(tmp_path, monkeypatch, tree):
+    db = tmp_path / "corpus.db"
+    store.build(str(tree), str(db))
+    _use(monkeypatch, db)
+    opened = store.open_store(str(db))
+    hits = search.search(["kill"])
+    assert [(r["id"], r.variants) for r in hits] == [("a/leaf", ["bash", "pwsh"])]
+    assert [(r["id"], r.steps) for r in search.search(["+a/top"])] == [("a/top", 2)]
+    assert opened.doc_at.cache_info().currsize == 0
+    assert hits[0].doc()["title"] == "Leaf"
+    assert opened.doc_at.cache_info().currsize == 1
+
+
+def test_build_reports_a_missing_fts5_tokenizer(tmp_path, monkeypatch, tree):
+    monkeypatch.setattr(store, "_SCHEMA",
+                        store._SCHEMA.replace("'trigram'", "'no_such_tokenizer'"))
+    db = tmp_path / "corpus.db"
+    with pytest.raises(ValueError, match="trigram tokenizer"):
+        store.build(str(tree), str(db))
+    assert not db.exists() and not (tmp_path / "corpus.db.tmp").exists()
@@ -0,0 +1,48 @@
+import os
+
+import jinja2
+import pytest
+
+from ir_cues import templating
+
+
+@pytest.fixture(autouse=True)
+def _fresh_environment():
+    templating.clear_caches()
+    yield
+    templating.clear_caches()
+
+
+def test_compiled_templates_are_shared():
+    src = "Get-Process -Id {{ pid }}"
+    assert templating.compile_template(src) is templating.compile_template(src)
+    assert templating.render(src, {"pid": 7}) == jinja2.Template(src).render(pid=7)
+
+
+def test_bytecode_cache_persists(tmp_path, monkeypatch):
+    monkeypatch.setenv("IR_CUES_CACHE_DIR", str(tmp_path))
+    templating.render("echo {{ host }}", {"host": "a"})
+    assert os.listdir(tmp_path / "jinja")
+
+
+def test_bytecode_cache_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("IR_CUES_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("IR_CUES_JINJA_BYTECODE", "0")
+    assert templating.get_environment().bytecode_cache is None
+    templating.render("echo {{ host }}", {"host": "a"})
+    assert not (tmp_path / "jinja").exists()
+
+
+def test_template_vars_split_required_and_defaulted(tmp_path, monkeypatch):
+    monkeypatch.setenv("IR_CUES_CACHE_DIR", str(tmp_path))
+    src = ("lsof -p {{ pid }} | head -n {{ limit | default(20) }}"
+           "{% for x in items %}{{ x }}{% endfor %}")
+    assert templating.template_vars(src) == ({"pid", "items"}, {"limit"})
+    assert templating.template_vars("{{ a | default(1) }} {{ a }}") == ({"a"}, set())
+    templating.save_template_vars()
+    assert (tmp_path / "template-vars.json").exists()
+
+    templating.clear_caches()
+    monkeypatch.setattr(templating, "_analyse", lambda source: 1 / 0)
+    # read back from disk
+    assert templating.template_vars(src) == ({"pid", "items"}, {"limit"})
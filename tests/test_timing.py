@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from ir_cues import loader, plan, templating, timing
+from ir_cues.renderer import collect_commands
+
+
+def test_disabled_recording_is_a_no_op():
+    timing.reset()
+    with timing.span("x"):
+        timing.count("n")
+    assert timing.summary() == {"phases": {}, "counters": {}}
+
+
+def test_phases_and_counters_for_a_playbook():
+    loader.clear_caches()
+    plan.clear_cache()
+    templating.clear_caches()
+    timing.reset()
+    timing.enable()
+    try:
+        collect_commands(loader.load_recipe("incident/host/windows-quick-triage"),
+                         {"pid": 1})
+        data = timing.summary()
+        trace = timing.chrome_trace()
+    finally:
+        timing.reset()
+    for phase in ("load_recipe", "yaml_parse", "plan", "plan_build",
+                  "jinja_compile", "render"):
+        assert data["phases"][phase]["calls"] >= 1, phase
+    counters = data["counters"]
+    assert counters["files_parsed"] >= 2 and counters["templates_compiled"] >= 1
+    assert counters["plans_built"] >= 2 and counters["include_depth"] >= 1
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert spans and all(e["dur"] >= 0 and e["ts"] >= 0 for e in spans)
+    assert trace["traceEvents"][-1]["ph"] == "C"
+
+
+def test_cli_profile_flag_and_trace_env(tmp_path):
+    env = dict(os.environ, IR_CUES_TRACE=str(tmp_path / "trace.json"),
+               IR_CUES_NO_DAEMON="1")
+    res = subprocess.run([sys.executable, "-m", "ir_cues.cli", "--profile",
+                          "--cprofile", str(tmp_path / "p.prof"),
+                          "dry-run", "windows/process/triage", "--format", "md"],
+                         capture_output=True, text=True, env=env, check=True)
+    assert "# Plan for" in res.stdout
+    assert "load_recipe" in res.stderr and "counters:" in res.stderr
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    names = {e["name"] for e in trace["traceEvents"]}
+    assert {"load_recipe", "plan", "output"} <= names
+    assert (tmp_path / "p.prof").stat().st_size > 0
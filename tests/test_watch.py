@@ -0,0 +1,55 @@
+from ir_cues import timing
+from ir_cues.watch import Watcher
+
+
+def test_poll_reparses_the_changed_file_and_rerenders_its_includers(corpus, write):
+    write(corpus, "a/leaf.yaml", "id: a/leaf\ntitle: Leaf\nsteps:\n"
+                                 "  - render: {bash: echo leaf}\n")
+    write(corpus, "a/top.yaml", "id: a/top\ntitle: Top\nsteps:\n"
+                                "  - include: {id: a/leaf}\n")
+    write(corpus, "b/solo.yaml", "id: b/solo\ntitle: Solo\nsteps:\n"
+                                 "  - render: {bash: echo solo}\n")
+
+    w = Watcher(["a/top", "b/solo"])
+    assert ["echo leaf" in r["text"] for r in w.start()] == [True, False]
+    assert w.poll() == ([], [])
+
+    write(corpus, "a/leaf.yaml", "id: a/leaf\ntitle: Leaf\nsteps:\n"
+                                 "  - render: {bash: echo changed leaf}\n")
+    timing.enable()
+    try:
+        changed, results = w.poll()
+        parsed = timing.summary()["counters"].get("files_parsed")
+    finally:
+        timing.reset()
+    assert parsed == 1
+    assert changed == ["a/leaf.yaml"]
+    assert [r["id"] for r in results] == ["a/top"]
+    assert "echo changed leaf" in results[0]["text"] and results[0]["ms"] >= 0
+
+    write(corpus, "a/leaf.yaml", "id: [broken\n")
+    changed, results = w.poll()
+    assert w.problems(changed)[0][0] == "a/leaf.yaml"
+    assert "Failed to include a/leaf" in results[0]["text"]
+
+
+def test_fixing_an_id_makes_it_resolvable(corpus, write):
+    write(corpus, "a/leaf.yaml", "id: a/old\ntitle: Leaf\nsteps:\n"
+                                 "  - render: {bash: echo leaf}\n")
+    write(corpus, "a/top.yaml", "id: a/top\ntitle: Top\nsteps:\n"
+                                "  - include: {id: a/leaf}\n")
+
+    w = Watcher(["a/top"])
+    assert "not found" in w.start()[0]["text"]
+    write(corpus, "a/leaf.yaml", "id: a/leaf\ntitle: Leaf\nsteps:\n"
+                                 "  - render: {bash: echo leaf}\n")
+    changed, results = w.poll()
+    assert changed == ["a/leaf.yaml"] and [r["id"] for r in results] == ["a/top"]
+    assert "echo leaf" in results[0]["text"] and "not found" not in results[0]["text"]
+
+
+def test_render_reports_errors_instead_of_raising(corpus, write):
+    write(corpus, "a/x.yaml", "id: a/x\ntitle: X\nsteps:\n  - include: {id: a/y}\n")
+    write(corpus, "a/y.yaml", "id: a/y\ntitle: Y\nsteps:\n  - include: {id: a/x}\n")
+    [result] = Watcher(["a/x"]).start()
+    assert result["error"].startswith("IncludeCycleError")